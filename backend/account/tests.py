@@ -1,3 +1,104 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from property.models import Property, PropertyImage
+from property.cache import get_cache
+from property.pagination import PropertyCursorPagination
+from .models import User
+from .views import FavoriteStatusView, UserFavoritePropertiesView, UserPropertiesView
+
+
+class PropertyListQueryBudgetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='password', name='Owner')
+        cls.token = Token.objects.create(user=cls.user)
+        for i in range(30):
+            property = Property.objects.create(
+                owner=cls.user,
+                title=f'Listing {i}',
+                street_name='Lorong 6 Toa Payoh',
+                location=f'{i} Lorong 6 Toa Payoh',
+                price=2000 + i,
+            )
+            PropertyImage.objects.create(property=property, image=f'property_images/{i}.png')
+            cls.user.favorite_properties.add(property)
+
+    def setUp(self):
+        # cached responses would hide the queries being budgeted
+        get_cache().clear()
+
+    def assertWithinBudget(self, view_class, url, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), view_class.max_queries)
+        self.assertEqual(len(response.data['results']), 30)
+
+    def test_user_properties(self):
+        self.assertWithinBudget(UserPropertiesView, '/account/profile/owner/properties?page_size=30')
+
+    def test_favorite_properties(self):
+        auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        self.assertWithinBudget(UserFavoritePropertiesView, '/account/favorite/?page_size=30', **auth)
+
+
+class FavoriteTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='buyer', password='password', name='Buyer')
+        cls.token = Token.objects.create(user=cls.user)
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        cls.properties = [
+            Property.objects.create(owner=owner, title=f'Listing {i}', street_name='s', location='l', price=2000 + i)
+            for i in range(45)
+        ]
+        cls.user.favorite_properties.add(*cls.properties[:25])
+
+    def setUp(self):
+        get_cache().clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_status(self):
+        for property, expected in ((self.properties[0], True), (self.properties[30], False)):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'/account/favorite/{property.id}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data, {'property_id': property.id, 'is_favorite': expected})
+            self.assertLessEqual(len(queries), FavoriteStatusView.max_queries)
+        self.client.credentials()
+        self.assertEqual(self.client.get(f'/account/favorite/{self.properties[0].id}/').status_code, 401)
+
+    def test_pages(self):
+        # 20 per page by default; `next` walks every favorite once, newest first
+        response = self.client.get('/account/favorite/')
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNone(response.data['previous'])
+        ids = [row['id'] for row in response.data['results']]
+        response = self.client.get(response.data['next'])
+        ids += [row['id'] for row in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(ids, [property.id for property in reversed(self.properties[:25])])
+
+        # page sizes are capped by the server
+        with mock.patch.object(PropertyCursorPagination, 'max_page_size', 30):
+            response = self.client.get('/account/favorite/?page_size=1000')
+        self.assertEqual(len(response.data['results']), 25)
+        response = self.client.get('/property/all/?page_size=1000')
+        self.assertEqual(len(response.data['results']), 45)
+        with mock.patch.object(PropertyCursorPagination, 'max_page_size', 30):
+            response = self.client.get('/property/details/user/0/?page_size=1000')
+        self.assertEqual(len(response.data['results']), 30)
+
+    def test_owner_pages(self):
+        # the listings of one owner (my-listings page), paged like every Property list
+        own = Property.objects.create(owner=self.user, title='Own', street_name='s', location='l', price=1)
+        response = self.client.get(f'/property/details/user/{self.user.id}/?owner_id={self.user.id}')
+        self.assertEqual([row['id'] for row in response.data['results']], [own.id])
+        self.assertIsNone(response.data['next'])
@@ -12,6 +12,7 @@ urlpatterns = [
     path('login/', views.LoginUserView.as_view(), name='login_user'),
     path('logout/', views.LogoutUserView.as_view(), name='logout_user'),
     path('favorite/', views.UserFavoritePropertiesView.as_view(), name='user_favorite_properties'),
+    path('favorite/<int:property_id>/', views.FavoriteStatusView.as_view(), name='favorite_status'),
     path('favorite/add/', views.AddToFavoritesView.as_view(), name='add_to_favorites'),
     path('favorite/remove/', views.RemoveFromFavoritesView.as_view(), name='remove_from_favorites'),    
 ]
\ No newline at end of file
@@ -14,6 +14,8 @@ from .serializer import *
 
 from property.models import Property, PropertyRequest
 from property.serializer import PropertySerializer, PropertyRequestSerializer
+from property.pagination import PropertyCursorPagination
+from property.mixins import SparseFieldsetMixin
 
 # view all users
 class UsersListView(generics.ListAPIView):
@@ -104,11 +106,13 @@ class LogoutUserView(generics.GenericAPIView):
 # view all properties of a user
 class UserPropertiesView(generics.ListAPIView):
     serializer_class = PropertySerializer
+    pagination_class = PropertyCursorPagination
+    max_queries = 3  # user lookup + page of properties + prefetched images
     
     def get_queryset(self):
         username = self.kwargs.get('username')
         user = get_object_or_404(User, username=username)
-        return Property.objects.filter(owner=user)
+        return Property.objects.filter(owner=user).prefetch_related('images')
     
 class CurrentUserProfileView(generics.RetrieveAPIView):
     serializer_class = UserSerializer
@@ -120,22 +124,30 @@ class CurrentUserProfileView(generics.RetrieveAPIView):
         return self.request.user
 
 # view all favorite properties of a user
-class UserFavoritePropertiesView(generics.ListAPIView):
+class UserFavoritePropertiesView(SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = PropertySerializer
+    pagination_class = PropertyCursorPagination
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    max_queries = 3  # token lookup + page of favorites + prefetched images
     
     def get_queryset(self):
         user = self.request.user
         if not user.is_authenticated:
             print("User is not authenticated")
             return Property.objects.none()
-        user_fav_properties = user.favorite_properties.all()
-        
-        print("User favorite properties:", user_fav_properties)
-        
-        return user_fav_properties
+        return user.favorite_properties.prefetch_related('images')
     
+# whether one property is among the user's favorites, without paging through them
+class FavoriteStatusView(generics.GenericAPIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    max_queries = 2  # token lookup + one EXISTS on the favorites table
+
+    def get(self, request, property_id):
+        is_favorite = request.user.favorite_properties.filter(id=property_id).exists()
+        return Response({"property_id": property_id, "is_favorite": is_favorite}, status=200)
+
 # add a property to favorites
 class AddToFavoritesView(generics.GenericAPIView):
     serializer_class = PropertySerializer
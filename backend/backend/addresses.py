@@ -0,0 +1,39 @@
+import re
+
+
+# Street address normalization shared by the fuzzy search index (search/fuzzy.py) and the
+# gazetteer (data_management/gazetteer.py), so both spell an address the same way.
+
+# Singapore street name abbreviations, as used in the HDB data ('ANG MO KIO AVE 3', 'BT BATOK ST 21')
+ABBREVIATIONS = {
+    'lor': 'lorong',
+    'ave': 'avenue',
+    'st': 'street',
+    'jln': 'jalan',
+    'rd': 'road',
+    'dr': 'drive',
+    'cres': 'crescent',
+    'ctrl': 'central',
+    'cl': 'close',
+    'pl': 'place',
+    'ter': 'terrace',
+    'hts': 'heights',
+    'pk': 'park',
+    'nth': 'north',
+    'sth': 'south',
+    'upp': 'upper',
+    'bt': 'bukit',
+    'kg': 'kampong',
+    'tg': 'tanjong',
+    "c'wealth": 'commonwealth',
+}
+
+
+def normalize_address(text):
+    """
+        'Lor 6 Toa Payoh' / 'LORONG 6, TOA PAYOH' -> 'lorong 6 toa payoh'
+    """
+    if not text:
+        return ''
+    words = re.findall(r"[\w']+", text.lower())
+    return ' '.join(ABBREVIATIONS.get(word, word).replace("'", '') for word in words)
@@ -0,0 +1,64 @@
+import decimal
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to DRF's pure-Python encoder/decoder
+    orjson = None
+
+
+# orjson-backed drop-in replacements for DRF's JSONRenderer / JSONParser.
+# Output is byte-for-byte what JSONRenderer produces for API payloads: Decimals are written
+# exactly as json.dumps(float(value)) would, and datetimes / lazy strings / querysets are
+# handed back to DRF's JSONEncoder so their formatting (e.g. '...T10:00:00.123Z') is unchanged.
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    _drf_default = JSONEncoder().default
+
+    def _default(obj):
+        if isinstance(obj, decimal.Decimal):
+            # DRF encodes Decimal as float(obj); emit Python's repr of it verbatim
+            return orjson.Fragment(repr(float(obj)))
+        return _drf_default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+        JSONRenderer using orjson when it is installed.
+        Pretty-printed (indent=N) and ASCII-only output still go through DRF's renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # same escaping as JSONRenderer, keeps the output a strict javascript subset
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """
+        JSONParser using orjson when it is installed (orjson only accepts UTF-8,
+        other request encodings still go through DRF's parser).
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
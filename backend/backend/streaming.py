@@ -0,0 +1,37 @@
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# rows encoded and flushed per chunk; also used as the QuerySet.iterator() chunk size
+STREAM_CHUNK_SIZE = 500
+
+
+def iter_json_array(rows, chunk_size=STREAM_CHUNK_SIZE):
+    """
+        Encode an iterable of rows as a single JSON array, yielding it piece by piece.
+        Only one chunk of encoded rows is held in memory at a time.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    yield '['
+    separator = ''
+    buffer = []
+    for row in rows:
+        buffer.append(encoder.encode(row))
+        if len(buffer) >= chunk_size:
+            yield separator + ','.join(buffer)
+            separator = ','
+            buffer = []
+    if buffer:
+        yield separator + ','.join(buffer)
+    yield ']'
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+        JSON array response streamed from an iterable of rows,
+        e.g. StreamingJSONResponse(queryset.values().iterator(chunk_size=500))
+    """
+
+    def __init__(self, rows, chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(iter_json_array(rows, chunk_size), **kwargs)
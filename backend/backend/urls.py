@@ -26,6 +26,8 @@ urlpatterns = [
     path('account/', include('account.urls')),
     path('property/', include('property.urls')),
     path('advanced-features/', include('advanced_features.urls')),
+    path('data/', include('data_management.urls')),
+    path('', include('search.urls')),
 ]
 
 if settings.DEBUG:
@@ -1,3 +1,5 @@
 from django.contrib import admin
+from .models import GazetteerEntry, GeocodeCache
 
-# Register your models here.
+admin.site.register(GeocodeCache)
+admin.site.register(GazetteerEntry)
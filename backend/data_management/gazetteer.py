@@ -0,0 +1,140 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Max, Min, OuterRef, Subquery
+
+from backend.addresses import normalize_address
+
+from .models import Flat, GazetteerEntry, GeocodeCache, RentalFlat, ResaleFlat
+
+
+# Offline geocoding of the ingested HDB tables through a gazetteer.
+#
+# Hundreds of thousands of flat records share a few thousand addresses, so coordinates are
+# resolved once per distinct (block, street_name) in GazetteerEntry and then copied onto the
+# flats with set-based UPDATEs (a correlated subquery on the gazetteer's unique index, one
+# statement per id range). Coordinates come from a local CSV / GeoJSON file (for example an
+# address-point export) or from answers already in the geocode cache.
+#
+# Sources spell streets differently ('LOR 6 TOA PAYOH' in the HDB data, 'LORONG 6 TOA PAYOH'
+# from OneMap), so they are matched on address_key(), which spells out the abbreviations.
+
+FLAT_MODELS = (RentalFlat, ResaleFlat, Flat)
+
+# accepted column / property names in source files, lower-cased
+BLOCK_NAMES = ('block', 'blk_no', 'blk')
+STREET_NAMES = ('street_name', 'road_name', 'street')
+LATITUDE_NAMES = ('latitude', 'lat')
+LONGITUDE_NAMES = ('longitude', 'lng', 'lon')
+POSTAL_NAMES = ('postal_code', 'postal', 'postcode')
+
+
+def address_key(block, street_name):
+    return str(block).strip().upper(), normalize_address(street_name)
+
+
+def collect_addresses():
+    """Add a gazetteer entry for every (block, street_name) of the flat tables; returns how many were new."""
+    addresses = set()
+    for model in FLAT_MODELS:
+        addresses.update(model.objects.values_list('block', 'street_name').distinct())
+    before = GazetteerEntry.objects.count()
+    GazetteerEntry.objects.bulk_create(
+        [GazetteerEntry(block=block, street_name=street_name) for block, street_name in addresses],
+        batch_size=1000, ignore_conflicts=True,
+    )
+    return GazetteerEntry.objects.count() - before
+
+
+def _pick(record, names):
+    for name in names:
+        value = record.get(name)
+        if value not in (None, '', 'NIL'):
+            return value
+    return None
+
+
+def _point(record):
+    record = {str(name).lower(): value for name, value in record.items()}
+    block, street_name = _pick(record, BLOCK_NAMES), _pick(record, STREET_NAMES)
+    try:
+        latitude = Decimal(str(_pick(record, LATITUDE_NAMES)))
+        longitude = Decimal(str(_pick(record, LONGITUDE_NAMES)))
+    except InvalidOperation:
+        return None
+    if block is None or street_name is None or not latitude.is_finite() or not longitude.is_finite():
+        return None
+    postal_code = _pick(record, POSTAL_NAMES)
+    return {
+        'key': address_key(block, street_name),
+        'latitude': latitude,
+        'longitude': longitude,
+        'postal_code': str(postal_code)[:6] if postal_code is not None else None,
+    }
+
+
+def read_source(path):
+    """Points from a CSV file or a GeoJSON FeatureCollection of Points; unusable records are skipped."""
+    if path.lower().endswith(('.geojson', '.json')):
+        with open(path, encoding='utf-8') as file:
+            collection = json.load(file)
+        for feature in collection.get('features', []):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') != 'Point':
+                continue
+            longitude, latitude = geometry['coordinates'][:2]
+            point = _point({**(feature.get('properties') or {}), 'latitude': latitude, 'longitude': longitude})
+            if point is not None:
+                yield point
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as file:
+            for record in csv.DictReader(file):
+                point = _point(record)
+                if point is not None:
+                    yield point
+
+
+def geocode_cache_points():
+    """Points from geocoding answers that carry a block and street."""
+    rows = GeocodeCache.objects.filter(
+        found=True, block__isnull=False, street_name__isnull=False,
+    ).values('block', 'street_name', 'latitude', 'longitude', 'postal_code')
+    for row in rows.iterator(chunk_size=2000):
+        point = _point(row)
+        if point is not None:
+            yield point
+
+
+def fill_coordinates(points, source, overwrite=False):
+    """Set the coordinates of gazetteer entries matched by `points`; returns how many were set."""
+    points = {point['key']: point for point in points}
+    entries = GazetteerEntry.objects.all() if overwrite else GazetteerEntry.objects.filter(latitude__isnull=True)
+    matched = []
+    for entry in entries.iterator(chunk_size=2000):
+        point = points.get(address_key(entry.block, entry.street_name))
+        if point is None:
+            continue
+        entry.latitude, entry.longitude = point['latitude'], point['longitude']
+        entry.postal_code = point['postal_code'] or entry.postal_code
+        entry.source = source
+        matched.append(entry)
+    GazetteerEntry.objects.bulk_update(matched, ['latitude', 'longitude', 'postal_code', 'source'], batch_size=500)
+    return len(matched)
+
+
+def assign_flat_coordinates(batch_size=5000):
+    """Copy gazetteer coordinates onto every flat, one UPDATE per `batch_size` ids; returns {model name: rows}."""
+    updated = {}
+    for model in FLAT_MODELS:
+        entry = GazetteerEntry.objects.filter(block=OuterRef('block'), street_name=OuterRef('street_name'))
+        bounds = model.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        updated[model.__name__] = 0
+        if bounds['first'] is None:
+            continue
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            updated[model.__name__] += model.objects.filter(pk__gte=start, pk__lt=start + batch_size).update(
+                latitude=Subquery(entry.values('latitude')[:1]),
+                longitude=Subquery(entry.values('longitude')[:1]),
+            )
+    return updated
@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+import requests
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import GeocodeCache
+
+
+# Server-side geocoding through OneMap's elastic search, with a persistent cache.
+#
+# Queries are normalized (upper case, single spaces) and looked up in GeocodeCache first; only
+# misses go upstream, and their answer (including "not found") is stored. Identical queries that
+# miss at the same time share one upstream request: the first caller registers a Future for the
+# query, the others wait on it. Batches resolve their misses on a bounded thread pool; the pool
+# threads only talk to the upstream, every database read and write stays on the calling thread.
+#
+# Entries expire: an answer older than GEOCODE_CACHE_TTL (GEOCODE_MISS_TTL for "not found") counts
+# as a miss and is fetched again, and after storing new answers the cache is pruned (at most every
+# GEOCODE_CACHE_PRUNE_INTERVAL seconds per process) of expired entries and of the oldest ones
+# beyond GEOCODE_CACHE_MAX_ENTRIES.
+#
+# The upstream is whatever ONEMAP_API_URL points at, so tests can run against a local stub that
+# answers in the OneMap format.
+
+
+class GeocodingError(Exception):
+    """The upstream could not be reached or answered with an error."""
+
+
+# every answer field, so that overwriting an expired entry clears what the new answer lacks
+EMPTY_ANSWER = {
+    'found': False, 'latitude': None, 'longitude': None, 'postal_code': None,
+    'block': None, 'street_name': None, 'address': None,
+}
+
+
+def normalize_query(text):
+    return ' '.join(str(text).upper().split())[:255]
+
+
+class OneMapClient:
+    def __init__(self, url, token=None, timeout=10):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def search(self, query):
+        """GeocodeCache field values for the best match of a query, or {'found': False}."""
+        params = {'searchVal': query, 'returnGeom': 'Y', 'getAddrDetails': 'Y', 'pageNum': 1}
+        headers = {'Authorization': self.token} if self.token else {}
+        try:
+            response = requests.get(self.url, params=params, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            results = response.json().get('results') or []
+        except (requests.RequestException, ValueError) as error:
+            raise GeocodingError(str(error)) from error
+        if not results:
+            return {'found': False}
+        try:
+            best = results[0]
+            latitude, longitude = Decimal(best['LATITUDE']), Decimal(best['LONGITUDE'])
+            if not (latitude.is_finite() and longitude.is_finite()):
+                raise InvalidOperation
+            return {
+                'found': True,
+                'latitude': latitude,
+                'longitude': longitude,
+                'postal_code': best.get('POSTAL') if best.get('POSTAL') not in (None, '', 'NIL') else None,
+                'block': best.get('BLK_NO') or None,
+                'street_name': best.get('ROAD_NAME') or None,
+                'address': best.get('ADDRESS') or None,
+            }
+        except (KeyError, TypeError, AttributeError, InvalidOperation):
+            # a result without usable coordinates is no match
+            return {'found': False}
+
+
+def expired():
+    """Filter for GeocodeCache entries past their time to live."""
+    now = timezone.now()
+    return (
+        Q(found=True, updated_at__lt=now - timedelta(seconds=settings.GEOCODE_CACHE_TTL))
+        | Q(found=False, updated_at__lt=now - timedelta(seconds=settings.GEOCODE_MISS_TTL))
+    )
+
+
+def prune_cache():
+    """Delete expired entries, then the oldest ones beyond GEOCODE_CACHE_MAX_ENTRIES; returns the rows deleted."""
+    deleted, _ = GeocodeCache.objects.filter(expired()).delete()
+    cutoff = (
+        GeocodeCache.objects.order_by('-updated_at', '-id')
+        .values_list('updated_at', 'id')[settings.GEOCODE_CACHE_MAX_ENTRIES:settings.GEOCODE_CACHE_MAX_ENTRIES + 1]
+    )
+    for updated_at, pk in cutoff:
+        excess, _ = GeocodeCache.objects.filter(Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, id__lte=pk)).delete()
+        deleted += excess
+    return deleted
+
+
+class Geocoder:
+    def __init__(self, client, max_workers=4):
+        self.client = client
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._inflight = {}  # normalized query -> Future of the upstream answer
+        self._pruned_at = None
+
+    def fetch(self, query):
+        """Upstream answer for a normalized query; concurrent calls for one query share a request."""
+        with self._lock:
+            future = self._inflight.get(query)
+            leader = future is None
+            if leader:
+                future = self._inflight[query] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = self.client.search(query)
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[query]
+
+    def geocode(self, text):
+        """The cache entry for an address, asking the upstream on a miss; raises GeocodingError."""
+        query = normalize_query(text)
+        entry = GeocodeCache.objects.filter(query=query).exclude(expired()).first()
+        if entry is None:
+            entry, _ = GeocodeCache.objects.update_or_create(query=query, defaults={**EMPTY_ANSWER, **self.fetch(query)})
+            self.maybe_prune()
+        return entry
+
+    def geocode_many(self, texts):
+        """
+            {normalized query: cache entry, or None if the upstream failed for it} for many
+            addresses: cached ones in one query, misses upstream with at most max_workers in flight.
+        """
+        queries = list(dict.fromkeys(normalize_query(text) for text in texts))
+        entries = {entry.query: entry for entry in GeocodeCache.objects.filter(query__in=queries).exclude(expired())}
+        missing = [query for query in queries if query not in entries]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                answers = list(pool.map(self._fetch_or_none, missing))
+            # expired entries are overwritten; a concurrent request may have stored the same query
+            GeocodeCache.objects.bulk_create(
+                [GeocodeCache(query=query, **{**EMPTY_ANSWER, **answer})
+                 for query, answer in zip(missing, answers) if answer is not None],
+                update_conflicts=True, unique_fields=['query'], update_fields=[*EMPTY_ANSWER, 'updated_at'],
+            )
+            entries.update((entry.query, entry) for entry in GeocodeCache.objects.filter(query__in=missing))
+            self.maybe_prune()
+        return {query: entries.get(query) for query in queries}
+
+    def maybe_prune(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._pruned_at is not None and now - self._pruned_at < settings.GEOCODE_CACHE_PRUNE_INTERVAL:
+                return
+            self._pruned_at = now
+        prune_cache()
+
+    def _fetch_or_none(self, query):
+        try:
+            return self.fetch(query)
+        except GeocodingError:
+            return None
+
+
+_geocoders = {}
+_geocoders_lock = threading.Lock()
+
+
+def get_geocoder():
+    """The process-wide geocoder for the configured upstream (in-flight queries are shared per upstream)."""
+    key = (settings.ONEMAP_API_URL, settings.ONEMAP_API_TOKEN)
+    with _geocoders_lock:
+        if key not in _geocoders:
+            client = OneMapClient(settings.ONEMAP_API_URL, settings.ONEMAP_API_TOKEN, settings.GEOCODE_TIMEOUT)
+            _geocoders[key] = Geocoder(client, max_workers=settings.GEOCODE_BATCH_WORKERS)
+        return _geocoders[key]
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from data_management.gazetteer import (
+    assign_flat_coordinates, collect_addresses, fill_coordinates, geocode_cache_points, read_source,
+)
+from data_management.models import GazetteerEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the (block, street_name) gazetteer from the ingested HDB tables, fill its coordinates "
+        "from a local CSV/GeoJSON file and/or the geocode cache, and copy them onto every flat"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', action='append', default=[],
+                            help="CSV or GeoJSON file of address points (block, street_name, latitude, longitude); repeatable")
+        parser.add_argument('--no-cache', action='store_true', help="Do not use answers from the geocode cache")
+        parser.add_argument('--overwrite', action='store_true', help="Replace coordinates already in the gazetteer")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Flat ids per UPDATE")
+
+    def handle(self, *args, **options):
+        added = collect_addresses()
+        self.stdout.write(f"{added} new addresses, {GazetteerEntry.objects.count()} in the gazetteer")
+
+        for path in options['source']:
+            try:
+                filled = fill_coordinates(read_source(path), 'file', overwrite=options['overwrite'])
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read {path}: {error}")
+            self.stdout.write(f"{path}: coordinates for {filled} addresses")
+        if not options['no_cache']:
+            # the cache only fills gaps left by the files, it never replaces their coordinates
+            overwrite = options['overwrite'] and not options['source']
+            filled = fill_coordinates(geocode_cache_points(), 'geocode', overwrite=overwrite)
+            self.stdout.write(f"geocode cache: coordinates for {filled} addresses")
+
+        missing = GazetteerEntry.objects.filter(latitude__isnull=True).count()
+        if missing:
+            self.stdout.write(self.style.WARNING(f"{missing} addresses still have no coordinates"))
+
+        for model_name, rows in assign_flat_coordinates(options['batch_size']).items():
+            self.stdout.write(f"{model_name}: {rows} rows updated")
+        self.stdout.write(self.style.SUCCESS("Gazetteer built"))
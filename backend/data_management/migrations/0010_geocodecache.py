@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_management', '0009_flat_postal_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True)),
+                ('found', models.BooleanField(default=False)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True)),
+                ('postal_code', models.CharField(blank=True, max_length=6, null=True)),
+                ('block', models.CharField(blank=True, max_length=10, null=True)),
+                ('street_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('address', models.CharField(blank=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Geocode Cache Entry',
+                'verbose_name_plural': 'Geocode Cache',
+            },
+        ),
+    ]
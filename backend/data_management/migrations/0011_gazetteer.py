@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_management', '0010_geocodecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flat',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='flat',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='rentalflat',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='rentalflat',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='resaleflat',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='resaleflat',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True),
+        ),
+        migrations.CreateModel(
+            name='GazetteerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('block', models.CharField(max_length=10)),
+                ('street_name', models.CharField(max_length=100)),
+                ('postal_code', models.CharField(blank=True, max_length=6, null=True)),
+                ('latitude', models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=14, max_digits=20, null=True)),
+                ('source', models.CharField(blank=True, choices=[('file', 'Local file'), ('geocode', 'Geocode cache')], max_length=10, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Gazetteer Entry',
+                'verbose_name_plural': 'Gazetteer',
+                'constraints': [models.UniqueConstraint(fields=('block', 'street_name'), name='unique_gazetteer_address')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_management', '0011_gazetteer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='geocodecache',
+            index=models.Index(fields=['updated_at', 'id'], name='geocode_cache_updated_idx'),
+        ),
+    ]
@@ -15,6 +15,9 @@ class RentalFlat(models.Model):
     town = models.CharField(max_length=50)
     block = models.CharField(max_length=10)
     street_name = models.CharField(max_length=100)
+    # filled from the gazetteer by the build_gazetteer command
+    latitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    longitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
     flat_type = models.CharField(max_length=20)
     monthly_rent = models.DecimalField(
         max_digits=10,
@@ -43,6 +46,9 @@ class ResaleFlat(models.Model):
     flat_type = models.CharField(max_length=20)
     block = models.CharField(max_length=10)
     street_name = models.CharField(max_length=100)
+    # filled from the gazetteer by the build_gazetteer command
+    latitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    longitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
     storey_range = models.CharField(max_length=20)
     floor_area_sqm = models.DecimalField(
         max_digits=8,
@@ -75,6 +81,9 @@ class Flat(models.Model):
     town = models.CharField(max_length=50)
     block = models.CharField(max_length=10)
     street_name = models.CharField(max_length=100)
+    # filled from the gazetteer by the build_gazetteer command
+    latitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    longitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
     postal_code = models.CharField(max_length=6, blank=True, null=True)
     flat_type = models.CharField(max_length=20)
     storey_range = models.CharField(max_length=20, blank=True, null=True)
@@ -159,4 +168,59 @@ class Flat(models.Model):
         
         if self.for_sale:
             if not self.resale_date or not self.resale_price:
-                raise ValidationError("Resale flats require resale date and price")
\ No newline at end of file
+                raise ValidationError("Resale flats require resale date and price")
+
+# upstream geocoding results, one row per normalized query (see geocoding.py);
+# misses are cached too (found=False) so unknown addresses are not looked up again
+class GeocodeCache(models.Model):
+    query = models.CharField(max_length=255, unique=True)
+    found = models.BooleanField(default=False)
+    latitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    longitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    postal_code = models.CharField(max_length=6, blank=True, null=True)
+    block = models.CharField(max_length=10, blank=True, null=True)
+    street_name = models.CharField(max_length=100, blank=True, null=True)
+    address = models.CharField(max_length=255, blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Geocode Cache Entry"
+        verbose_name_plural = "Geocode Cache"
+        indexes = [
+            # expiry and pruning (geocoding.prune_cache)
+            models.Index(fields=['updated_at', 'id'], name='geocode_cache_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.query} -> {self.latitude}, {self.longitude}" if self.found else f"{self.query} (not found)"
+
+
+# one row per distinct (block, street_name) of the ingested HDB tables, with its coordinates;
+# built by the build_gazetteer command so that flats are geocoded per address rather than per row
+class GazetteerEntry(models.Model):
+    SOURCES = [
+        ('file', 'Local file'),
+        ('geocode', 'Geocode cache'),
+    ]
+
+    block = models.CharField(max_length=10)
+    street_name = models.CharField(max_length=100)
+    postal_code = models.CharField(max_length=6, blank=True, null=True)
+    latitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    longitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    source = models.CharField(max_length=10, choices=SOURCES, blank=True, null=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Gazetteer Entry"
+        verbose_name_plural = "Gazetteer"
+        constraints = [
+            # also the index behind the per-row lookup when coordinates are copied onto the flats
+            models.UniqueConstraint(fields=['block', 'street_name'], name='unique_gazetteer_address'),
+        ]
+
+    def __str__(self):
+        return f"{self.block} {self.street_name}"
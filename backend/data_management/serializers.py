@@ -0,0 +1,21 @@
+from rest_framework import serializers
+
+from .models import GeocodeCache
+
+MAX_BATCH_ADDRESSES = 100
+
+
+class GeocodeQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=255)
+
+
+class GeocodeBatchSerializer(serializers.Serializer):
+    addresses = serializers.ListField(
+        child=serializers.CharField(max_length=255), min_length=1, max_length=MAX_BATCH_ADDRESSES,
+    )
+
+
+class GeocodeResultSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GeocodeCache
+        fields = ['query', 'found', 'latitude', 'longitude', 'postal_code', 'block', 'street_name', 'address']
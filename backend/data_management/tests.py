@@ -1,3 +1,259 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from rest_framework.throttling import ScopedRateThrottle
+
+from account.models import User
+from backend.streaming import STREAM_CHUNK_SIZE
+from .geocoding import Geocoder, OneMapClient, prune_cache
+from .models import Flat, GazetteerEntry, GeocodeCache, RentalFlat, ResaleFlat
+from .views import FlatExportView, RentalFlatExportView, ResaleFlatExportView
+
+
+class OneMapStub(BaseHTTPRequestHandler):
+    """
+        Answers like OneMap's elastic search; addresses containing NOWHERE have no results,
+        those containing MALFORMED a result without coordinates.
+    """
+    queries = []
+    delay = 0
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)['searchVal'][0]
+        type(self).queries.append(query)
+        time.sleep(self.delay)
+        if 'MALFORMED' in query:
+            results = [{'BLK_NO': '1', 'ROAD_NAME': 'MALFORMED ROAD', 'LATITUDE': 'NIL'}]
+        else:
+            results = [] if 'NOWHERE' in query else [{
+                'BLK_NO': '460', 'ROAD_NAME': 'LORONG 6 TOA PAYOH', 'POSTAL': '310460',
+                'ADDRESS': '460 LORONG 6 TOA PAYOH SINGAPORE 310460',
+                'LATITUDE': '1.33650923851', 'LONGITUDE': '103.85246793213',
+            }]
+        body = json.dumps({'found': len(results), 'results': results}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GeocodingTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), OneMapStub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/search'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='geocoder', password='password', name='Geocoder')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        OneMapStub.queries = []
+        OneMapStub.delay = 0
+        onemap = override_settings(ONEMAP_API_URL=self.url)
+        onemap.enable()
+        self.addCleanup(onemap.disable)
+        cache.clear()  # throttle history
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_geocode_is_cached(self):
+        response = self.client.get('/data/geocode/', {'q': '460 Lorong 6  Toa Payoh'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['postal_code'], '310460')
+        self.assertTrue(response.data['found'])
+        # same address, different spelling of whitespace and case: served from GeocodeCache
+        self.client.get('/data/geocode/', {'q': '460 lorong 6 toa payoh'})
+        self.assertEqual(OneMapStub.queries, ['460 LORONG 6 TOA PAYOH'])
+
+    def test_identical_inflight_queries_share_one_request(self):
+        OneMapStub.delay = 0.2
+        geocoder = Geocoder(OneMapClient(self.url))
+        answers = []
+        threads = [threading.Thread(target=lambda: answers.append(geocoder.fetch('1 TEST ROAD'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(answers), 8)
+        self.assertEqual(OneMapStub.queries, ['1 TEST ROAD'])
+
+    def test_batch(self):
+        GeocodeCache.objects.create(query='1 CACHED ROAD', found=True, latitude='1.3', longitude='103.8')
+        addresses = ['2 nowhere road', '1 Cached Road', '460 Lorong 6 Toa Payoh', '2 NOWHERE ROAD']
+        response = self.client.post('/data/geocode/batch/', {'addresses': addresses}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['found'] for result in response.data['results']], [False, True, True, False])
+        self.assertEqual(sorted(OneMapStub.queries), ['2 NOWHERE ROAD', '460 LORONG 6 TOA PAYOH'])
+        self.assertTrue(GeocodeCache.objects.filter(query='2 NOWHERE ROAD', found=False).exists())
+
+    def test_upstream_unavailable(self):
+        with override_settings(ONEMAP_API_URL='http://127.0.0.1:9/search'):
+            response = self.client.get('/data/geocode/', {'q': '1 Test Road'})
+        self.assertEqual(response.status_code, 502)
+        self.assertFalse(GeocodeCache.objects.exists())
+
+    def test_malformed_result_is_a_miss(self):
+        response = self.client.get('/data/geocode/', {'q': '1 Malformed Road'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['found'])
+
+    def test_requires_authentication_and_is_throttled(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get('/data/geocode/', {'q': '1 Test Road'}).status_code, 401)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        with mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'geocode': '2/min'}):
+            statuses = [self.client.get('/data/geocode/', {'q': f'{i} Test Road'}).status_code for i in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_expired_entries_are_refetched(self):
+        GeocodeCache.objects.create(query='460 LORONG 6 TOA PAYOH', found=True, latitude='1.0', longitude='103.0')
+        GeocodeCache.objects.create(query='2 NOWHERE ROAD', found=False)
+        self.client.get('/data/geocode/', {'q': '460 Lorong 6 Toa Payoh'})
+        self.client.get('/data/geocode/', {'q': '2 Nowhere Road'})
+        self.assertEqual(OneMapStub.queries, [])
+
+        stale = timezone.now() - timedelta(seconds=settings.GEOCODE_MISS_TTL + 1)
+        GeocodeCache.objects.update(updated_at=stale)
+        # a miss expires sooner than an answer
+        self.client.get('/data/geocode/', {'q': '460 Lorong 6 Toa Payoh'})
+        self.client.post('/data/geocode/batch/', {'addresses': ['2 Nowhere Road']}, format='json')
+        self.assertEqual(OneMapStub.queries, ['2 NOWHERE ROAD'])
+        self.assertEqual(GeocodeCache.objects.get(query='2 NOWHERE ROAD').updated_at > stale, True)
+
+        GeocodeCache.objects.update(updated_at=timezone.now() - timedelta(seconds=settings.GEOCODE_CACHE_TTL + 1))
+        response = self.client.get('/data/geocode/', {'q': '460 Lorong 6 Toa Payoh'})
+        self.assertEqual(response.data['postal_code'], '310460')
+        self.assertEqual(OneMapStub.queries, ['2 NOWHERE ROAD', '460 LORONG 6 TOA PAYOH'])
+
+    def test_prune(self):
+        now = timezone.now()
+        for i in range(5):
+            GeocodeCache.objects.create(query=f'{i} TEST ROAD', found=True, latitude='1.3', longitude='103.8')
+            GeocodeCache.objects.filter(query=f'{i} TEST ROAD').update(updated_at=now - timedelta(minutes=10 - i))
+        GeocodeCache.objects.create(query='9 OLD ROAD', found=False)
+        GeocodeCache.objects.filter(query='9 OLD ROAD').update(updated_at=now - timedelta(seconds=settings.GEOCODE_MISS_TTL + 1))
+        with override_settings(GEOCODE_CACHE_MAX_ENTRIES=3):
+            self.assertEqual(prune_cache(), 3)
+        self.assertEqual(sorted(GeocodeCache.objects.values_list('query', flat=True)), ['2 TEST ROAD', '3 TEST ROAD', '4 TEST ROAD'])
+
+
+class GazetteerTests(TestCase):
+    def setUp(self):
+        for month in ('2024-01', '2024-02', '2024-03'):
+            RentalFlat.objects.create(rent_approval_date=month, town='TOA PAYOH', block='460',
+                                      street_name='LOR 6 TOA PAYOH', flat_type='3 ROOM', monthly_rent=2500)
+        ResaleFlat.objects.create(month='2024-01', town='BISHAN', flat_type='4 ROOM', block='123',
+                                  street_name='BISHAN ST 12', storey_range='04 TO 06', floor_area_sqm=90,
+                                  flat_model='Model A', lease_commence_date=1990, remaining_lease='65 years',
+                                  resale_price=550000)
+        Flat.objects.create(town='BEDOK', block='1', street_name='BEDOK NTH RD', flat_type='3 ROOM', for_sale=True,
+                            resale_date='2024-01', resale_price=400000)
+        # the HDB data abbreviates street names, OneMap spells them out
+        GeocodeCache.objects.create(query='123 BISHAN STREET 12', found=True, block='123', street_name='BISHAN STREET 12',
+                                    latitude='1.35000000000000', longitude='103.85000000000000')
+
+    def build(self, *args):
+        call_command('build_gazetteer', *args, stdout=StringIO())
+
+    def test_build_from_file_and_geocode_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'addresses.csv')
+            with open(path, 'w', newline='') as file:
+                file.write('BLK_NO,ROAD_NAME,LATITUDE,LONGITUDE,POSTAL\n460,LORONG 6 TOA PAYOH,1.3365,103.8525,310460\n')
+            self.build('--source', path)
+        self.assertEqual(GazetteerEntry.objects.count(), 3)
+        self.assertEqual(set(RentalFlat.objects.values_list('latitude', flat=True)), {Decimal('1.3365')})
+        self.assertEqual(ResaleFlat.objects.get().longitude, Decimal('103.85'))
+        self.assertIsNone(Flat.objects.get().latitude)
+        self.assertEqual(GazetteerEntry.objects.get(block='460').postal_code, '310460')
+
+    def test_geojson_source(self):
+        feature = {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [103.93, 1.32]},
+                   'properties': {'block': '1', 'street_name': 'Bedok North Road'}}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'addresses.geojson')
+            with open(path, 'w') as file:
+                json.dump({'type': 'FeatureCollection', 'features': [feature]}, file)
+            self.build('--source', path, '--no-cache')
+        self.assertEqual(Flat.objects.get().latitude, Decimal('1.32'))
+        self.assertIsNone(ResaleFlat.objects.get().latitude)
+
+
+class FlatExportTests(APITestCase):
+    """The export endpoints stream each table as one JSON array, chunk by chunk."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # more rows than one chunk, so the array is joined across chunk boundaries
+        cls.rows = 2 * STREAM_CHUNK_SIZE + 3
+        RentalFlat.objects.bulk_create([
+            RentalFlat(rent_approval_date='2024-01', town='BISHAN' if i % 2 else 'TOA PAYOH', block=str(i),
+                       street_name='BISHAN ST 13', flat_type='4-ROOM', monthly_rent=2000 + i)
+            for i in range(cls.rows)
+        ])
+        ResaleFlat.objects.create(
+            month='2024-01', town='BISHAN', flat_type='4 ROOM', block='123', street_name='BISHAN ST 13',
+            storey_range='04 TO 06', floor_area_sqm=Decimal('92.5'), flat_model='Model A',
+            lease_commence_date=1988, remaining_lease='63 years', resale_price=Decimal('560000'),
+        )
+        Flat.objects.create(town='BISHAN', block='123', street_name='BISHAN ST 13', flat_type='4 ROOM', for_sale=True)
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        chunks = list(response.streaming_content)
+        return len(chunks), json.loads(b''.join(chunks))
+
+    def test_rental_flats(self):
+        chunks, rows = self.export('/data/rental-flats/export/')
+        self.assertEqual(len(rows), self.rows)
+        self.assertEqual(list(rows[0]), list(RentalFlatExportView.fields))
+        self.assertEqual([row['id'] for row in rows], sorted(RentalFlat.objects.values_list('id', flat=True)))
+        self.assertEqual((rows[0]['monthly_rent'], rows[-1]['monthly_rent']), (2000, 2000 + self.rows - 1))
+        # '[', one piece per chunk of rows, ']'
+        self.assertEqual(chunks, 2 + 3)
+
+        _, rows = self.export('/data/rental-flats/export/?town=bishan')
+        self.assertEqual(len(rows), self.rows // 2)
+        self.assertEqual({row['town'] for row in rows}, {'BISHAN'})
+
+    def test_other_tables(self):
+        for url, view, count in (('/data/resale-flats/export/', ResaleFlatExportView, 1),
+                                 ('/data/flats/export/', FlatExportView, 1)):
+            with self.subTest(url=url):
+                _, rows = self.export(url)
+                self.assertEqual(len(rows), count)
+                self.assertEqual(list(rows[0]), list(view.fields))
+
+        _, rows = self.export('/data/flats/export/?town=nowhere')
+        self.assertEqual(rows, [])
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('rental-flats/export/', views.RentalFlatExportView.as_view(), name='rental_flats_export'),
+    path('resale-flats/export/', views.ResaleFlatExportView.as_view(), name='resale_flats_export'),
+    path('flats/export/', views.FlatExportView.as_view(), name='flats_export'),
+    path('geocode/', views.GeocodeView.as_view(), name='geocode'),
+    path('geocode/batch/', views.GeocodeBatchView.as_view(), name='geocode_batch'),
+]
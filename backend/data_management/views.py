@@ -0,0 +1,90 @@
+from rest_framework import status
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+
+from backend.streaming import StreamingJSONResponse, STREAM_CHUNK_SIZE
+
+from .geocoding import GeocodingError, get_geocoder, normalize_query
+from .models import Flat, RentalFlat, ResaleFlat
+from .serializers import GeocodeBatchSerializer, GeocodeQuerySerializer, GeocodeResultSerializer
+
+
+# stream a whole ingested table as a JSON array
+# rows are read with QuerySet.iterator(), so memory stays flat however large the table is
+class FlatTableExportView(APIView):
+    model = None
+    fields = ()
+
+    def get(self, request):
+        queryset = self.model.objects.order_by('pk').values(*self.fields)
+        town = request.query_params.get('town')
+        if town:
+            queryset = queryset.filter(town__iexact=town)
+        return StreamingJSONResponse(queryset.iterator(chunk_size=STREAM_CHUNK_SIZE))
+
+
+class RentalFlatExportView(FlatTableExportView):
+    model = RentalFlat
+    fields = ('id', 'rent_approval_date', 'town', 'block', 'street_name', 'latitude', 'longitude', 'flat_type', 'monthly_rent')
+
+
+class ResaleFlatExportView(FlatTableExportView):
+    model = ResaleFlat
+    fields = (
+        'id', 'month', 'town', 'flat_type', 'block', 'street_name', 'latitude', 'longitude', 'storey_range',
+        'floor_area_sqm', 'flat_model', 'lease_commence_date', 'remaining_lease', 'resale_price',
+    )
+
+
+class FlatExportView(FlatTableExportView):
+    model = Flat
+    fields = (
+        'id', 'town', 'block', 'street_name', 'postal_code', 'latitude', 'longitude', 'flat_type', 'storey_range',
+        'floor_area_sqm', 'flat_model', 'lease_commence_date', 'remaining_lease',
+        'for_rent', 'for_sale', 'rent_approval_date', 'monthly_rent', 'resale_date', 'resale_price',
+    )
+
+
+# geocode one address (?q=) through the cached OneMap proxy, see geocoding.py
+class GeocodeView(APIView):
+    # signed-in users only, and rate limited: every miss costs an upstream request
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'geocode'
+
+    def get(self, request):
+        params = GeocodeQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        try:
+            entry = get_geocoder().geocode(params.validated_data['q'])
+        except GeocodingError:
+            return Response({'error': 'Geocoding service unavailable.'}, status=status.HTTP_502_BAD_GATEWAY)
+        return Response(GeocodeResultSerializer(entry).data)
+
+
+# geocode up to 100 addresses at once ({"addresses": [...]}); results follow the input order,
+# with an error entry for addresses the upstream failed on (they are not cached)
+class GeocodeBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'geocode_batch'
+
+    def post(self, request):
+        params = GeocodeBatchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        addresses = params.validated_data['addresses']
+        entries = get_geocoder().geocode_many(addresses)
+        results = []
+        for address in addresses:
+            query = normalize_query(address)
+            entry = entries[query]
+            results.append(
+                GeocodeResultSerializer(entry).data if entry is not None
+                else {'query': query, 'found': None, 'error': 'Geocoding service unavailable.'}
+            )
+        return Response({'results': results})
@@ -0,0 +1,100 @@
+# Property.amenities has been stored in two shapes over time: a list of names
+# (['wifi', 'gym'], what the serializers accept) and the dict of flags from
+# Property.set_default_amenities() ({'wifi': True, 'gym': False, ...}).
+#
+# The known amenities are also derived on save into two forms:
+#   - Property.amenity_mask (bit i set when the property has AMENITIES[i]), a compact value for the
+#     in-memory search index and saved-search matching; a bitwise test cannot use a B-tree index;
+#   - one PropertyAmenity row per amenity, unique on (amenity, property), so the SQL filter
+#     "has wifi and gym" is one index lookup per amenity instead of a test on every listing.
+
+from functools import lru_cache
+
+from django.db.models import Q
+
+# bit positions are stored in the database: only ever append to this tuple (at most 63 names)
+AMENITIES = (
+    'wifi',
+    'aircon',
+    'parking',
+    'swimming_pool',
+    'gym',
+    'balcony',
+    'security',
+    'garden',
+    'smart_home',
+    'pet_friendly',
+    'washing_machine',
+    'dryer',
+    'kitchen',
+)
+AMENITY_BITS = {name: 1 << position for position, name in enumerate(AMENITIES)}
+# labels used by the frontend forms that differ from the stored names
+ALIASES = {
+    'air_conditioning': 'aircon',
+    'wi_fi': 'wifi',
+}
+
+
+def normalize_amenity(name):
+    # 'Swimming Pool' / 'swimming-pool' / 'swimming_pool' -> 'swimming_pool'
+    normalized = '_'.join(str(name).strip().lower().replace('-', ' ').split())
+    return ALIASES.get(normalized, normalized)
+
+
+def normalize_amenities(value):
+    """
+        Return the set of amenity names a property has, whichever shape it is stored in.
+    """
+    if not value:
+        return set()
+    if isinstance(value, dict):
+        return {normalize_amenity(name) for name, present in value.items() if present}
+    if isinstance(value, str):
+        value = value.split(',')
+    return {normalize_amenity(name) for name in value if str(name).strip()}
+
+
+def amenity_mask(value):
+    """
+        Bitmask of the known amenities in an amenities value (any stored shape); unknown names are ignored.
+    """
+    mask = 0
+    for name in normalize_amenities(value):
+        mask |= AMENITY_BITS.get(name, 0)
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def amenity_names(mask):
+    # inverse of amenity_mask; cached since only a few distinct combinations occur
+    return frozenset(name for name, bit in AMENITY_BITS.items() if mask & bit)
+
+
+def filter_amenities(queryset, names, match_all=True):
+    """
+        Restrict a Property queryset to rows with all (or, with match_all=False, any) of `names`.
+        Known amenities are looked up in the PropertyAmenity index; names outside AMENITIES have
+        no rows and fall back to a substring match on the JSON column.
+    """
+    names = {normalize_amenity(name) for name in names if str(name).strip()}
+    if not names:
+        return queryset
+    known = sorted(name for name in names if name in AMENITY_BITS)
+    unknown = sorted(names - set(known))
+    from .models import PropertyAmenity  # models.py imports this module
+    rows = PropertyAmenity.objects
+
+    if match_all:
+        for name in known:
+            queryset = queryset.filter(id__in=rows.filter(amenity=name).values('property_id'))
+        for name in unknown:
+            queryset = queryset.filter(amenities__icontains=name)
+        return queryset
+
+    condition = Q()
+    if known:
+        condition |= Q(id__in=rows.filter(amenity__in=known).values('property_id'))
+    for name in unknown:
+        condition |= Q(amenities__icontains=name)
+    return queryset.filter(condition)
@@ -0,0 +1,127 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+# Server-side cache for the serialized output of Property reads.
+#
+# Entries are never deleted one by one. Every key embeds a generation number instead:
+# one generation for all list-shaped reads (list, search) and one per property for its
+# detail page. Invalidating bumps the generation, so stale entries simply stop being
+# addressed and age out of the backend.
+
+LIST_GENERATION_KEY = 'property:list:gen'
+DETAIL_GENERATION_KEY = 'property:detail:{pk}:gen'
+HITS_KEY = 'property:stats:hits'
+MISSES_KEY = 'property:stats:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PROPERTY_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'PROPERTY_CACHE_TIMEOUT', 600)
+
+
+def get_generation_timeout():
+    return getattr(settings, 'PROPERTY_GENERATION_TIMEOUT', 7 * 24 * 3600)
+
+
+def _generation(key):
+    # seeded from the clock rather than 1: if the backend evicts or expires a generation key,
+    # the re-created one can never collide with a generation that is still cached
+    cache = get_cache()
+    cache.add(key, time.time_ns(), get_generation_timeout())
+    return cache.get(key)
+
+
+def get_list_generation():
+    # changes whenever any property changes; lets per-process read models detect writes made elsewhere
+    return _generation(LIST_GENERATION_KEY)
+
+
+def _bump(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), get_generation_timeout())
+    else:
+        # incr() keeps the old expiry on some backends and resets it to the default on others
+        cache.touch(key, get_generation_timeout())
+
+
+def _incr_counter(key):
+    cache = get_cache()
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def invalidate_property(pk=None):
+    """
+        Drop cached reads affected by a change to one property (or to all lists if pk is None).
+        Deferred until the surrounding transaction commits, so a concurrent read cannot
+        re-cache the old rows before they are replaced.
+    """
+    def bump():
+        _bump(LIST_GENERATION_KEY)
+        if pk is not None:
+            _bump(DETAIL_GENERATION_KEY.format(pk=pk))
+
+    transaction.on_commit(bump)
+
+
+def get_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'backend': cache.__class__.__name__,
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+class CachedResponseMixin:
+    """
+        Serve GET responses of a Property view from the cache.
+
+        cache_scope = 'list'    keyed on the list generation (list, search, ...)
+        cache_scope = 'detail'  keyed on the generation of the property in kwargs['pk']
+
+        The key also covers the absolute URL (host + query string), since image URLs are absolute
+        and the query string selects the page, filters and fieldset.
+    """
+    cache_scope = 'list'
+
+    def get_cache_key(self, request, *args, **kwargs):
+        if self.cache_scope == 'detail':
+            generation = _generation(DETAIL_GENERATION_KEY.format(pk=kwargs['pk']))
+        else:
+            generation = get_list_generation()
+        digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return f'property:{self.cache_scope}:{self.__class__.__name__}:{generation}:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key(request, *args, **kwargs)
+        data = cache.get(key)
+        if data is not None:
+            _incr_counter(HITS_KEY)
+            return Response(data)
+
+        _incr_counter(MISSES_KEY)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, get_timeout())
+        return response
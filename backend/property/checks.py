@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# backends whose entries live in the memory of one process
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+        The Property cache holds the list generation that tells every process about the writes
+        of the others (cache.py, readmodels.py); a per-process backend never shows them.
+    """
+    alias = getattr(settings, 'PROPERTY_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_BACKENDS and not getattr(settings, 'PROPERTY_CACHE_PROCESS_LOCAL', False):
+        return [Error(
+            f"The '{alias}' cache ({backend}) is not shared between processes.",
+            hint="Use a shared backend (DJANGO_CACHE_BACKEND=file, redis or database), or set "
+                 "PROPERTY_CACHE_PROCESS_LOCAL = True if the API runs in a single process.",
+            id='property.E001',
+        )]
+    return []
@@ -0,0 +1,183 @@
+import math
+import threading
+
+from .geo import MICRODEGREES
+from .models import Property
+from .readmodels import SyncedIndex
+
+
+# Server-side marker clustering: a hierarchical grid over Property coordinates, one level per
+# web-map zoom.
+#
+# At zoom z a cell spans CLUSTER_PIXELS screen pixels, i.e. 360 / 2**z * CLUSTER_PIXELS / 256
+# degrees, so each level's cells are exactly twice the size of the next finer level's and the
+# parent of cell (x, y) at zoom z + 1 is (x // 2, y // 2) at zoom z. Every level keeps, per
+# non-empty cell, the count, coordinate sums (for the centroid) and price range of the listings
+# under it; only the finest level (MAX_ZOOM) keeps the listings themselves.
+#
+# Adding or removing a listing touches one cell per level (MAX_ZOOM + 1 cells). A removal that
+# takes away a cell's cheapest or dearest listing recomputes that cell's range from its (at most
+# four) children, finest level first. A viewport query reads the cells of a single level.
+#
+# Kept current like the other in-memory read models (readmodels.py): signals update this
+# process, the shared list generation triggers a re-read of recently updated rows elsewhere.
+
+MAX_ZOOM = 16  # ~150 m cells; beyond this zoom the finest level is served
+CLUSTER_PIXELS = 64
+
+
+def cell_degrees(zoom):
+    return 360 / 2 ** zoom * CLUSTER_PIXELS / 256
+
+
+def _leaf(latitude, longitude):
+    size = cell_degrees(MAX_ZOOM)
+    return math.floor((longitude + 180) / size), math.floor((latitude + 90) / size)
+
+
+class _Cell:
+    __slots__ = ('count', 'latitude_sum', 'longitude_sum', 'min_price', 'max_price')
+
+    def __init__(self):
+        self.count = 0
+        self.latitude_sum = 0.0
+        self.longitude_sum = 0.0
+        self.min_price = None
+        self.max_price = None
+
+
+class ClusterIndex(SyncedIndex):
+    fields = ('id', 'lat_e6', 'lng_e6', 'price')
+
+    def __init__(self):
+        super().__init__()
+        self._clear()
+
+    def tracked(self):
+        return Property.objects.filter(lat_e6__isnull=False, lng_e6__isnull=False)
+
+    def _clear(self):
+        self.levels = [{} for _ in range(MAX_ZOOM + 1)]  # zoom -> {(x, y): _Cell}
+        self.members = {}  # finest cell -> {property id: price}
+        self.points = {}  # property id -> (latitude, longitude, price, finest cell)
+
+    def _size(self):
+        return len(self.points)
+
+    def _upsert(self, row):
+        self._discard(row.id)
+        if row.lat_e6 is None or row.lng_e6 is None:
+            return
+        price = row.price
+        latitude, longitude = row.lat_e6 / MICRODEGREES, row.lng_e6 / MICRODEGREES
+        x, y = leaf = _leaf(latitude, longitude)
+        self.points[row.id] = (latitude, longitude, price, leaf)
+        self.members.setdefault(leaf, {})[row.id] = price
+        for zoom in range(MAX_ZOOM, -1, -1):
+            shift = MAX_ZOOM - zoom
+            cell = self.levels[zoom].get((x >> shift, y >> shift))
+            if cell is None:
+                cell = self.levels[zoom][x >> shift, y >> shift] = _Cell()
+            cell.count += 1
+            cell.latitude_sum += latitude
+            cell.longitude_sum += longitude
+            if cell.min_price is None or price < cell.min_price:
+                cell.min_price = price
+            if cell.max_price is None or price > cell.max_price:
+                cell.max_price = price
+
+    def _discard(self, property_id):
+        point = self.points.pop(property_id, None)
+        if point is None:
+            return
+        latitude, longitude, price, leaf = point
+        members = self.members[leaf]
+        del members[property_id]
+        if not members:
+            del self.members[leaf]
+        x, y = leaf
+        for zoom in range(MAX_ZOOM, -1, -1):
+            shift = MAX_ZOOM - zoom
+            key = (x >> shift, y >> shift)
+            cell = self.levels[zoom][key]
+            cell.count -= 1
+            if not cell.count:
+                del self.levels[zoom][key]
+                continue
+            cell.latitude_sum -= latitude
+            cell.longitude_sum -= longitude
+            if price == cell.min_price or price == cell.max_price:
+                self._refresh_range(zoom, key, cell)
+
+    def _refresh_range(self, zoom, key, cell):
+        if zoom == MAX_ZOOM:
+            prices = list(self.members[key].values())
+            cell.min_price, cell.max_price = min(prices), max(prices)
+            return
+        x, y = key
+        children = [
+            child for child in (
+                self.levels[zoom + 1].get((2 * x + dx, 2 * y + dy)) for dx in (0, 1) for dy in (0, 1)
+            ) if child is not None
+        ]
+        cell.min_price = min(child.min_price for child in children)
+        cell.max_price = max(child.max_price for child in children)
+
+    def _single(self, zoom, key):
+        # id of the one listing under a cell of count 1, found by descending to the finest level
+        x, y = key
+        for finer in range(zoom + 1, MAX_ZOOM + 1):
+            x, y = next(
+                (2 * x + dx, 2 * y + dy) for dx in (0, 1) for dy in (0, 1)
+                if (2 * x + dx, 2 * y + dy) in self.levels[finer]
+            )
+        return next(iter(self.members[x, y]))
+
+    def clusters(self, south, west, north, east, zoom):
+        """
+            [(latitude, longitude, count, min price, max price, id or None)] for the cells of the
+            zoom level intersecting a bounding box; id is set for clusters of one listing.
+        """
+        zoom = min(zoom, MAX_ZOOM)
+        size = cell_degrees(zoom)
+        first_x, last_x = math.floor((west + 180) / size), math.floor((east + 180) / size)
+        first_y, last_y = math.floor((south + 90) / size), math.floor((north + 90) / size)
+        with self.lock:
+            level = self.levels[zoom]
+            if (last_x - first_x + 1) * (last_y - first_y + 1) < len(level):
+                keys = [
+                    (x, y) for x in range(first_x, last_x + 1) for y in range(first_y, last_y + 1)
+                    if (x, y) in level
+                ]
+            else:
+                keys = [(x, y) for x, y in level if first_x <= x <= last_x and first_y <= y <= last_y]
+            return [
+                (
+                    level[key].latitude_sum / level[key].count,
+                    level[key].longitude_sum / level[key].count,
+                    level[key].count,
+                    level[key].min_price,
+                    level[key].max_price,
+                    self._single(zoom, key) if level[key].count == 1 else None,
+                )
+                for key in keys
+            ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_cluster_index():
+    """The process-wide cluster index, built on first use and synced before every read."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ClusterIndex()
+    _index.sync()
+    return _index
+
+
+def get_loaded_cluster_index():
+    # the index if this process has built one; writes never trigger a build by themselves
+    return _index
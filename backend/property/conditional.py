@@ -0,0 +1,44 @@
+import hashlib
+
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .cache import get_list_generation
+from .models import Property
+
+
+# Validators for conditional GET on Property reads.
+# A repeat request carrying a matching If-None-Match gets a 304 straight from
+# these functions, before the view builds a queryset or runs the serializer.
+#
+# Lists are versioned by the list generation of the shared cache (cache.py), which every
+# change to a listing or its images moves once the write commits (see signals.py), so a list
+# validator costs a cache read instead of a query.
+#
+# Neither sends Last-Modified: the generation is not a time, and an HTTP date has one-second
+# resolution, so two edits of a listing within the same second would share one value and an
+# If-Modified-Since revalidation would get a stale 304. The detail ETag fingerprints the full
+# (microsecond) updated_at instead.
+
+
+def _fingerprint(request, *parts):
+    # the same data renders differently per page/filter/fieldset and per negotiated format
+    key = [str(part) for part in parts]
+    key += [request.get_full_path(), request.META.get('HTTP_ACCEPT', '')]
+    return hashlib.md5('|'.join(key).encode()).hexdigest()
+
+
+def property_list_etag(request, *args, **kwargs):
+    return _fingerprint(request, get_list_generation())
+
+
+def property_detail_etag(request, pk, *args, **kwargs):
+    updated_at = Property.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None  # let the view answer 404
+    return _fingerprint(request, pk, updated_at)
+
+
+conditional_property_list = method_decorator(condition(etag_func=property_list_etag), name='get')
+
+conditional_property_detail = method_decorator(condition(etag_func=property_detail_etag), name='get')
@@ -0,0 +1,120 @@
+import math
+
+import numpy as np
+from django.db.models import Q
+
+
+# Grid index over Property coordinates for viewport (bounding box) queries.
+#
+# The globe is cut into CELL_DEGREES x CELL_DEGREES cells numbered row by row:
+#   geo_cell = lat_row * GRID_COLUMNS + lng_column
+# so the cells of one grid row that a bounding box covers form a contiguous range of numbers.
+# A viewport becomes one `geo_cell BETWEEN a AND b` per covered row, each an index range scan on
+# property_geo_cell_idx, followed by an exact latitude/longitude check on the rows found.
+# At 0.01 degrees (~1.1 km) Singapore spans about 25 rows.
+#
+# Coordinates are also stored as integer microdegrees (lat_e6 / lng_e6, ~0.11 m resolution) next
+# to the public Decimal fields. Reading those gives plain ints instead of two Decimal objects per
+# row, and the NumPy helpers at the bottom compute bounding boxes and distances over whole
+# int32 arrays at once (see the benchmark_geo command).
+
+CELL_DEGREES = 0.01
+GRID_COLUMNS = round(360 / CELL_DEGREES)
+# a box covering more rows than this is scanned as a single range from its first to its last row
+MAX_ROW_RANGES = 64
+MICRODEGREES = 1_000_000
+EARTH_RADIUS_M = 6371008.8
+
+
+def _row(latitude):
+    return math.floor((float(latitude) + 90) / CELL_DEGREES)
+
+
+def _column(longitude):
+    return min(math.floor((float(longitude) + 180) / CELL_DEGREES), GRID_COLUMNS - 1)
+
+
+def geo_cell(latitude, longitude):
+    """Grid cell number of a coordinate, or None without one."""
+    if latitude is None or longitude is None:
+        return None
+    return _row(latitude) * GRID_COLUMNS + _column(longitude)
+
+
+def microdegrees(value):
+    """Decimal degrees -> integer microdegrees, or None without a value."""
+    return None if value is None else round(float(value) * MICRODEGREES)
+
+
+def zoom_precision(zoom):
+    """
+        Decimal places that still resolve one screen pixel at a web-map zoom level
+        (a 256px tile spans 360 / 2**zoom degrees); finer digits are only payload.
+    """
+    return max(1, min(6, math.ceil(math.log10(256 * 2 ** zoom / 360))))
+
+
+def parse_bbox(value):
+    """
+        'south,west,north,east' -> (south, west, north, east) as floats; raises ValueError.
+    """
+    try:
+        south, west, north, east = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError("bbox must be 'south,west,north,east' in decimal degrees.")
+    if not (-90 <= south <= north <= 90) or not (-180 <= west <= east <= 180):
+        raise ValueError("bbox must satisfy -90 <= south <= north <= 90 and -180 <= west <= east <= 180.")
+    return south, west, north, east
+
+
+def cell_ranges(south, west, north, east):
+    """(first, last) geo_cell ranges covering a bounding box, one per grid row."""
+    first_row, last_row = _row(south), _row(north)
+    first_column, last_column = _column(west), _column(east)
+    if last_row - first_row + 1 > MAX_ROW_RANGES:
+        return [(first_row * GRID_COLUMNS + first_column, last_row * GRID_COLUMNS + last_column)]
+    return [
+        (row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column)
+        for row in range(first_row, last_row + 1)
+    ]
+
+
+def within_bbox(queryset, south, west, north, east):
+    """Restrict a Property queryset to a bounding box through the geo_cell index."""
+    cells = Q()
+    for first, last in cell_ranges(south, west, north, east):
+        cells |= Q(geo_cell__range=(first, last))
+    return queryset.filter(cells).filter(
+        lat_e6__range=(microdegrees(south), microdegrees(north)),
+        lng_e6__range=(microdegrees(west), microdegrees(east)),
+    )
+
+
+def coordinate_arrays(queryset):
+    """
+        (ids, lat_e6, lng_e6) as int64 / int32 / int32 arrays for the rows of a Property
+        queryset that have coordinates.
+    """
+    rows = queryset.filter(lat_e6__isnull=False, lng_e6__isnull=False).values_list('id', 'lat_e6', 'lng_e6')
+    array = np.array(list(rows.iterator(chunk_size=2000)), dtype=np.int64).reshape(-1, 3)
+    return array[:, 0], array[:, 1].astype(np.int32), array[:, 2].astype(np.int32)
+
+
+def bbox_mask(lat_e6, lng_e6, south, west, north, east):
+    """Boolean array: which of the microdegree coordinates fall inside the bounding box."""
+    return (
+        (lat_e6 >= microdegrees(south)) & (lat_e6 <= microdegrees(north))
+        & (lng_e6 >= microdegrees(west)) & (lng_e6 <= microdegrees(east))
+    )
+
+
+def to_radians(e6):
+    return np.radians(np.asarray(e6, dtype=np.float64) / MICRODEGREES)
+
+
+def haversine_m(latitude, longitude, lat_e6, lng_e6):
+    """Great-circle distances in metres from one point (in degrees) to arrays of microdegree coordinates."""
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    lat2, lng2 = to_radians(lat_e6), to_radians(lng_e6)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
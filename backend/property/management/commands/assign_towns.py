@@ -0,0 +1,68 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from property.cache import invalidate_property
+from property.geo import MICRODEGREES
+from property.models import Property
+from property.snapshot import build_snapshot
+from property.towns import TownLocator, display_town, get_town_locator
+
+
+class Command(BaseCommand):
+    help = "Set Property.town from each listing's coordinates using the town boundaries (see property/towns.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--boundaries', help="GeoJSON file to use instead of settings.TOWN_BOUNDARIES_PATH")
+        parser.add_argument('--only-missing', action='store_true', help="Only fill listings without a town")
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without saving them")
+
+    def handle(self, *args, **options):
+        locator = self.load(options['boundaries'])
+        if not locator.shapes:
+            raise CommandError("No town boundaries loaded; set TOWN_BOUNDARIES_PATH or pass --boundaries")
+
+        queryset = Property.objects.filter(lat_e6__isnull=False, lng_e6__isnull=False)
+        if options['only_missing']:
+            queryset = queryset.filter(Q(town__isnull=True) | Q(town=''))
+        ids_by_town = {}
+        unmatched = 0
+        started = time.perf_counter()
+        rows = queryset.values_list('id', 'town', 'lat_e6', 'lng_e6')
+        for pk, current, lat_e6, lng_e6 in rows.iterator(chunk_size=2000):
+            town = display_town(locator.locate(lat_e6 / MICRODEGREES, lng_e6 / MICRODEGREES))
+            if town is None:
+                unmatched += 1
+            elif town != current:
+                ids_by_town.setdefault(town, []).append(pk)
+        elapsed = time.perf_counter() - started
+
+        changed = sum(len(ids) for ids in ids_by_town.values())
+        self.stdout.write(f"{changed} listings to update, {unmatched} outside the boundaries ({elapsed:.2f} s)")
+        if options['dry_run'] or not changed:
+            return
+        # one UPDATE per town (and per 500 ids); updated_at moves so validators and indexes notice
+        now = timezone.now()
+        with transaction.atomic():
+            for town, ids in ids_by_town.items():
+                for start in range(0, len(ids), 500):
+                    Property.objects.filter(id__in=ids[start:start + 500]).update(town=town, updated_at=now)
+            invalidate_property()
+        # bulk updates send no signals, and this process exits before a debounced rebuild would run
+        if getattr(settings, 'PROPERTY_SNAPSHOT_ENABLED', True):
+            build_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Updated the town of {changed} listings"))
+
+    def load(self, path):
+        if path is None:
+            return get_town_locator()
+        try:
+            with open(path, encoding='utf-8') as file:
+                return TownLocator.from_geojson(json.load(file))
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read {path}: {error}")
@@ -0,0 +1,100 @@
+import math
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from account.models import User
+from property.geo import EARTH_RADIUS_M, bbox_mask, coordinate_arrays, geo_cell, haversine_m, microdegrees
+from property.models import Property
+
+
+class Rollback(Exception):
+    pass
+
+
+def decimal_haversine_m(latitude, longitude, rows):
+    # the per-object path: Decimal coordinates converted and measured one row at a time
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    distances = []
+    for row_latitude, row_longitude in rows:
+        lat2, lng2 = math.radians(float(row_latitude)), math.radians(float(row_longitude))
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_M * math.asin(math.sqrt(a)))
+    return distances
+
+
+class Command(BaseCommand):
+    help = "Benchmark the Decimal coordinate path against the microdegree columns and NumPy helpers in geo.py"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help="Synthetic listings to add (rolled back afterwards)")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per path and operation")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options['rows'])
+                self.compare(options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        owner = User.objects.create_user(username='__benchmark__', password='benchmark', name='Benchmark')
+        listings = []
+        for i in range(rows):
+            # bulk_create skips save(), so the derived columns are filled here
+            latitude = f'{1.25 + (i * 7919 % 20000) / 100000:.14f}'
+            longitude = f'{103.62 + (i * 104729 % 40000) / 100000:.14f}'
+            listings.append(Property(
+                owner=owner,
+                title=f'Benchmark listing {i}',
+                street_name='Lorong 6 Toa Payoh',
+                location=f'{i} Lorong 6 Toa Payoh',
+                price=1500 + i % 3000,
+                latitude=latitude,
+                longitude=longitude,
+                geo_cell=geo_cell(latitude, longitude),
+                lat_e6=microdegrees(latitude),
+                lng_e6=microdegrees(longitude),
+            ))
+        Property.objects.bulk_create(listings, batch_size=2000)
+
+    def compare(self, repeat):
+        point = (1.3521, 103.8198)
+        bbox = (1.30, 103.80, 1.36, 103.88)
+        queryset = Property.objects.order_by('id')
+
+        def decimal_load():
+            return list(queryset.filter(latitude__isnull=False, longitude__isnull=False).values_list('latitude', 'longitude'))
+
+        def decimal_bbox(rows):
+            south, west, north, east = bbox
+            return sum(1 for latitude, longitude in rows if south <= latitude <= north and west <= longitude <= east)
+
+        rows = decimal_load()
+        _, lat_e6, lng_e6 = arrays = coordinate_arrays(queryset)
+        operations = [
+            ('load', decimal_load, lambda: coordinate_arrays(queryset)),
+            ('bbox', lambda: decimal_bbox(rows), lambda: int(bbox_mask(lat_e6, lng_e6, *bbox).sum())),
+            ('distance', lambda: decimal_haversine_m(*point, rows), lambda: haversine_m(*point, lat_e6, lng_e6)),
+        ]
+        self.stdout.write(f"{len(arrays[0])} coordinates")
+        for name, decimal_path, array_path in operations:
+            decimal_ms = self.time(decimal_path, repeat)
+            array_ms = self.time(array_path, repeat)
+            self.stdout.write(
+                f"{name}: Decimal {decimal_ms:.2f} ms, microdegrees + NumPy {array_ms:.2f} ms "
+                f"({decimal_ms / array_ms:.1f}x)"
+            )
+
+        # the paths differ only by rounding to whole microdegrees (at most ~0.1 m)
+        error = max(abs(a - b) for a, b in zip(decimal_haversine_m(*point, rows), haversine_m(*point, lat_e6, lng_e6)))
+        self.stdout.write(f"largest distance difference: {error:.3f} m")
+
+    def time(self, function, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return (time.perf_counter() - start) / repeat * 1000
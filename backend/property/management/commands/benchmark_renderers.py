@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from account.models import User
+from backend.renderers import FastJSONRenderer, orjson
+from property.models import Property
+from property.views import PropertyListView
+from search.views import PropertySearchView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark DRF's JSONRenderer against FastJSONRenderer on the list and search payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help="Synthetic listings to add (rolled back afterwards)")
+        parser.add_argument('--page-size', type=int, default=100, help="Rows per rendered page")
+        parser.add_argument('--repeat', type=int, default=50, help="Renders per renderer and endpoint")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write("orjson is not installed, FastJSONRenderer would fall back to JSONRenderer")
+            return
+
+        try:
+            with transaction.atomic():
+                self.seed(options['rows'])
+                payloads = self.fetch_payloads(options['page_size'])
+                for name, data in payloads.items():
+                    self.compare(name, data, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        owner = User.objects.create_user(username='__benchmark__', password='benchmark', name='Benchmark')
+        Property.objects.bulk_create([
+            Property(
+                owner=owner,
+                title=f'Benchmark listing {i}',
+                street_name='Lorong 6 Toa Payoh',
+                location=f'{i} Lorong 6 Toa Payoh',
+                town='Toa Payoh',
+                price=1500 + i % 3000,
+                bedrooms=i % 5,
+                bathrooms=i % 3,
+                square_feet=500 + i % 1000,
+                amenities=['wifi', 'aircon', 'parking'],
+                description='Bright unit near the MRT station. ' * 5,
+                latitude=1.33 + (i % 1000) / 100000,
+                longitude=103.84 + (i % 1000) / 100000,
+            )
+            for i in range(rows)
+        ])
+
+    def fetch_payloads(self, page_size):
+        factory = APIRequestFactory()
+        list_request = factory.get('/property/all/', {'page_size': page_size})
+        search_request = factory.get('/search/', {'min_price': 2000, 'bedrooms': 2, 'page_size': page_size})
+        # the factory's requests come from 'testserver', which ALLOWED_HOSTS does not list
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            return {
+                'list': PropertyListView.as_view()(list_request).data,
+                'search': PropertySearchView.as_view()(search_request).data,
+            }
+
+    def compare(self, name, data, repeat):
+        timings = {}
+        outputs = {}
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                outputs[renderer.__class__.__name__] = renderer.render(data, 'application/json')
+            timings[renderer.__class__.__name__] = (time.perf_counter() - start) / repeat * 1000
+
+        identical = outputs['JSONRenderer'] == outputs['FastJSONRenderer']
+        speedup = timings['JSONRenderer'] / timings['FastJSONRenderer']
+        self.stdout.write(
+            f"{name}: {len(outputs['JSONRenderer'])} bytes, "
+            f"JSONRenderer {timings['JSONRenderer']:.3f} ms, "
+            f"FastJSONRenderer {timings['FastJSONRenderer']:.3f} ms "
+            f"({speedup:.1f}x), identical output: {identical}"
+        )
+        if not identical:
+            self.stderr.write(self.style.ERROR(f"{name}: rendered output differs"))
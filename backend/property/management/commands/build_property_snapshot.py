@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from property.snapshot import build_snapshot, get_snapshot_root
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precompressed snapshot of available listings (also rebuilt automatically on every change)"
+
+    def handle(self, *args, **options):
+        size = build_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Snapshot written to {get_snapshot_root()} ({size} bytes uncompressed)"))
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:46
+
+from django.db import migrations, models
+
+# frozen copy of property.amenities as of this migration: bit positions of AMENITIES and the
+# name normalization, so later edits to that module cannot change what this backfill writes
+AMENITIES = (
+    'wifi', 'aircon', 'parking', 'swimming_pool', 'gym', 'balcony', 'security', 'garden',
+    'smart_home', 'pet_friendly', 'washing_machine', 'dryer', 'kitchen',
+)
+AMENITY_BITS = {name: 1 << position for position, name in enumerate(AMENITIES)}
+ALIASES = {
+    'air_conditioning': 'aircon',
+    'wi_fi': 'wifi',
+}
+
+
+def normalize_amenity(name):
+    normalized = '_'.join(str(name).strip().lower().replace('-', ' ').split())
+    return ALIASES.get(normalized, normalized)
+
+
+def amenity_mask(value):
+    # amenities are stored either as a list of names or as a dict of flags
+    if not value:
+        return 0
+    if isinstance(value, dict):
+        names = {normalize_amenity(name) for name, present in value.items() if present}
+    else:
+        if isinstance(value, str):
+            value = value.split(',')
+        names = {normalize_amenity(name) for name in value if str(name).strip()}
+    mask = 0
+    for name in names:
+        mask |= AMENITY_BITS.get(name, 0)
+    return mask
+
+
+def backfill_amenity_mask(apps, schema_editor):
+    # one UPDATE per distinct mask (and per 500 ids) rather than one per row
+    Property = apps.get_model('property', 'Property')
+    ids_by_mask = {}
+    for pk, amenities in Property.objects.values_list('id', 'amenities').iterator(chunk_size=2000):
+        mask = amenity_mask(amenities)
+        if mask:
+            ids_by_mask.setdefault(mask, []).append(pk)
+    for mask, ids in ids_by_mask.items():
+        for start in range(0, len(ids), 500):
+            Property.objects.filter(id__in=ids[start:start + 500]).update(amenity_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0023_property_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='amenity_mask',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_amenity_mask, migrations.RunPython.noop),
+    ]
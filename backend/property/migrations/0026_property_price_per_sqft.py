@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:01
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Round
+
+
+def backfill_price_per_sqft(apps, schema_editor):
+    # a single set-based UPDATE; price is cast first so SQLite does not divide integers
+    Property = apps.get_model('property', 'Property')
+    Property.objects.filter(square_feet__gt=0).update(
+        price_per_sqft=Round(Cast('price', FloatField()) / F('square_feet'), 2),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0025_property_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_avail_bedrooms_idx',
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='price_per_sqft',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('status', 'available')), fields=['bedrooms', 'created_at'], name='property_avail_bedrooms_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price'], name='property_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['bedrooms', 'created_at'], name='property_bedrooms_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price_per_sqft'], name='property_price_per_sqft_idx'),
+        ),
+        migrations.RunPython(backfill_price_per_sqft, migrations.RunPython.noop),
+    ]
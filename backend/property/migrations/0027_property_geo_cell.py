@@ -0,0 +1,50 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:03
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+
+# frozen copy of property.geo.geo_cell as of this migration, so later edits to the grid cannot
+# change what this backfill writes (cells numbered row by row over 0.01 degree squares)
+CELL_DEGREES = 0.01
+GRID_COLUMNS = round(360 / CELL_DEGREES)
+
+
+def geo_cell(latitude, longitude):
+    row = math.floor((float(latitude) + 90) / CELL_DEGREES)
+    column = min(math.floor((float(longitude) + 180) / CELL_DEGREES), GRID_COLUMNS - 1)
+    return row * GRID_COLUMNS + column
+
+
+def backfill_geo_cell(apps, schema_editor):
+    # one UPDATE per cell (and per 500 ids)
+    Property = apps.get_model('property', 'Property')
+    ids_by_cell = {}
+    rows = Property.objects.filter(latitude__isnull=False, longitude__isnull=False).values_list('id', 'latitude', 'longitude')
+    for pk, latitude, longitude in rows.iterator(chunk_size=2000):
+        ids_by_cell.setdefault(geo_cell(latitude, longitude), []).append(pk)
+    for cell, ids in ids_by_cell.items():
+        for start in range(0, len(ids), 500):
+            Property.objects.filter(id__in=ids[start:start + 500]).update(geo_cell=cell)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0026_property_price_per_sqft'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='geo_cell',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['geo_cell'], name='property_geo_cell_idx'),
+        ),
+        migrations.RunPython(backfill_geo_cell, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:15
+
+from django.db import migrations, models
+from django.db.models import FloatField, IntegerField
+from django.db.models.functions import Cast, Round
+
+
+def backfill_microdegrees(apps, schema_editor):
+    # set-based: one UPDATE per table, rounded to the nearest microdegree as in geo.microdegrees()
+    for model_name in ('Property', 'PropertyRequest'):
+        apps.get_model('property', model_name).objects.update(
+            lat_e6=Cast(Round(Cast('latitude', FloatField()) * 1000000), IntegerField()),
+            lng_e6=Cast(Round(Cast('longitude', FloatField()) * 1000000), IntegerField()),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0027_property_geo_cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='lat_e6',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='lng_e6',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='propertyrequest',
+            name='lat_e6',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='propertyrequest',
+            name='lng_e6',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_microdegrees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# bit positions of property.amenities.AMENITIES, which is append-only
+AMENITIES = (
+    'wifi', 'aircon', 'parking', 'swimming_pool', 'gym', 'balcony', 'security', 'garden',
+    'smart_home', 'pet_friendly', 'washing_machine', 'dryer', 'kitchen',
+)
+
+
+def backfill_amenity_rows(apps, schema_editor):
+    Property = apps.get_model('property', 'Property')
+    PropertyAmenity = apps.get_model('property', 'PropertyAmenity')
+    rows = []
+    for pk, mask in Property.objects.filter(amenity_mask__gt=0).values_list('id', 'amenity_mask').iterator(chunk_size=2000):
+        rows += [PropertyAmenity(property_id=pk, amenity=name) for bit, name in enumerate(AMENITIES) if mask & (1 << bit)]
+        if len(rows) >= 5000:
+            PropertyAmenity.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    PropertyAmenity.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0028_property_coordinates_e6'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='property',
+            name='amenity_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PropertyAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.CharField(max_length=32)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='amenity_rows', to='property.property')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('amenity', 'property'), name='property_amenity_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_amenity_rows, migrations.RunPython.noop),
+    ]
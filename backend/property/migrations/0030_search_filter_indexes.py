@@ -0,0 +1,39 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0029_property_amenity_rows'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_avail_type_price_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_avail_bathrooms_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_avail_town_idx',
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['property_type', 'status', 'price'], name='property_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['town', 'status', 'price'], name='property_town_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['bathrooms', 'status', 'price'], name='property_bathrooms_status_idx'),
+        ),
+    ]
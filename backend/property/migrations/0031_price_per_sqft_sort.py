@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 21:15
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_price_per_sqft_sort(apps, schema_editor):
+    # rows without a price per square foot keep the field default, which sorts them last
+    Property = apps.get_model('property', 'Property')
+    Property.objects.filter(price_per_sqft__isnull=False).update(price_per_sqft_sort=models.F('price_per_sqft'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0030_search_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_price_per_sqft_idx',
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='price_per_sqft_sort',
+            field=models.DecimalField(decimal_places=2, default=Decimal('9999999999.99'), editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_price_per_sqft_sort, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price_per_sqft_sort'], name='property_price_per_sqft_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+from rest_framework.exceptions import ValidationError
+
+from .pagination import SORT_ORDERINGS
+
+
+# columns every sparse queryset keeps loaded: the primary key, and created_at because the
+# cursor paginator reads it from the last row of a page to build the `next` cursor
+ALWAYS_LOADED = ('id', 'created_at')
+
+
+class SparseFieldsetMixin:
+    """
+        Lets clients choose the serialized fields of a Property endpoint with
+        ?fields=id,title,price or ?exclude=description,amenities
+
+        The same selection narrows the SQL: model columns that are not serialized are
+        left out of the SELECT with .only()/.defer(), and the images prefetch is skipped
+        when `images` is not requested.
+    """
+
+    def get_sparse_fieldset(self):
+        if hasattr(self, '_sparse_fieldset'):
+            return self._sparse_fieldset
+
+        fields = exclude = None
+        request = getattr(self, 'request', None)
+        if request is not None and not getattr(self, 'swagger_fake_view', False):
+            available = set(self.get_serializer_class()().fields)
+            fields = self._parse_field_list('fields', available)
+            exclude = self._parse_field_list('exclude', available)
+
+        self._sparse_fieldset = (fields, exclude)
+        return self._sparse_fieldset
+
+    def _parse_field_list(self, param, available):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({param: f"Unknown field(s): {', '.join(unknown)}"})
+        return names
+
+    def get_serialized_field_names(self):
+        fields, exclude = self.get_sparse_fieldset()
+        names = set(fields) if fields is not None else set(self.get_serializer_class()().fields)
+        return names - set(exclude or ())
+
+    def get_serializer(self, *args, **kwargs):
+        fields, exclude = self.get_sparse_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if exclude is not None:
+            kwargs.setdefault('exclude', exclude)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, exclude = self.get_sparse_fieldset()
+        if fields is None and exclude is None:
+            return queryset
+
+        names = self.get_serialized_field_names()
+        if 'images' not in names:
+            queryset = queryset.prefetch_related(None)
+
+        model_columns = {field.name for field in queryset.model._meta.concrete_fields}
+        # the cursor also reads the column the page is sorted by
+        loaded = set(ALWAYS_LOADED)
+        if hasattr(self, 'get_ordering'):
+            loaded |= {name.lstrip('-') for name in self.get_ordering()} & model_columns
+        if fields is not None:
+            return queryset.only(*(model_columns & names), *loaded)
+        return queryset.defer(*(model_columns & set(exclude) - loaded))
+
+
+class SortMixin:
+    """
+        ?sort=newest|price_asc|price_desc|bedrooms|price_per_sqft on a cursor-paginated Property list.
+        PropertyCursorPagination asks the view for its ordering (see pagination.SORT_ORDERINGS).
+    """
+    default_sort = 'newest'
+
+    def get_sort(self):
+        sort = self.request.query_params.get('sort') or self.default_sort
+        if sort not in SORT_ORDERINGS:
+            raise ValidationError({'sort': f"Unknown sort: {sort}. Choose from {', '.join(SORT_ORDERINGS)}."})
+        return sort
+
+    def get_ordering(self):
+        return SORT_ORDERINGS[self.get_sort()]
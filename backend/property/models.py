@@ -1,8 +1,16 @@
+from decimal import Decimal
+
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.db.models import JSONField 
 
 from account.models import User
+from .amenities import AMENITIES, amenity_mask, amenity_names
+from .geo import geo_cell, microdegrees
+
+# price_per_sqft_sort of listings without a floor area: above any real price per square foot
+# (price tops out at 99,999,999.99), so they sort after every other listing
+PRICE_PER_SQFT_UNKNOWN = Decimal('9999999999.99')
 
 def validate_non_negative(value):
     if value < 0:
@@ -36,39 +44,112 @@ class Property(models.Model):
     bedrooms = models.IntegerField(default=0, validators=[validate_non_negative])
     bathrooms = models.IntegerField(default=0, validators=[validate_non_negative])
     square_feet = models.IntegerField(default=0, validators=[validate_non_negative])
+    # derived from price and square_feet on save, stored so that sorting by it can use an index;
+    # null when the floor area is unknown
+    price_per_sqft = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True, editable=False)
+    # price_per_sqft, or PRICE_PER_SQFT_UNKNOWN where that is null: the non-null key ?sort=price_per_sqft
+    # orders and pages by, so listings without a floor area come last instead of dropping out
+    price_per_sqft_sort = models.DecimalField(max_digits=12, decimal_places=2, default=PRICE_PER_SQFT_UNKNOWN, editable=False)
     property_type = models.CharField(max_length=20, choices=PROPERTY_TYPES, default='HDB')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
     amenities = models.JSONField(default=list, blank=True, null=True)
+    # bitmask of the known amenities, derived from `amenities` on save (see amenities.py); read by
+    # the in-memory search index and saved-search matching, while SQL filters go through PropertyAmenity
+    amenity_mask = models.BigIntegerField(default=0, editable=False)
     description = models.TextField(blank=True, null=True)
     latitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
     longitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    # grid cell of (latitude, longitude), derived on save, for viewport queries (see geo.py)
+    geo_cell = models.BigIntegerField(blank=True, null=True, editable=False)
+    # latitude / longitude in integer microdegrees, derived on save, for bulk geometry (see geo.py)
+    lat_e6 = models.IntegerField(blank=True, null=True, editable=False)
+    lng_e6 = models.IntegerField(blank=True, null=True, editable=False)
     # image = models.ImageField(upload_to='property_images/', blank=True, null=True)
     # video_url = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination: WHERE (created_at, id) < cursor ORDER BY created_at DESC, id DESC
+            models.Index(fields=['-created_at', '-id'], name='property_created_id_idx'),
+            # read-model sync (readmodels.py): rows updated since the last sync
+            models.Index(fields=['updated_at'], name='property_updated_idx'),
+            # an owner's listings, newest first (UserPropertiesView, account views)
+            models.Index(fields=['owner', '-created_at', '-id'], name='property_owner_created_idx'),
+            # search filters (search.views.PropertySearchView), each driving its query through the
+            # selective() hint of search/hints.py. Range filters have a partial index over available
+            # listings (what searches default to) next to the full one used by the ?sort= orders
+            # below; equality filters lead an index with status second, which ?status=all uses too.
+            models.Index(
+                fields=['-created_at', '-id'], condition=models.Q(status='available'),
+                name='property_avail_created_idx',
+            ),
+            models.Index(fields=['price'], condition=models.Q(status='available'), name='property_avail_price_idx'),
+            models.Index(
+                fields=['bedrooms', 'created_at'], condition=models.Q(status='available'),
+                name='property_avail_bedrooms_idx',
+            ),
+            models.Index(fields=['property_type', 'status', 'price'], name='property_type_status_idx'),
+            models.Index(fields=['town', 'status', 'price'], name='property_town_status_idx'),
+            models.Index(fields=['bathrooms', 'status', 'price'], name='property_bathrooms_status_idx'),
+            # ?sort= orders (property.pagination.SORT_ORDERINGS), each read straight off an index
+            models.Index(fields=['price'], name='property_price_idx'),
+            models.Index(fields=['bedrooms', 'created_at'], name='property_bedrooms_created_idx'),
+            models.Index(fields=['price_per_sqft_sort'], name='property_price_per_sqft_idx'),
+            # map viewports: one range scan per grid row of the bounding box
+            models.Index(fields=['geo_cell'], name='property_geo_cell_idx'),
+        ]
 
     def set_default_amenities(self):
-        return {
-            'wifi': False,
-            'aircon': False,
-            'parking': False,
-            'swimming_pool': False,
-            'gym': False,
-            'balcony': False,
-            'security': False,
-            'garden': False,
-            'smart_home': False,
-            'pet_friendly': False,
-            'washing_machine': False,
-            'dryer': False,
-            'kitchen': False,
-        }
+        return {name: False for name in AMENITIES}
 
     def save(self, *args, **kwargs):
         if not self.amenities:
             self.amenities = self.set_default_amenities()
+        self.amenity_mask = amenity_mask(self.amenities)
+        self.price_per_sqft = self.compute_price_per_sqft()
+        self.price_per_sqft_sort = PRICE_PER_SQFT_UNKNOWN if self.price_per_sqft is None else self.price_per_sqft
+        self.geo_cell = geo_cell(self.latitude, self.longitude)
+        self.lat_e6, self.lng_e6 = microdegrees(self.latitude), microdegrees(self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            derived = {
+                'amenities': ('amenity_mask',),
+                'price': ('price_per_sqft', 'price_per_sqft_sort'),
+                'square_feet': ('price_per_sqft', 'price_per_sqft_sort'),
+                'latitude': ('geo_cell', 'lat_e6'),
+                'longitude': ('geo_cell', 'lng_e6'),
+            }
+            kwargs['update_fields'] = {*update_fields, *(
+                column for name in update_fields for column in derived.get(name, ())
+            )}
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        amenities_saved = update_fields is None or 'amenities' in update_fields
+        if amenities_saved and self.amenity_mask != getattr(self, '_saved_amenity_mask', None):
+            self.sync_amenity_rows(adding)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # save() only rewrites the PropertyAmenity rows when the mask changed since loading
+        instance._saved_amenity_mask = instance.__dict__.get('amenity_mask')
+        return instance
+
+    def sync_amenity_rows(self, adding=False):
+        names = amenity_names(self.amenity_mask)
+        if not adding:
+            self.amenity_rows.exclude(amenity__in=names).delete()
+        PropertyAmenity.objects.bulk_create(
+            [PropertyAmenity(property=self, amenity=name) for name in names], ignore_conflicts=True,
+        )
+        self._saved_amenity_mask = self.amenity_mask
+
+    def compute_price_per_sqft(self):
+        if self.price is None or not self.square_feet or self.square_feet <= 0:
+            return None
+        return (Decimal(self.price) / self.square_feet).quantize(Decimal('0.01'))
     
     def delete(self, *args, **kwargs):
          self.favorited_by.clear()
@@ -78,6 +159,18 @@ class Property(models.Model):
         return self.title
     
 
+# one row per known amenity of a property, derived from Property.amenities on save, so that
+# "has wifi" is an index lookup on (amenity, property) rather than a test on every row
+class PropertyAmenity(models.Model):
+    property = models.ForeignKey(Property, related_name='amenity_rows', on_delete=models.CASCADE)
+    amenity = models.CharField(max_length=32)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['amenity', 'property'], name='property_amenity_unique'),
+        ]
+
+
 class PropertyImage(models.Model):
     property = models.ForeignKey(Property, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='property_images/')
@@ -125,6 +218,9 @@ class PropertyRequest(models.Model):
     description = models.TextField(blank=True, null=True)
     latitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
     longitude = models.DecimalField(max_digits=20, decimal_places=14, blank=True, null=True)
+    # latitude / longitude in integer microdegrees, derived on save (see geo.py)
+    lat_e6 = models.IntegerField(blank=True, null=True, editable=False)
+    lng_e6 = models.IntegerField(blank=True, null=True, editable=False)
     
     request_type = models.CharField(
         max_length=20,
@@ -164,6 +260,7 @@ class PropertyRequest(models.Model):
             self.latitude = self.property.latitude
             self.longitude = self.property.longitude
         # For update request, do not override the snapshot fields.
+        self.lat_e6, self.lng_e6 = microdegrees(self.latitude), microdegrees(self.longitude)
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,62 @@
+import threading
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from .cache import get_list_generation
+from .geo import EARTH_RADIUS_M, coordinate_arrays, to_radians
+from .models import Property
+
+
+# Nearest-listing lookups over the coordinates of available properties.
+#
+# A BallTree with the haversine metric is built over (lat_e6, lng_e6) in radians, so a
+# k-nearest query costs O(log n) instead of a distance computation per listing. The tree and the
+# ids it indexes form one immutable snapshot; when the shared list generation (cache.py) moves,
+# the next query builds a new snapshot and replaces the reference in one assignment, so
+# concurrent readers see either the old snapshot or the new one, never a half-built tree.
+
+MAX_NEIGHBOURS = 50
+
+
+class NearbySnapshot:
+    def __init__(self, generation, ids, lat_e6, lng_e6):
+        self.generation = generation
+        self.ids = ids
+        coordinates = np.column_stack((to_radians(lat_e6), to_radians(lng_e6)))
+        self.tree = BallTree(coordinates, metric='haversine') if len(ids) else None
+
+    def query(self, latitude, longitude, k, exclude_id=None):
+        """[(property id, distance in metres)] of the k nearest listings, nearest first."""
+        if self.tree is None:
+            return []
+        # ask for one extra neighbour in case the excluded listing is among them
+        count = min(k + (exclude_id is not None), len(self.ids))
+        distances, positions = self.tree.query(np.radians([[latitude, longitude]]), k=count)
+        neighbours = [
+            (int(self.ids[position]), round(float(distance) * EARTH_RADIUS_M, 1))
+            for distance, position in zip(distances[0], positions[0])
+            if self.ids[position] != exclude_id
+        ]
+        return neighbours[:k]
+
+
+def build_snapshot():
+    generation = get_list_generation()
+    return NearbySnapshot(generation, *coordinate_arrays(Property.objects.filter(status='available')))
+
+
+_snapshot = None
+_build_lock = threading.Lock()
+
+
+def get_nearby_snapshot():
+    """The current snapshot, rebuilt (once, by one thread) after listings changed."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.generation == get_list_generation():
+        return snapshot
+    with _build_lock:
+        if _snapshot is None or _snapshot.generation != get_list_generation():
+            _snapshot = build_snapshot()
+        return _snapshot
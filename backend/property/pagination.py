@@ -0,0 +1,173 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# ?sort= values of the Property list endpoints and their orderings. Each ordering ends in the
+# primary key, so it is a total order, and is served by an index (see Property.Meta.indexes),
+# so no page needs a sort step. The keyset paginator below encodes every column of the
+# ordering in its cursor; the columns must not be null.
+SORT_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'price_asc': ('price', 'id'),
+    'price_desc': ('-price', '-id'),
+    'bedrooms': ('-bedrooms', '-created_at', '-id'),
+    # listings without a floor area last (Property.price_per_sqft_sort)
+    'price_per_sqft': ('price_per_sqft_sort', 'id'),
+}
+# full-text search results, most relevant first (bm25 rank: lower is better);
+# the rank is annotated by search.fts.full_text_search
+RELEVANCE_ORDERING = ('rank', '-id')
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _invert(ordering):
+    return tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+
+
+def keyset_filter(ordering, values):
+    """
+        Rows strictly after `values` in `ordering`, e.g. for ('-bedrooms', '-created_at', '-id'):
+            bedrooms <= b AND (bedrooms < b
+                               OR bedrooms = b AND created_at < c
+                               OR bedrooms = b AND created_at = c AND id < i)
+        The leading bound on the first column lets the database range-scan the sort index
+        from the cursor instead of testing the OR on every row.
+    """
+    after = Q()
+    equal = Q()
+    for name, value in zip(ordering, values):
+        column = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        after |= equal & Q(**{f'{column}__{lookup}': value})
+        equal &= Q(**{column: value})
+    first = ordering[0].lstrip('-')
+    bound = Q(**{f"{first}__{'lte' if ordering[0].startswith('-') else 'gte'}": values[0]})
+    return bound & after
+
+
+# keyset pagination for every Property list endpoint
+# the cursor is an opaque token holding every ordering column of the last (or, going back,
+# first) row seen, and a page is `WHERE <after the cursor> ORDER BY ... LIMIT page_size + 1`,
+# so page N costs the same as page 1 however many rows tie on the sort column
+# views with a get_ordering() method (SortMixin) choose the ordering per request
+class PropertyCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        if hasattr(view, 'get_ordering'):
+            return tuple(view.get_ordering())
+        return self.ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        page_size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request, queryset.model)
+
+        # a `previous` cursor walks the inverted ordering from the first row of the later page
+        ordering = _invert(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(keyset_filter(ordering, values))
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else values is not None
+        has_previous = has_more if reverse else values is not None
+        if rows:
+            self.next_values = self.row_values(rows[-1]) if has_next else None
+            self.previous_values = self.row_values(rows[0]) if has_previous else None
+        else:
+            # nothing left on this side of the cursor: only the way back remains
+            self.next_values = values if reverse else None
+            self.previous_values = values if not reverse and values is not None else None
+        return rows
+
+    def row_values(self, row):
+        return [getattr(row, name.lstrip('-')) for name in self.ordering]
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            encoded, reverse = data['v'], bool(data['r'])
+            if len(encoded) != len(self.ordering):
+                raise ValueError('cursor does not match the ordering')
+            values = []
+            for name, value in zip(self.ordering, encoded):
+                try:
+                    field = model._meta.get_field(name.lstrip('-'))
+                except FieldDoesNotExist:
+                    values.append(value)  # an annotation such as the search rank
+                else:
+                    values.append(field.to_python(value))
+        except (TypeError, ValueError, KeyError, UnicodeError, DjangoValidationError):
+            raise NotFound('Invalid cursor')
+        if None in values:
+            raise NotFound('Invalid cursor')
+        return values, reverse
+
+    def encode_cursor(self, values, reverse):
+        data = {'v': [_encode_value(value) for value in values], 'r': reverse}
+        token = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if self.next_values is None:
+            return None
+        return self.encode_cursor(self.next_values, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_values is None:
+            return None
+        return self.encode_cursor(self.previous_values, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
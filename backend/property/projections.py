@@ -0,0 +1,126 @@
+from django.core.files.storage import default_storage
+from django.db.models import OuterRef, Subquery
+
+from .models import Property, PropertyImage
+
+
+# Compact read-only projections of Property for the listing grid and the map.
+# They are built straight from values_list() rows, skipping model instantiation
+# and ModelSerializer field machinery entirely.
+
+CARD_FIELDS = ('id', 'title', 'price', 'price_per_sqft', 'bedrooms', 'latitude', 'longitude', 'thumbnail')
+MAP_PIN_FIELDS = ('id', 'title', 'price', 'property_type', 'location', 'latitude', 'longitude', 'thumbnail')
+
+# 6 decimal places is ~0.1m, plenty for a map marker
+COORDINATE_PRECISION = 6
+
+
+def with_thumbnail(queryset):
+    """
+        Annotate each property with the storage name of its first image,
+        resolved in the same SELECT as a correlated subquery.
+    """
+    first_image = PropertyImage.objects.filter(
+        property=OuterRef('pk'),
+    ).order_by('created_at', 'id').values('image')[:1]
+    return queryset.annotate(thumbnail=Subquery(first_image))
+
+
+def media_url_builder(request):
+    """
+        Return a function turning a stored image name into an absolute URL.
+        The scheme and host are resolved once, not once per row.
+    """
+    base_url = request.build_absolute_uri('/').rstrip('/') if request else ''
+
+    def build(name):
+        return base_url + default_storage.url(name) if name else None
+
+    return build
+
+
+def coordinate(value, precision=COORDINATE_PRECISION):
+    return round(float(value), precision) if value is not None else None
+
+
+def card_rows(queryset):
+    """
+        Named rows for the card projection. created_at and price_per_sqft_sort are selected as
+        well because the cursor paginator reads the sort columns from the last row of each page.
+    """
+    fields = [name for name in CARD_FIELDS if name != 'thumbnail']
+    return with_thumbnail(queryset).values_list(*fields, 'thumbnail', 'created_at', 'price_per_sqft_sort', named=True)
+
+
+def serialize_cards(rows, request):
+    media_url = media_url_builder(request)
+    return [
+        {
+            'id': row.id,
+            'title': row.title,
+            'price': str(row.price),
+            'price_per_sqft': str(row.price_per_sqft) if row.price_per_sqft is not None else None,
+            'bedrooms': row.bedrooms,
+            'latitude': coordinate(row.latitude),
+            'longitude': coordinate(row.longitude),
+            'thumbnail': media_url(row.thumbnail),
+        }
+        for row in rows
+    ]
+
+
+def nearby_cards(neighbours, request):
+    """Cards for [(property id, distance in metres)], in the given order and with `distance_m`."""
+    distances = dict(neighbours)
+    rows = {row.id: row for row in card_rows(Property.objects.filter(id__in=distances))}
+    cards = serialize_cards([rows[pk] for pk in distances if pk in rows], request)
+    for card in cards:
+        card['distance_m'] = distances[card['id']]
+    return cards
+
+
+def cluster_columns(clusters, precision=COORDINATE_PRECISION):
+    """Columnar form of ClusterIndex.clusters(), like map_pin_columns."""
+    latitude, longitude, count, min_price, max_price, ids = map(list, zip(*clusters)) if clusters else ([],) * 6
+    return {
+        'count': len(clusters),
+        'latitude': [round(value, precision) for value in latitude],
+        'longitude': [round(value, precision) for value in longitude],
+        'size': count,
+        'min_price': [str(price) for price in min_price],
+        'max_price': [str(price) for price in max_price],
+        'id': ids,
+    }
+
+
+def map_pin_columns(queryset, request, limit=None, precision=COORDINATE_PRECISION):
+    """
+        Columnar map-pin feed: one array per field instead of one object per pin,
+        so field names are sent once rather than once per listing.
+        At most `limit` pins, with coordinates rounded to `precision` decimal places.
+    """
+    queryset = with_thumbnail(queryset.filter(latitude__isnull=False, longitude__isnull=False))
+    fields = [name for name in MAP_PIN_FIELDS if name != 'thumbnail']
+    rows = queryset.values_list(*fields, 'thumbnail')
+    rows = list(rows[:limit] if limit is not None else rows)
+
+    columns = dict(zip(MAP_PIN_FIELDS, map(list, zip(*rows)))) if rows else {name: [] for name in MAP_PIN_FIELDS}
+    media_url = media_url_builder(request)
+    columns['price'] = [str(price) for price in columns['price']]
+    columns['latitude'] = [coordinate(value, precision) for value in columns['latitude']]
+    columns['longitude'] = [coordinate(value, precision) for value in columns['longitude']]
+    columns['thumbnail'] = [media_url(name) for name in columns['thumbnail']]
+    return {'count': len(rows), **columns}
+
+
+def capped_map_pin_columns(queryset, request, max_pins, precision=COORDINATE_PRECISION):
+    """
+        map_pin_columns for at most `max_pins` pins, with `truncated` telling whether the
+        queryset holds more; one extra row is read to find out.
+    """
+    pins = map_pin_columns(queryset, request, limit=max_pins + 1, precision=precision)
+    truncated = pins['count'] > max_pins
+    if truncated:
+        pins = {name: values[:max_pins] for name, values in pins.items() if name != 'count'}
+        pins['count'] = max_pins
+    return {**pins, 'truncated': truncated}
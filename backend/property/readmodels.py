@@ -0,0 +1,105 @@
+import threading
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .cache import get_list_generation
+from .models import Property
+
+
+# Shared upkeep of the in-process read models over Property (search/engine.py,
+# search/autocomplete.py, search/fuzzy.py, clustering.py).
+#
+# Each process builds its own copy on first use. Saves and deletes in the process reach it
+# through the Property signals (apply / remove). Writes made by other processes are detected by
+# the shared list generation (cache.py): when it moves, sync() re-reads the rows updated since
+# the last sync and falls back to a full rebuild if the number of tracked rows no longer matches
+# the database, since deletions leave no updated_at trace.
+
+# rows updated this long before the last sync are fetched again, covering transactions that
+# committed after a later updated_at was already seen
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+class SyncedIndex:
+    """
+        Base class of the read models. Subclasses hold rows of `tracked()` and implement:
+            fields              Property fields read per row (rows are values_list named tuples)
+            _clear()            drop every row
+            _upsert(row)        add or replace one row; rows leaving `tracked()` are dropped
+            _discard(id)        drop one row
+            _size()             number of rows held
+        Rows handed to _upsert may also be Property instances (apply()). The hooks run under `lock`.
+    """
+    fields = ('id',)
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.generation = None
+        self.synced_at = None
+
+    def tracked(self):
+        """The rows the index holds, counted against _size() after a sync."""
+        return Property.objects.all()
+
+    def fetch(self, queryset):
+        return list(queryset.values_list(*self.fields, named=True))
+
+    def rebuild(self):
+        generation = get_list_generation()
+        started = timezone.now()
+        rows = self.fetch(self.tracked())
+        with self.lock:
+            self._load(rows)
+            self.generation = generation
+            self.synced_at = started
+
+    def sync(self):
+        """
+            Catch up with writes from other processes: re-read rows updated since the last sync,
+            and rebuild from scratch if rows disappeared.
+        """
+        generation = get_list_generation()
+        if self.generation is None:
+            return self.rebuild()
+        if generation == self.generation:
+            return
+
+        started = timezone.now()
+        rows = self.fetch(Property.objects.filter(updated_at__gte=self.synced_at - SYNC_OVERLAP))
+        with self.lock:
+            for row in rows:
+                self._upsert(row)
+            held = self._size()
+        if self.tracked().count() != held:
+            return self.rebuild()
+        with self.lock:
+            self.generation = generation
+            self.synced_at = started
+
+    def apply(self, property):
+        """Reflect one saved Property (called from post_save in this process)."""
+        with self.lock:
+            self._upsert(property)
+
+    def remove(self, property_id):
+        with self.lock:
+            self._discard(property_id)
+
+    def _load(self, rows):
+        # replace the contents; subclasses may bulk load instead
+        self._clear()
+        for row in rows:
+            self._upsert(row)
+
+    def _clear(self):
+        raise NotImplementedError
+
+    def _upsert(self, row):
+        raise NotImplementedError
+
+    def _discard(self, property_id):
+        raise NotImplementedError
+
+    def _size(self):
+        raise NotImplementedError
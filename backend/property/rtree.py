@@ -0,0 +1,57 @@
+import math
+
+
+# A static, bulk-loaded R-tree (Sort-Tile-Recursive packing) over bounding boxes.
+#
+# Items are sorted by the x of their box centre and cut into about sqrt(n / capacity) vertical
+# slices; each slice is sorted by y and packed into nodes of `capacity` entries. The nodes are
+# packed the same way, level by level, until one root remains. Packed nodes are full and barely
+# overlap, so a point query descends only a few paths: O(log n) boxes tested instead of n.
+#
+# Entries are tuples (min_x, min_y, max_x, max_y, payload); in inner nodes the payload is the
+# list of child entries.
+
+NODE_CAPACITY = 8
+
+
+def _pack(entries, capacity):
+    slice_count = max(1, math.ceil(math.sqrt(math.ceil(len(entries) / capacity))))
+    slice_size = math.ceil(len(entries) / slice_count)
+    entries = sorted(entries, key=lambda entry: entry[0] + entry[2])
+    nodes = []
+    for start in range(0, len(entries), slice_size):
+        column = sorted(entries[start:start + slice_size], key=lambda entry: entry[1] + entry[3])
+        for first in range(0, len(column), capacity):
+            children = column[first:first + capacity]
+            nodes.append((
+                min(child[0] for child in children), min(child[1] for child in children),
+                max(child[2] for child in children), max(child[3] for child in children),
+                children,
+            ))
+    return nodes
+
+
+class STRtree:
+    def __init__(self, items, capacity=NODE_CAPACITY):
+        """items: iterable of ((min_x, min_y, max_x, max_y), payload)."""
+        entries = [(*box, payload) for box, payload in items]
+        self.size = len(entries)
+        self.height = 0
+        while len(entries) > capacity:
+            entries = _pack(entries, capacity)
+            self.height += 1
+        self.root = entries  # leaf entries when height is 0, otherwise the top nodes
+
+    def query_point(self, x, y):
+        """Payloads of the items whose box contains (x, y)."""
+        found = []
+        stack = [(self.root, self.height)]
+        while stack:
+            entries, height = stack.pop()
+            for min_x, min_y, max_x, max_y, payload in entries:
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    if height:
+                        stack.append((payload, height - 1))
+                    else:
+                        found.append(payload)
+        return found
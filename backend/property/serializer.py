@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from .models import *
+from .geo import parse_bbox
+from .nearby import MAX_NEIGHBOURS
         
 class PropertySerializer(serializers.ModelSerializer):
     images = serializers.SerializerMethodField()
@@ -7,25 +9,38 @@ class PropertySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Property
-        fields = '__all__'
+        exclude = ['amenity_mask', 'price_per_sqft_sort', 'geo_cell', 'lat_e6', 'lng_e6']  # derived columns, internal to filtering and geometry
+
+    def __init__(self, *args, **kwargs):
+        # optional sparse fieldset, e.g. PropertySerializer(properties, many=True, fields=['id', 'title'])
+        fields = kwargs.pop('fields', None)
+        exclude = kwargs.pop('exclude', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
     
     def get_images(self, obj):
-        request = self.context.get('request')
-        images = obj.images.all()
-        image_urls = []
-
-        for image in images:
-            image_url = request.build_absolute_uri(image.image.url)
-            print(f"Image URL: {image_url}")
-            image_urls.append(image_url)
+        # views prefetch `images`, so this reads the prefetched rows instead of querying per property
+        base_url = self.get_media_base_url()
+        return [base_url + image.image.url for image in obj.images.all()]
 
-        return image_urls
+    def get_media_base_url(self):
+        # scheme + host resolved once per serializer, not once per image
+        # (for list views the child serializer is shared across every row)
+        if not hasattr(self, '_media_base_url'):
+            request = self.context.get('request')
+            self._media_base_url = request.build_absolute_uri('/').rstrip('/') if request else ''
+        return self._media_base_url
         
 class UpdatePropertySerializer(serializers.ModelSerializer):
     amenities = serializers.ListField(child=serializers.CharField(), required=False)
     class Meta:
         model = Property
-        fields = '__all__'
+        exclude = ['amenity_mask', 'price_per_sqft_sort', 'geo_cell', 'lat_e6', 'lng_e6']  # derived columns, internal to filtering and geometry
         extra_kwargs = {
             'title': {'required': False},
             'block': {'required': False},
@@ -51,7 +66,7 @@ class PropertyRequestSerializer(serializers.ModelSerializer):
     # images = serializers.SerializerMethodField()
     class Meta:
         model = PropertyRequest
-        fields = '__all__'
+        exclude = ['lat_e6', 'lng_e6']  # derived from latitude / longitude
         read_only_fields = ['created_at', 'user']
         extra_kwargs = {
             'user': {'read_only': True},
@@ -98,7 +113,7 @@ class UpdatePropertyRequestSerializer(serializers.ModelSerializer):
     amenities = serializers.ListField(child=serializers.CharField(), required=False)
     class Meta:
         model = PropertyRequest
-        fields = '__all__'
+        exclude = ['lat_e6', 'lng_e6']  # derived from latitude / longitude
         extra_kwargs = {
             'property': {'required': False},
             'title': {'required': False},
@@ -120,3 +135,32 @@ class UpdatePropertyRequestSerializer(serializers.ModelSerializer):
             'longitude': {'required': False},
         }
         read_only_fields = ['created_at', 'user']
+
+
+# query-string parameters of the map pin feed: an optional ?bbox=south,west,north,east
+class MapPinSerializer(serializers.Serializer):
+    bbox = serializers.CharField(required=False)
+
+    def validate_bbox(self, value):
+        try:
+            return parse_bbox(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+
+
+# query-string parameters of the map endpoints: ?bbox=south,west,north,east&zoom=
+class MapViewportSerializer(MapPinSerializer):
+    bbox = serializers.CharField()
+    zoom = serializers.IntegerField(min_value=0, max_value=22)
+
+
+# query-string parameters of the nearby endpoints
+class NearbySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90, required=False)
+    lng = serializers.FloatField(min_value=-180, max_value=180, required=False)
+    k = serializers.IntegerField(min_value=1, max_value=MAX_NEIGHBOURS, default=10)
+
+    def validate(self, attrs):
+        if self.context.get('require_point') and ('lat' not in attrs or 'lng' not in attrs):
+            raise serializers.ValidationError('lat and lng are required.')
+        return attrs
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .cache import invalidate_property
+from .clustering import get_loaded_cluster_index
+from .snapshot import schedule_snapshot
+from .models import Property, PropertyImage
+
+# sent by AcceptPropertyRequestView once an approved request has created or updated a listing,
+# with instance=<Property> and created=<bool>; listeners run inside the accepting transaction
+property_published = Signal()
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_cached_property(sender, instance, **kwargs):
+    invalidate_property(instance.pk)
+    schedule_snapshot()
+
+
+# keep this process's cluster index current (other processes catch up through its sync())
+@receiver(post_save, sender=Property)
+def cluster_saved_property(sender, instance, **kwargs):
+    index = get_loaded_cluster_index()
+    if index is not None:
+        transaction.on_commit(lambda: index.apply(instance))
+
+
+@receiver(post_delete, sender=Property)
+def uncluster_deleted_property(sender, instance, **kwargs):
+    index = get_loaded_cluster_index()
+    property_id = instance.pk  # cleared on the instance once the delete completes
+    if index is not None:
+        transaction.on_commit(lambda: index.remove(property_id))
+
+
+# adding or removing an image changes the serialized property, so move its updated_at forward
+# (the detail validators in conditional.py are derived from updated_at)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+def touch_property_on_image_change(sender, instance, **kwargs):
+    Property.objects.filter(pk=instance.property_id).update(updated_at=timezone.now())
+    invalidate_property(instance.property_id)
+    schedule_snapshot()
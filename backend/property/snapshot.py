@@ -0,0 +1,197 @@
+import gzip
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from backend.renderers import FastJSONRenderer
+
+from .models import Property
+from .serializer import PropertySerializer
+
+try:
+    import brotli
+except ImportError:  # optional: only the .gz snapshot is written without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+# Precomputed snapshot of all available listings, rewritten whenever a Property change commits.
+#
+# Three files are kept side by side in PROPERTY_SNAPSHOT_ROOT:
+#   properties.json, properties.json.gz and (if brotli is installed) properties.json.br
+# They are served as raw bytes by property_snapshot_view, or directly by the front proxy
+# (e.g. nginx `gzip_static on; brotli_static on;` on MEDIA_URL + 'snapshots/'), so most
+# anonymous reads never reach the ORM or the serializer.
+#
+# Image URLs in the snapshot are relative to the site (/media/...) since there is no request.
+#
+# Rebuilds are debounced on a background thread: a committed change only (re)starts a timer, and
+# the snapshot is rebuilt once no change has committed for PROPERTY_SNAPSHOT_DELAY seconds (and at
+# the latest PROPERTY_SNAPSHOT_MAX_DELAY seconds after the first one), so a burst of edits costs one
+# rebuild and no request waits for it. Each process debounces its own changes; management
+# commands that edit listings in bulk call build_snapshot() themselves before exiting.
+
+SNAPSHOT_NAME = 'properties.json'
+# stored encodings, in order of preference when the client accepts several equally
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def get_snapshot_root():
+    return getattr(settings, 'PROPERTY_SNAPSHOT_ROOT', os.path.join(settings.MEDIA_ROOT, 'snapshots'))
+
+
+def get_snapshot_path(encoding=None):
+    return os.path.join(get_snapshot_root(), SNAPSHOT_NAME + ENCODINGS.get(encoding, ''))
+
+
+def render_snapshot():
+    queryset = (
+        Property.objects.filter(status='available')
+        .prefetch_related('images')
+        .order_by('-created_at', '-id')
+    )
+    serializer = PropertySerializer()
+    rows = [serializer.to_representation(property) for property in queryset.iterator(chunk_size=500)]
+    return FastJSONRenderer().render(rows)
+
+
+def _write_atomic(path, content):
+    # write next to the target then rename, so readers see either the old or the new file, never half of one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.' + os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def build_snapshot():
+    """
+        Render the snapshot and atomically replace the plain, gzip and brotli files.
+        Returns the size in bytes of the uncompressed JSON.
+    """
+    os.makedirs(get_snapshot_root(), exist_ok=True)
+    content = render_snapshot()
+    _write_atomic(get_snapshot_path(), content)
+    _write_atomic(get_snapshot_path('gzip'), gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(get_snapshot_path('br'), brotli.compress(content, quality=11))
+    return len(content)
+
+
+def accepted_encodings(header):
+    """
+        {content-coding: q} of an Accept-Encoding header,
+        e.g. 'gzip, br;q=0' -> {'gzip': 1.0, 'br': 0.0}
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header, available):
+    """
+        The stored encoding to send for an Accept-Encoding header, or None for the plain file.
+        Codings with q=0 are refused; among the rest the highest q wins, ties going to ENCODINGS order.
+    """
+    accepted = accepted_encodings(header or '')
+    default = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for name in ENCODINGS:
+        quality = accepted.get(name, default)
+        if name in available and quality > best_quality:
+            best, best_quality = name, quality
+    # identity is acceptable unless refused, and only preferred when explicitly ranked higher
+    if best is not None and accepted.get('identity', 0.0) > best_quality:
+        return None
+    return best
+
+
+class SnapshotWorker:
+    """Debounces rebuild requests onto a timer thread (see the notes at the top of this module)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.timer = None
+        self.first_request = None
+
+    def request(self):
+        delay = getattr(settings, 'PROPERTY_SNAPSHOT_DELAY', 2.0)
+        max_delay = getattr(settings, 'PROPERTY_SNAPSHOT_MAX_DELAY', 30.0)
+        with self.lock:
+            now = time.monotonic()
+            if self.timer is not None:
+                self.timer.cancel()
+            if self.first_request is None:
+                self.first_request = now
+            self.timer = threading.Timer(max(0.0, min(delay, self.first_request + max_delay - now)), self.run)
+            self.timer.daemon = True
+            self.timer.start()
+
+    @property
+    def pending(self):
+        return self.timer is not None
+
+    def run(self):
+        with self.lock:
+            # a later request or a flush() may have taken over from this timer
+            if threading.current_thread() is not self.timer:
+                return
+            self.timer = self.first_request = None
+        try:
+            self.build()
+        finally:
+            connection.close()  # this thread's own connection
+
+    def flush(self):
+        """Rebuild now if a rebuild is pending; returns whether one was."""
+        with self.lock:
+            if self.timer is None:
+                return False
+            self.timer.cancel()
+            self.timer = self.first_request = None
+        self.build()
+        return True
+
+    def build(self):
+        # one rebuild at a time; a failure is logged, the previous files stay in place
+        with self.build_lock:
+            try:
+                build_snapshot()
+            except Exception:
+                logger.exception("Rebuilding the property snapshot failed")
+
+
+worker = SnapshotWorker()
+
+
+def schedule_snapshot():
+    """
+        Request a debounced rebuild once the current transaction commits; requests only restart
+        the timer, so several changes in one transaction (a property and its images) cost nothing extra.
+    """
+    if getattr(settings, 'PROPERTY_SNAPSHOT_ENABLED', True):
+        transaction.on_commit(worker.request)
@@ -1,3 +1,514 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from account.models import User
+from backend.renderers import FastJSONRenderer, orjson
+from .cache import LIST_GENERATION_KEY, get_cache, get_list_generation, get_stats, invalidate_property
+from .checks import check_shared_cache
+from .models import PRICE_PER_SQFT_UNKNOWN, Property, PropertyImage
+from .clustering import get_cluster_index
+from .nearby import get_nearby_snapshot
+from .snapshot import build_snapshot, get_snapshot_path, negotiate_encoding, worker
+from .towns import TownLocator
+from .views import (
+    NearbyPropertiesView, PropertyCardListView, PropertyClusterView, PropertyDetailView, PropertyListView,
+    PropertyMapPinView, PropertyNearbyView, PropertyViewportView, UserPropertiesView,
+)
+
+
+class PropertyQueryBudgetTests(APITestCase):
+    """Every Property endpoint declares `max_queries`; the count must not grow with the page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='password', name='Owner')
+        cls.token = Token.objects.create(user=cls.user)
+        for i in range(30):
+            property = Property.objects.create(
+                owner=cls.user,
+                title=f'Listing {i}',
+                street_name='Lorong 6 Toa Payoh',
+                location=f'{i} Lorong 6 Toa Payoh',
+                price=2000 + i,
+                square_feet=1000 - i * 10,
+            )
+            PropertyImage.objects.create(property=property, image=f'property_images/{i}-a.png')
+            PropertyImage.objects.create(property=property, image=f'property_images/{i}-b.png')
+        cls.property = property
+
+    def setUp(self):
+        # cached responses would hide the queries being budgeted
+        get_cache().clear()
+
+    def assertWithinBudget(self, view_class, url, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            len(queries), view_class.max_queries,
+            f'{view_class.__name__} ran {len(queries)} queries (budget {view_class.max_queries})',
+        )
+        return response
+
+    def test_property_list(self):
+        response = self.assertWithinBudget(PropertyListView, '/property/all/?page_size=30')
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertEqual(len(response.data['results'][0]['images']), 2)
+        self.assertTrue(response.data['results'][0]['images'][0].startswith('http://testserver/media/'))
+
+    def test_property_detail(self):
+        auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        response = self.assertWithinBudget(PropertyDetailView, f'/property/details/{self.property.id}/', **auth)
+        self.assertEqual(len(response.data['images']), 2)
+        # columns derived on save stay internal
+        internal = {'amenity_mask', 'price_per_sqft_sort', 'geo_cell', 'lat_e6', 'lng_e6'}
+        self.assertFalse(internal & set(response.data))
+        self.assertFalse(internal & set(self.client.get('/property/all/').data['results'][0]))
+
+    def test_owner_properties(self):
+        auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        url = f'/property/details/user/{self.user.id}/?owner_id={self.user.id}&page_size=30'
+        response = self.assertWithinBudget(UserPropertiesView, url, **auth)
+        self.assertEqual(len(response.data['results']), 30)
+
+    def test_sorted_property_list(self):
+        Property.objects.filter(id=self.property.id).update(
+            square_feet=0, price_per_sqft=None, price_per_sqft_sort=PRICE_PER_SQFT_UNKNOWN)
+        for sort, key, reverse in (('price_asc', 'price', False), ('price_desc', 'price', True),
+                                   ('price_per_sqft', 'price_per_sqft', False)):
+            with self.subTest(sort=sort), CaptureQueriesContext(connection) as queries:
+                response = self.assertWithinBudget(PropertyListView, f'/property/all/?sort={sort}&page_size=30')
+                values = [row[key] for row in response.data['results']]
+                # a listing without a price per square foot sorts last
+                self.assertEqual(values, sorted(values, key=lambda value: (value is None, float(value or 0)), reverse=reverse))
+                # the page is read in index order, never sorted afterwards
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {next(q['sql'] for q in queries if 'LIMIT' in q['sql'])}")
+                    self.assertFalse([row for row in cursor.fetchall() if 'TEMP B-TREE' in row[-1]])
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertIsNone(response.data['results'][-1]['price_per_sqft'])
+
+
+    def test_card_list(self):
+        with self.assertNumQueries(PropertyCardListView.max_queries):
+            response = self.client.get('/property/cards/?page_size=30')
+        self.assertEqual(response.status_code, 200)
+        cards = response.data['results']
+        self.assertEqual(len(cards), 30)
+        self.assertEqual(cards[0]['id'], self.property.id)
+        self.assertEqual(cards[0]['thumbnail'], 'http://testserver/media/property_images/29-a.png')
+        self.assertEqual(set(cards[0]), {'id', 'title', 'price', 'price_per_sqft', 'bedrooms', 'latitude', 'longitude', 'thumbnail'})
+        with self.assertNumQueries(PropertyCardListView.max_queries):
+            response = self.client.get('/property/cards/?sort=price_asc&page_size=5')
+        self.assertEqual([card['price'] for card in response.data['results']], [f'{2000 + i}.00' for i in range(5)])
+
+    def test_map_pins(self):
+        pins = [
+            Property.objects.create(owner=self.user, title=f'Pin {i}', street_name='s', location='l', price=1,
+                                    latitude=f'1.30{i}00000000000', longitude='103.80000000000000')
+            for i in range(3)
+        ]
+        response = self.assertWithinBudget(PropertyMapPinView, '/property/map/pins/')
+        # unmapped listings are left out, newest first
+        self.assertEqual(response.data['id'], [pin.id for pin in reversed(pins)])
+        self.assertEqual(response.data['count'], 3)
+        self.assertFalse(response.data['truncated'])
+
+        response = self.assertWithinBudget(PropertyMapPinView, '/property/map/pins/?bbox=1.3005,103.79,1.31,103.81')
+        self.assertEqual(response.data['id'], [pins[2].id, pins[1].id])
+        with mock.patch.object(PropertyMapPinView, 'max_pins', 2):
+            response = self.assertWithinBudget(PropertyMapPinView, '/property/map/pins/')
+        self.assertEqual(response.data['id'], [pins[2].id, pins[1].id])
+        self.assertEqual(len(response.data['latitude']), 2)
+        self.assertTrue(response.data['truncated'])
+        self.assertEqual(self.client.get('/property/map/pins/?bbox=1,2,3').status_code, 400)
+
+    def test_stream(self):
+        with mock.patch('property.views.STREAM_CHUNK_SIZE', 8), CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/property/all/stream/?fields=id,images')
+            rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows[0], {'id': self.property.id, 'images': rows[0]['images']})
+        self.assertEqual(len(rows[0]['images']), 2)
+        # one cursor over the rows, fetched 8 at a time, and one image query per chunk of 8
+        self.assertEqual(len(queries), 1 + 4)
+
+    def test_map_viewport(self):
+        inside = Property.objects.create(owner=self.user, title='Inside', street_name='s', location='l', price=1,
+                                         latitude='1.30500000000000', longitude='103.81000000000000')
+        Property.objects.create(owner=self.user, title='Outside', street_name='s', location='l', price=1,
+                                latitude='1.33500000000000', longitude='103.81000000000000')
+        response = self.assertWithinBudget(PropertyViewportView, '/property/map/viewport/?bbox=1.30,103.80,1.31,103.82&zoom=15')
+        self.assertEqual(response.data['id'], [inside.id])
+        self.assertFalse(response.data['truncated'])
+
+    def test_nearby(self):
+        near = Property.objects.create(owner=self.user, title='Near', street_name='s', location='l', price=1,
+                                       latitude='1.30100000000000', longitude='103.80000000000000')
+        far = Property.objects.create(owner=self.user, title='Far', street_name='s', location='l', price=1,
+                                      latitude='1.31000000000000', longitude='103.80000000000000')
+        get_nearby_snapshot()  # built once per change to the listings, outside the request budget
+        response = self.assertWithinBudget(NearbyPropertiesView, '/property/nearby/?lat=1.30&lng=103.80&k=5')
+        self.assertEqual([card['id'] for card in response.data['results']], [near.id, far.id])
+        self.assertAlmostEqual(response.data['results'][0]['distance_m'], 111.2, delta=0.5)
+        response = self.assertWithinBudget(PropertyNearbyView, f'/property/details/{near.id}/nearby/?k=1')
+        self.assertEqual([card['id'] for card in response.data['results']], [far.id])
+        self.assertEqual(self.client.get('/property/nearby/?lat=1.30').status_code, 400)
+
+    @override_settings(PROPERTY_SNAPSHOT_ENABLED=False)
+    def test_map_clusters(self):
+        cheap, dear, single = (
+            Property.objects.create(owner=self.user, title='Pin', street_name='s', location='l', price=price,
+                                    latitude=latitude, longitude='103.80100000000000')
+            for latitude, price in (('1.30100000000000', 2000), ('1.30200000000000', 3000), ('1.34000000000000', 2500))
+        )
+        index = get_cluster_index()  # built once per change to the listings, outside the request budget
+        url = '/property/map/clusters/?bbox=1.29,103.79,1.35,103.81&zoom=12'
+        response = self.assertWithinBudget(PropertyClusterView, url)
+        clusters = sorted(zip(response.data['size'], response.data['min_price'], response.data['max_price'], response.data['id']))
+        self.assertEqual(clusters, [(1, '2500.00', '2500.00', single.id), (2, '2000.00', '3000.00', None)])
+        # deletions reach the loaded index through signals, without a re-read
+        with self.captureOnCommitCallbacks(execute=True):
+            dear.delete()
+        clusters = sorted(cluster[2:] for cluster in index.clusters(1.29, 103.79, 1.35, 103.81, 12))
+        self.assertEqual(clusters, [(1, 2000, 2000, cheap.id), (1, 2500, 2500, single.id)])
+
+
+@override_settings(PROPERTY_SNAPSHOT_ENABLED=False)
+class PropertyCacheTests(APITestCase):
+    """Cached Property reads: hits skip the database, a committed write moves the generations."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='password', name='Owner')
+        cls.token = Token.objects.create(user=cls.user)
+        cls.property = Property.objects.create(owner=cls.user, title='Listing', street_name='s', location='l', price=2000)
+
+    def setUp(self):
+        get_cache().clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_hit_miss_and_invalidation(self):
+        detail = f'/property/details/{self.property.id}/'
+        # a hit runs the token lookup, plus the updated_at validator for a detail
+        for url, budget in (('/property/all/', 1), (detail, 2)):
+            with self.subTest(url=url):
+                _, missed = self.get(url)
+                response, queries = self.get(url)
+                self.assertLess(queries, missed)
+                self.assertEqual(queries, budget)
+                self.assertEqual(response.data['title'] if url == detail else response.data['results'][0]['title'], 'Listing')
+        self.assertEqual((get_stats()['hits'], get_stats()['misses']), (2, 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.title = 'Renamed'
+            self.property.save()
+        response, _ = self.get('/property/all/')
+        self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+        response, _ = self.get(detail)
+        self.assertEqual(response.data['title'], 'Renamed')
+        self.assertEqual(get_stats()['misses'], 4)
+
+    def test_generation_is_shared(self):
+        # a second file cache over the same (throwaway) directory stands in for another worker process
+        with tempfile.TemporaryDirectory() as directory:
+            files = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}}
+            with override_settings(CACHES=files):
+                other = caches.create_connection('default')
+                self.client.get('/property/all/')
+                seen = other.get(LIST_GENERATION_KEY)
+                self.assertIsNotNone(seen)
+                with self.captureOnCommitCallbacks(execute=True):
+                    Property.objects.create(owner=self.user, title='New', street_name='s', location='l', price=2100)
+                self.assertNotEqual(other.get(LIST_GENERATION_KEY), seen)
+
+    @override_settings(PROPERTY_GENERATION_TIMEOUT=60)
+    def test_generation_expires(self):
+        seen = get_list_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_property()
+        bumped = get_list_generation()
+        self.assertNotEqual(bumped, seen)
+        later = time.time() + 61
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later), \
+                mock.patch('property.cache.time.time_ns', return_value=int(later * 1e9)):
+            # an expired generation is re-seeded from the clock, past every bumped value
+            self.assertGreater(get_list_generation(), bumped)
+
+    def test_list_etag(self):
+        self.client.credentials()
+        for url in ('/property/all/', '/search/'):
+            with self.subTest(url=url):
+                etag = self.get(url)[0]['ETag']
+                # the validator is read from the cache: a revalidation runs no query at all
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.delete()
+        response = self.client.get('/search/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['results'], [])
+
+    def test_detail_etag(self):
+        detail = f'/property/details/{self.property.id}/'
+        response, _ = self.get(detail)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(detail, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # an edit within the same second still changes the validator
+        with self.captureOnCommitCallbacks(execute=True):
+            self.property.title = 'Renamed'
+            self.property.save()
+        response = self.client.get(detail, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Renamed')
+        # a date alone is never enough to answer 304
+        response = self.client.get(detail, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_process_local_backend_is_refused(self):
+        files = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp'}}
+        with override_settings(CACHES=files, PROPERTY_CACHE_PROCESS_LOCAL=False):
+            self.assertEqual(check_shared_cache(None), [])
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=locmem, PROPERTY_CACHE_PROCESS_LOCAL=False):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['property.E001'])
+        with override_settings(CACHES=locmem, PROPERTY_CACHE_PROCESS_LOCAL=True):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class PropertySnapshotTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        cls.listing = Property.objects.create(owner=cls.owner, title='Listed', street_name='s', location='l', price=2000)
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # a long delay, so that nothing is rebuilt behind the test's back
+        settings = override_settings(PROPERTY_SNAPSHOT_ROOT=directory.name, PROPERTY_SNAPSHOT_DELAY=3600)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def read(self, encoding=None):
+        with open(get_snapshot_path(encoding), 'rb') as file:
+            return file.read()
+
+    def test_rebuild_is_debounced(self):
+        build_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            first = Property.objects.create(owner=self.owner, title='First', street_name='s', location='l', price=1)
+            PropertyImage.objects.create(property=first, image='property_images/first.png')
+        with self.captureOnCommitCallbacks(execute=True):
+            Property.objects.create(owner=self.owner, title='Second', street_name='s', location='l', price=1)
+        # the requests only armed the timer; the files are rewritten once, when it fires
+        self.assertTrue(worker.pending)
+        self.assertEqual([row['title'] for row in json.loads(self.read())], ['Listed'])
+        self.assertTrue(worker.flush())
+        self.assertFalse(worker.pending)
+        self.assertEqual([row['title'] for row in json.loads(self.read())], ['Second', 'First', 'Listed'])
+        self.assertEqual(gzip.decompress(self.read('gzip')), self.read())
+
+    def test_served_encodings(self):
+        build_snapshot()
+        plain = self.read()
+        cases = [
+            ('gzip, deflate, br', 'br'),
+            ('gzip, br;q=0', 'gzip'),
+            ('br;q=0.5, gzip;q=0.8', 'gzip'),
+            ('gzip;q=0', None),
+            ('*', 'br'),
+            ('*;q=0', None),
+            ('identity, gzip;q=0.5', None),
+            ('', None),
+        ]
+        for header, encoding in cases:
+            with self.subTest(header=header):
+                response = self.client.get('/property/all/snapshot/', HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertIn('Accept-Encoding', response['Vary'])
+                body = b''.join(response.streaming_content)
+                self.assertEqual(body, self.read(encoding))
+                if encoding == 'gzip':
+                    self.assertEqual(gzip.decompress(body), plain)
+                response = self.client.get('/property/all/snapshot/', HTTP_ACCEPT_ENCODING=header,
+                                           HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_without_stored_encodings(self):
+        # the plain file is built on first request, and served alone when no compressed copy exists
+        response = self.client.get('/property/all/snapshot/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.get('Content-Encoding'), 'gzip')
+        os.remove(get_snapshot_path('gzip'))
+        response = self.client.get('/property/all/snapshot/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIsNone(response.get('Content-Encoding'))
+        self.assertEqual(json.loads(b''.join(response.streaming_content))[0]['id'], self.listing.id)
+        self.assertIsNone(negotiate_encoding('br, gzip', available=set()))
+
+
+@skipUnless(orjson, 'orjson is not installed')
+class FastJSONRendererTests(APITestCase):
+    """FastJSONRenderer must produce JSONRenderer's exact bytes for the API payloads."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        for i, price in enumerate(('2000.00', '1999.99', '0.10', '12345678.05', '3100.50')):
+            property = Property.objects.create(
+                owner=owner, title=f'Flat \u2028 {i} caf\u00e9', street_name='Lorong 6 Toa Payoh', location=f'{i} Lorong 6 Toa Payoh',
+                price=price, square_feet=700 + i, amenities=['wifi', 'gym'], bedrooms=3,
+                latitude='1.33123456789012', longitude='103.84987654321098',
+            )
+            PropertyImage.objects.create(property=property, image=f'property_images/{i}.png')
+
+    def assertSameBytes(self, data):
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json'), JSONRenderer().render(data, 'application/json'))
+
+    def test_list_and_search_payloads(self):
+        for url in ('/property/all/', '/search/?min_price=1000&bedrooms=2', '/search/?search=lorong'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertSameBytes(response.data)
+                self.assertEqual(response.content, JSONRenderer().render(response.data, 'application/json'))
+
+    def test_values(self):
+        moment = datetime(2024, 5, 1, 10, 0, 0, 123456, tzinfo=dt_timezone.utc)
+        self.assertSameBytes({
+            'decimals': [Decimal('2000.00'), Decimal('0.1'), Decimal('1E+3'), Decimal('-12.345'), Decimal('123456789.99')],
+            'datetimes': [moment, moment.replace(microsecond=0), moment.date(), moment.time()],
+            'nested': {'price': Decimal('1.10'), 'when': moment, 'none': None, 'text': 'line\u2029break'},
+        })
+
+
+class PropertyPaginationTests(APITestCase):
+    """Keyset cursors over every ordering column: deep pages neither repeat nor skip tied rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        # more rows tied on the sort column than an offset-based cursor can step over
+        Property.objects.bulk_create([
+            Property(owner=owner, title=f'Listing {i}', street_name='s', location='l',
+                     price=2000 + i % 3, bedrooms=3, square_feet=1000, price_per_sqft=2, price_per_sqft_sort=2)
+            for i in range(1100)
+        ])
+        Property.objects.update(created_at=Property.objects.earliest('created_at').created_at)
+
+    def setUp(self):
+        get_cache().clear()
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+            pages += 1
+            self.assertLessEqual(pages, 30, 'pagination does not end')
+        return ids, response
+
+    def test_every_sort_reaches_the_end(self):
+        for sort in ('newest', 'price_asc', 'price_desc', 'bedrooms', 'price_per_sqft'):
+            with self.subTest(sort=sort):
+                ids, _ = self.walk(f'/property/all/?sort={sort}&page_size=50&fields=id')
+                self.assertEqual(len(ids), 1100)
+                self.assertEqual(len(set(ids)), 1100)
+
+    def test_listings_without_floor_area_come_last(self):
+        unknown = set(Property.objects.order_by('id').values_list('id', flat=True)[:75])
+        Property.objects.filter(id__in=unknown).update(
+            square_feet=0, price_per_sqft=None, price_per_sqft_sort=PRICE_PER_SQFT_UNKNOWN)
+        for url in ('/property/all/?sort=price_per_sqft&page_size=50&fields=id',
+                    '/property/cards/?sort=price_per_sqft&page_size=50'):
+            with self.subTest(url=url):
+                ids, _ = self.walk(url)
+                self.assertEqual(len(ids), 1100)
+                self.assertEqual(set(ids[-75:]), unknown)
+
+    def test_card_list(self):
+        ids, _ = self.walk('/property/cards/?sort=bedrooms&page_size=50')
+        self.assertEqual(sorted(ids), sorted(Property.objects.values_list('id', flat=True)))
+
+    def test_previous(self):
+        first = self.client.get('/property/all/?sort=price_asc&page_size=50&fields=id')
+        second = self.client.get(first.data['next'])
+        self.assertIsNone(first.data['previous'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertEqual(self.client.get('/property/all/?cursor=garbage').status_code, 404)
+
+
+def square(west, south, size):
+    return [[west, south], [west + size, south], [west + size, south + size], [west, south + size], [west, south]]
+
+
+# synthetic boundaries in the shape of the data.gov.sg planning-area GeoJSON
+BOUNDARIES = {'type': 'FeatureCollection', 'features': [
+    {'type': 'Feature', 'properties': {'PLN_AREA_N': 'TOA PAYOH'},
+     'geometry': {'type': 'Polygon', 'coordinates': [square(103.84, 1.32, 0.02), square(103.845, 1.325, 0.005)]}},
+    {'type': 'Feature', 'properties': {'Description': '<th>PLN_AREA_N</th> <td>DOWNTOWN CORE</td>'},
+     'geometry': {'type': 'MultiPolygon', 'coordinates': [[square(103.85, 1.27, 0.01)], [square(103.87, 1.27, 0.01)]]}},
+    {'type': 'Feature', 'properties': {'PLN_AREA_N': 'TANGLIN'},
+     'geometry': {'type': 'Polygon', 'coordinates': [square(103.80, 1.30, 0.02)]}},
+]}
+
+
+class TownAssignmentTests(TestCase):
+    def test_locate(self):
+        locator = TownLocator.from_geojson(BOUNDARIES)
+        self.assertEqual(locator.locate(1.33, 103.855), 'TOA PAYOH')
+        self.assertIsNone(locator.locate(1.327, 103.847))  # in the hole
+        self.assertEqual(locator.locate(1.275, 103.875), 'CENTRAL AREA')
+        self.assertIsNone(locator.locate(1.31, 103.81))  # a planning area that is not an HDB town
+        self.assertIsNone(locator.locate(1.40, 103.90))
+
+    def test_assign_towns_command(self):
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        inside = Property.objects.create(owner=owner, title='Inside', street_name='s', location='l', price=1,
+                                         town='Somewhere', latitude='1.33000000000000', longitude='103.85500000000000')
+        outside = Property.objects.create(owner=owner, title='Outside', street_name='s', location='l', price=1,
+                                          town='Bedok', latitude='1.40000000000000', longitude='103.90000000000000')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'towns.geojson')
+            with open(path, 'w') as file:
+                json.dump(BOUNDARIES, file)
+            with override_settings(PROPERTY_SNAPSHOT_ROOT=directory):
+                call_command('assign_towns', '--boundaries', path, stdout=StringIO())
+                # the bulk update sends no signals, so the command rebuilds the snapshot itself
+                with open(get_snapshot_path()) as file:
+                    towns = {row['id']: row['town'] for row in json.load(file)}
+        self.assertEqual(Property.objects.get(pk=inside.pk).town, 'Toa Payoh')
+        self.assertEqual(Property.objects.get(pk=outside.pk).town, 'Bedok')
+        self.assertEqual(towns, {inside.pk: 'Toa Payoh', outside.pk: 'Bedok'})
@@ -0,0 +1,152 @@
+import json
+import logging
+import re
+import threading
+
+from django.conf import settings
+
+from .rtree import STRtree
+
+logger = logging.getLogger(__name__)
+
+
+# Canonical HDB town of a coordinate, by point-in-polygon over town / planning-area boundaries.
+#
+# Boundaries come from the GeoJSON at settings.TOWN_BOUNDARIES_PATH (for example the URA Master
+# Plan planning-area boundaries from data.gov.sg); nothing is assigned while that file is absent.
+# Every polygon becomes a Shape whose bounding box goes into an STR R-tree (rtree.py), so a
+# lookup tests the few shapes whose box holds the point. Inside a shape, edges are bucketed
+# into horizontal bands and the ray cast only visits the band of the point, which keeps a
+# lookup in the microseconds even for boundaries with thousands of vertices.
+#
+# Feature names are mapped onto the towns of the HDB datasets (the values rent_model was
+# trained on); planning areas that are not an HDB town map to None and leave a listing as is.
+
+HDB_TOWNS = (
+    'ANG MO KIO', 'BEDOK', 'BISHAN', 'BUKIT BATOK', 'BUKIT MERAH', 'BUKIT PANJANG', 'BUKIT TIMAH',
+    'CENTRAL AREA', 'CHOA CHU KANG', 'CLEMENTI', 'GEYLANG', 'HOUGANG', 'JURONG EAST', 'JURONG WEST',
+    'KALLANG/WHAMPOA', 'MARINE PARADE', 'PASIR RIS', 'PUNGGOL', 'QUEENSTOWN', 'SEMBAWANG', 'SENGKANG',
+    'SERANGOON', 'TAMPINES', 'TOA PAYOH', 'WOODLANDS', 'YISHUN',
+)
+# planning areas whose name differs from the HDB town covering them
+PLANNING_AREA_TOWNS = {
+    'KALLANG': 'KALLANG/WHAMPOA',
+    **{area: 'CENTRAL AREA' for area in (
+        'DOWNTOWN CORE', 'MARINA EAST', 'MARINA SOUTH', 'MUSEUM', 'NEWTON', 'ORCHARD', 'OUTRAM',
+        'RIVER VALLEY', 'ROCHOR', 'SINGAPORE RIVER', 'STRAITS VIEW',
+    )},
+}
+# feature properties that may carry the area name, in order of preference
+NAME_PROPERTIES = ('town', 'TOWN', 'PLN_AREA_N', 'planning_area', 'name', 'Name')
+BANDS = 64
+
+
+def canonical_town(name):
+    """'Toa Payoh' / 'DOWNTOWN CORE' -> 'TOA PAYOH' / 'CENTRAL AREA'; None if not an HDB town."""
+    name = ' '.join(str(name or '').upper().split())
+    name = PLANNING_AREA_TOWNS.get(name, name)
+    return name if name in HDB_TOWNS else None
+
+
+def display_town(town):
+    # Property.town keeps the title-case spelling used by the listing forms ('Toa Payoh')
+    return town.title() if town else town
+
+
+def feature_name(properties):
+    for key in NAME_PROPERTIES:
+        if properties.get(key):
+            return properties[key]
+    # data.gov.sg KML conversions keep the attributes in an HTML table under 'Description'
+    match = re.search(r'<th>PLN_AREA_N</th>\s*<td>([^<]*)</td>', properties.get('Description') or '')
+    return match.group(1) if match else None
+
+
+class Shape:
+    """One polygon (exterior ring and holes) with its edges bucketed by latitude band."""
+
+    def __init__(self, town, rings):
+        self.town = town
+        points = [point for ring in rings for point in ring]
+        self.box = (
+            min(x for x, _ in points), min(y for _, y in points),
+            max(x for x, _ in points), max(y for _, y in points),
+        )
+        self.band_height = (self.box[3] - self.box[1]) / BANDS or 1.0
+        self.bands = [[] for _ in range(BANDS)]
+        for ring in rings:
+            for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+                if y1 == y2:
+                    continue  # horizontal edges never cross a horizontal ray
+                for band in range(self._band(min(y1, y2)), self._band(max(y1, y2)) + 1):
+                    self.bands[band].append((x1, y1, x2, y2))
+
+    def _band(self, y):
+        return min(BANDS - 1, max(0, int((y - self.box[1]) / self.band_height)))
+
+    def contains(self, x, y):
+        # even-odd ray casting, so holes need no special case
+        inside = False
+        for x1, y1, x2, y2 in self.bands[self._band(y)]:
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+        return inside
+
+
+class TownLocator:
+    def __init__(self, shapes=()):
+        self.shapes = list(shapes)
+        self.tree = STRtree((shape.box, shape) for shape in self.shapes)
+
+    @classmethod
+    def from_geojson(cls, collection):
+        shapes = []
+        for feature in collection.get('features', []):
+            geometry = feature.get('geometry') or {}
+            town = canonical_town(feature_name(feature.get('properties') or {}))
+            if town is None:
+                continue
+            if geometry.get('type') == 'Polygon':
+                polygons = [geometry['coordinates']]
+            elif geometry.get('type') == 'MultiPolygon':
+                polygons = geometry['coordinates']
+            else:
+                continue
+            for polygon in polygons:
+                # GeoJSON positions are [longitude, latitude(, altitude)]
+                rings = [[(float(position[0]), float(position[1])) for position in ring] for ring in polygon]
+                shapes.append(Shape(town, [ring for ring in rings if len(ring) >= 3]))
+        return cls(shapes)
+
+    def locate(self, latitude, longitude):
+        """Canonical HDB town containing a coordinate, or None."""
+        if latitude is None or longitude is None:
+            return None
+        x, y = float(longitude), float(latitude)
+        for shape in self.tree.query_point(x, y):
+            if shape.contains(x, y):
+                return shape.town
+        return None
+
+
+_locator = None
+_locator_lock = threading.Lock()
+
+
+def get_town_locator():
+    """The process-wide locator, loaded from TOWN_BOUNDARIES_PATH on first use (empty without the file)."""
+    global _locator
+    with _locator_lock:
+        if _locator is None:
+            try:
+                with open(settings.TOWN_BOUNDARIES_PATH, encoding='utf-8') as file:
+                    _locator = TownLocator.from_geojson(json.load(file))
+            except (OSError, ValueError) as error:
+                logger.warning("Town boundaries not loaded from %s: %s", settings.TOWN_BOUNDARIES_PATH, error)
+                _locator = TownLocator()
+        return _locator
+
+
+def town_for(latitude, longitude, default=None):
+    """Display spelling of the town at a coordinate, or `default` when none is found."""
+    return display_town(get_town_locator().locate(latitude, longitude)) or default
@@ -11,8 +11,16 @@ from . import views
 
 urlpatterns = [
     path('all/', views.PropertyListView.as_view(), name='properties_list'),
+    path('all/stream/', views.PropertyStreamView.as_view(), name='properties_stream'),
+    path('all/snapshot/', views.property_snapshot_view, name='properties_snapshot'),
+    path('cards/', views.PropertyCardListView.as_view(), name='properties_cards'),
+    path('map/pins/', views.PropertyMapPinView.as_view(), name='properties_map_pins'),
+    path('map/viewport/', views.PropertyViewportView.as_view(), name='properties_map_viewport'),
+    path('map/clusters/', views.PropertyClusterView.as_view(), name='properties_map_clusters'),
+    path('nearby/', views.NearbyPropertiesView.as_view(), name='properties_nearby'),
     path('details/user/<int:id>/', views.UserPropertiesView.as_view(), name='properties_list_user'),
     path('details/<int:pk>/', views.PropertyDetailView.as_view(), name='property_detail'),
+    path('details/<int:pk>/nearby/', views.PropertyNearbyView.as_view(), name='property_nearby'),
     path('details/<int:pk>/delete/', views.PropertyDeleteView.as_view(), name='delete_property'),
     path('details/<int:property_id>/images/', views.PropertyImageUploadView.as_view(), name='upload_images'),
     path('creating-request/', views.CreatePropertyRequestView.as_view(), name='create_property_request'),
@@ -23,6 +31,7 @@ urlpatterns = [
     path('requests/<int:pk>/accept/', views.AcceptPropertyRequestView.as_view(), name='accept_property_request'),
     path('requests/<int:pk>/reject/', views.RejectPropertyRequestView.as_view(), name='reject_property_request'),
     path('api/auth/verify/', views.TokenVerifyView.as_view(), name='token-verify'),
+    path('cache/stats/', views.PropertyCacheStatsView.as_view(), name='property_cache_stats'),
 ]
 
 if settings.DEBUG:
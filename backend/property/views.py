@@ -5,14 +5,30 @@ from rest_framework import status
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.parsers import MultiPartParser, FormParser
 
 
 from django.shortcuts import get_object_or_404, render
+from django.db import transaction
+from django.http import FileResponse, HttpResponseNotModified
+from django.views.decorators.http import require_safe
+
+from backend.streaming import StreamingJSONResponse, STREAM_CHUNK_SIZE
 
 from .models import *
 from .serializer import *
+from .pagination import PropertyCursorPagination
+from .mixins import SortMixin, SparseFieldsetMixin
+from .projections import capped_map_pin_columns, card_rows, cluster_columns, nearby_cards, serialize_cards
+from .conditional import conditional_property_list, conditional_property_detail
+from .cache import CachedResponseMixin, invalidate_property, get_stats
+from .snapshot import ENCODINGS, build_snapshot, get_snapshot_path, negotiate_encoding
+from .signals import property_published
+from .geo import within_bbox, zoom_precision
+from .nearby import get_nearby_snapshot
+from .clustering import MAX_ZOOM, get_cluster_index
+from .towns import town_for
 
 import os
 class TokenVerifyView(APIView):
@@ -100,38 +116,161 @@ class PropertyRequestImageUploadView(APIView):
             )
         
 # view all properties
-class PropertyListView(generics.ListAPIView):
-    queryset = Property.objects.all()
+@conditional_property_list
+class PropertyListView(CachedResponseMixin, SortMixin, SparseFieldsetMixin, generics.ListAPIView):
+    queryset = Property.objects.prefetch_related('images')
     serializer_class = PropertySerializer
-    
-    def get_queryset(self):
-        print("Fetching properties...")
-        return super().get_queryset().order_by('-created_at')
+    pagination_class = PropertyCursorPagination
+    max_queries = 2  # page of properties + prefetched images (the ETag is read from the cache)
     
     def get_serializer_context(self):
         return {'request': self.request}
     
     def list(self, request, *args, **kwargs):
-        # Fetch properties
-        properties = self.get_queryset()
+        # Fetch one page of properties (ordering and page size are enforced by the paginator)
+        properties = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
         serializer = self.get_serializer(properties, many=True)
-        
-        # Debugging: Print the serialized data to check if images are included
-        print("Serialized Properties Data:", serializer.data)
-        
-        return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+# stream every property as one JSON array, without paginating or building the whole list in memory
+class PropertyStreamView(SparseFieldsetMixin, generics.ListAPIView):
+    queryset = Property.objects.prefetch_related('images')
+    serializer_class = PropertySerializer
+    permission_classes = [AllowAny]
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('-created_at', '-id')
+        # a single serializer instance for all rows; images are prefetched per chunk by iterator()
+        serializer = self.get_serializer()
+        rows = (
+            serializer.to_representation(property)
+            for property in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE)
+        )
+        return StreamingJSONResponse(rows)
+
+# precompressed snapshot of all available properties, served as raw bytes (no ORM, no serializer)
+# kept up to date by property/snapshot.py; a front proxy can serve the same files directly
+@require_safe
+def property_snapshot_view(request):
+    if not os.path.exists(get_snapshot_path()):
+        build_snapshot()
+
+    available = {name for name in ENCODINGS if os.path.exists(get_snapshot_path(name))}
+    encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING'), available)
+    snapshot = open(get_snapshot_path(encoding), 'rb')
+    stat = os.fstat(snapshot.fileno())
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-{encoding or "identity"}"'
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        snapshot.close()
+        return HttpResponseNotModified(headers={'ETag': etag, 'Vary': 'Accept-Encoding'})
+
+    response = FileResponse(snapshot, content_type='application/json')
+    del response['Content-Disposition']
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    response['ETag'] = etag
+    return response
+
+# lightweight card projection of all properties for the listing grid (no ModelSerializer)
+@conditional_property_list
+class PropertyCardListView(SortMixin, generics.ListAPIView):
+    queryset = Property.objects.all()
+    pagination_class = PropertyCursorPagination
+    permission_classes = [AllowAny]
+    max_queries = 1  # page of cards, thumbnail resolved by a subquery
+    
+    def list(self, request, *args, **kwargs):
+        rows = self.paginate_queryset(card_rows(self.filter_queryset(self.get_queryset())))
+        return self.get_paginated_response(serialize_cards(rows, request))
+
+# columnar map-pin feed: parallel arrays of id/title/price/... of the newest mapped properties,
+# optionally inside ?bbox=south,west,north,east; `truncated` is set past max_pins
+@conditional_property_list
+class PropertyMapPinView(APIView):
+    permission_classes = [AllowAny]
+    max_queries = 1
+    max_pins = 1000
+    
+    def get(self, request):
+        params = MapPinSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = Property.objects.order_by('-created_at', '-id')
+        if 'bbox' in params.validated_data:
+            queryset = within_bbox(queryset, *params.validated_data['bbox'])
+        return Response(capped_map_pin_columns(queryset, request, self.max_pins))
+
+# map pins inside the visible bounding box (?bbox=south,west,north,east&zoom=), newest first,
+# found through the geo_cell grid index so panning costs the visible listings only
+@conditional_property_list
+class PropertyViewportView(APIView):
+    permission_classes = [AllowAny]
+    max_queries = 1
+    max_pins = 1000
+    
+    def get(self, request):
+        params = MapViewportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = within_bbox(Property.objects.order_by('-created_at', '-id'), *params.validated_data['bbox'])
+        precision = zoom_precision(params.validated_data['zoom'])
+        return Response(capped_map_pin_columns(queryset, request, self.max_pins, precision=precision))
+
+# marker clusters inside the visible bounding box (?bbox=south,west,north,east&zoom=): centroid,
+# size and price range per grid cell of that zoom level, served from the in-memory cluster index
+@conditional_property_list
+class PropertyClusterView(APIView):
+    permission_classes = [AllowAny]
+    max_queries = 1  # none once the index is current; it re-reads updated rows after a change
+    
+    def get(self, request):
+        params = MapViewportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        zoom = min(params.validated_data['zoom'], MAX_ZOOM)
+        clusters = get_cluster_index().clusters(*params.validated_data['bbox'], zoom)
+        return Response({'zoom': zoom, **cluster_columns(clusters, precision=zoom_precision(zoom))})
+
+# the k available listings nearest to a point (?lat=&lng=&k=), as cards with their distance in metres
+class NearbyPropertiesView(APIView):
+    permission_classes = [AllowAny]
+    max_queries = 1  # cards of the neighbours (the BallTree is only rebuilt after a change)
+    
+    def get(self, request):
+        params = NearbySerializer(data=request.query_params, context={'require_point': True})
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        neighbours = get_nearby_snapshot().query(data['lat'], data['lng'], data['k'])
+        return Response({'results': nearby_cards(neighbours, request)})
+
+# listings near a given property (?k=), for its detail page
+class PropertyNearbyView(APIView):
+    permission_classes = [AllowAny]
+    max_queries = 2  # the property's coordinates + cards of the neighbours
+    
+    def get(self, request, pk):
+        params = NearbySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        property = get_object_or_404(Property.objects.only('id', 'latitude', 'longitude'), pk=pk)
+        if property.latitude is None or property.longitude is None:
+            return Response({'results': []})
+        neighbours = get_nearby_snapshot().query(
+            float(property.latitude), float(property.longitude), params.validated_data['k'], exclude_id=property.pk,
+        )
+        return Response({'results': nearby_cards(neighbours, request)})
 
 # view a single property using the property id
-class PropertyDetailView(generics.RetrieveAPIView):
+@conditional_property_detail
+class PropertyDetailView(CachedResponseMixin, SparseFieldsetMixin, generics.RetrieveAPIView):
     serializer_class = PropertySerializer
     authentication_classes = [TokenAuthentication]
     permission_classes = [AllowAny]
+    cache_scope = 'detail'
+    max_queries = 4  # token lookup + updated_at (ETag) + property + prefetched images
     
     def get_queryset(self):
         if getattr(self, 'swagger_fake_view', False):
             return Property.objects.none()
         pk = self.kwargs.get('pk')
-        return Property.objects.filter(id=pk)
+        return Property.objects.filter(id=pk).prefetch_related('images')
     
     def get_serializer_context(self):
         return {'request': self.request}
@@ -167,10 +306,12 @@ class PropertyDeleteView(generics.DestroyAPIView):
 class UserPropertiesView(generics.ListAPIView):
     serializer_class = PropertySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = PropertyCursorPagination
+    max_queries = 3  # token lookup + page of properties + prefetched images
 
     def get_queryset(self):
         owner_id = self.request.query_params.get('owner_id', None)
-        queryset = Property.objects.all().order_by('-created_at')
+        queryset = Property.objects.prefetch_related('images').order_by('-created_at', '-id')
         print("Fetching properties for user...")
         if owner_id:
             queryset = queryset.filter(owner_id=owner_id)
@@ -206,7 +347,10 @@ class CreatePropertyRequestView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data, context={'request': request})
         try:
             if serializer.is_valid():
-                propertyRequest = serializer.save(user=request.user)
+                data = serializer.validated_data
+                # the town comes from the coordinates where the boundaries cover them (see towns.py)
+                town = town_for(data.get('latitude'), data.get('longitude'), default=data.get('town'))
+                propertyRequest = serializer.save(user=request.user, town=town)
                 return Response({
                     "message": "Property request created successfully",
                     "property_request": serializer.data,
@@ -293,6 +437,9 @@ class AcceptPropertyRequestView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [TokenAuthentication]
     
+    # one transaction: the property, its images and the request deletion commit together,
+    # so cache invalidation and the listing snapshot rebuild run once, after commit
+    @transaction.atomic
     def post(self, request, *args, **kwargs):
         # retrieve the property request by id
         property_request = get_object_or_404(PropertyRequest, id=self.kwargs['pk'])
@@ -314,7 +461,7 @@ class AcceptPropertyRequestView(generics.GenericAPIView):
                 "block": property_request.block,
                 "street_name": property_request.street_name,
                 "location": property_request.location,
-                "town": property_request.town,
+                "town": town_for(property_request.latitude, property_request.longitude, default=property_request.town),
                 "city": property_request.city,
                 "zip_code": property_request.zip_code,
                 "price": property_request.price,
@@ -361,6 +508,7 @@ class AcceptPropertyRequestView(generics.GenericAPIView):
                     "latitude": property_request.latitude if property_request.latitude is not None else property_instance.latitude,
                     "longitude": property_request.longitude if property_request.longitude is not None else property_instance.longitude,
                 }
+                update_data["town"] = town_for(update_data["latitude"], update_data["longitude"], default=update_data["town"])
                 # Use partial update so that only provided fields are updated
                 property_serializer = UpdatePropertySerializer(property_instance, data=update_data, partial=True)
                 
@@ -381,6 +529,8 @@ class AcceptPropertyRequestView(generics.GenericAPIView):
         # Step 3: Delete PropertyRequestImage instances after moving
         property_request.images.all().delete()
         property_request.delete()
+        invalidate_property(property_instance.pk)
+        property_published.send(sender=Property, instance=property_instance, created=property_request.request_type == 'new')
         return Response({"message": "Property request accepted successfully"}, status=status.HTTP_200_OK)
 
 # reject a property request by id (for admin/staff/superuser only)
@@ -406,4 +556,11 @@ class RejectPropertyRequestView(generics.GenericAPIView):
         # delete the property request
         property_request.delete()
         return Response({"message": "Property request rejected successfully"}, status=status.HTTP_200_OK)
-        
\ No newline at end of file
+
+# hit/miss counters of the Property read cache (for admin/staff only)
+class PropertyCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+    authentication_classes = [TokenAuthentication]
+    
+    def get(self, request):
+        return Response(get_stats(), status=status.HTTP_200_OK)
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from .fts import ensure_fts_index
+    ensure_fts_index(connections[using])
 
 
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'search'
+
+    def ready(self):
+        # (re)create the FTS5 index and its triggers after every migrate, see fts.py
+        post_migrate.connect(ensure_search_index, sender=self)
+        from . import signals  # noqa: F401
@@ -0,0 +1,208 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from data_management.models import RentalFlat, ResaleFlat
+from property.models import Property
+from property.readmodels import SyncedIndex
+
+
+# In-process prefix index for search-box suggestions (towns, streets, listing titles).
+#
+# Every suggestion is stored under each of its word starts, so 'toa' finds both "Toa Payoh"
+# and "Lorong 6 Toa Payoh": the keys live in one sorted list of (key, kind, normalized label)
+# tuples and a lookup is a bisect to the first key >= the prefix followed by a short forward walk.
+#
+# Suggestions carry a weight (how many listings or flat records use them), used for ranking.
+# Available properties are tracked one by one, so saves in this process update the index in place
+# and other processes' writes are picked up by SyncedIndex.sync (property/readmodels.py). Town
+# and street names from the ingested HDB records change only with the data import jobs, so that
+# part is re-read at most every FLAT_REFRESH and extended by the flat signals in this process.
+
+KINDS = ('town', 'street', 'title')
+# prefix walks stop after this many keys, bounding the cost of one- and two-letter prefixes
+MAX_SCAN = 2000
+FLAT_REFRESH = timedelta(minutes=15)
+
+
+def normalize_key(text):
+    # 'Lorong 6, Toa-Payoh' -> 'lorong 6 toa payoh'
+    return ' '.join(re.findall(r'\w+', text.lower())) if text else ''
+
+
+def display_label(text):
+    # HDB records are upper case ('LOR 6 TOA PAYOH'); listings are typed by hand
+    text = ' '.join(text.split())
+    return text.title() if text.isupper() else text
+
+
+def property_labels(property):
+    # None for listings that should not be suggested
+    if property.status != 'available':
+        return None
+    return (('town', property.town), ('street', property.street_name), ('title', property.title))
+
+
+class PrefixIndex:
+    """Weighted suggestions addressable by the prefix of any of their words."""
+
+    def __init__(self):
+        self.keys = []
+        self.weights = {}  # (kind, normalized label) -> weight
+        self.labels = {}   # (kind, normalized label) -> display label
+
+    def add(self, kind, text, weight=1):
+        label = normalize_key(text)
+        entry = (kind, label)
+        previous = self.weights.get(entry, 0)
+        self.weights[entry] = previous + weight
+        if not previous:
+            self.labels[entry] = display_label(text)
+            for key in self._word_keys(label):
+                insort(self.keys, (key, kind, label))
+
+    def discard(self, kind, text, weight=1):
+        label = normalize_key(text)
+        entry = (kind, label)
+        remaining = self.weights.get(entry, 0) - weight
+        if remaining > 0:
+            self.weights[entry] = remaining
+            return
+        if self.weights.pop(entry, None) is None:
+            return
+        self.labels.pop(entry, None)
+        for key in self._word_keys(label):
+            position = bisect_left(self.keys, (key, kind, label))
+            if position < len(self.keys) and self.keys[position] == (key, kind, label):
+                del self.keys[position]
+
+    @staticmethod
+    def _word_keys(label):
+        words = label.split(' ')
+        return {' '.join(words[i:]) for i in range(len(words))}
+
+    def search(self, prefix, limit=8, kinds=None):
+        """
+            Top `limit` suggestions whose label, or one of its words, starts with `prefix`.
+            Labels that start with the prefix rank before mid-label matches, then by weight.
+        """
+        prefix = normalize_key(prefix)
+        if not prefix:
+            return []
+        candidates = {}
+        position = bisect_left(self.keys, (prefix,))
+        end = min(position + MAX_SCAN, len(self.keys))
+        while position < end:
+            key, kind, label = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            if kinds is None or kind in kinds:
+                entry = (kind, label)
+                candidates[entry] = candidates.get(entry, False) or key == label
+            position += 1
+
+        best = heapq.nlargest(
+            limit, candidates.items(),
+            key=lambda item: (item[1], self.weights[item[0]], [-ord(char) for char in item[0][1]]),
+        )
+        return [
+            {'kind': kind, 'label': self.labels[(kind, label)], 'count': self.weights[(kind, label)]}
+            for (kind, label), _ in best
+        ]
+
+
+class AutocompleteIndex(SyncedIndex):
+    fields = ('id', 'status', 'town', 'street_name', 'title')
+
+    def __init__(self):
+        super().__init__()
+        self.prefixes = PrefixIndex()
+        self.properties = {}  # property id -> labels it contributes
+        self.flats = {}       # (kind, street or town) -> number of HDB records
+        self.flats_loaded_at = None
+
+    def tracked(self):
+        return Property.objects.filter(status='available')
+
+    def load_flats(self):
+        counts = {}
+        for model in (RentalFlat, ResaleFlat):
+            for kind, column in (('town', 'town'), ('street', 'street_name')):
+                for text, count in model.objects.order_by().values_list(column).annotate(count=Count('id')):
+                    key = (kind, text)
+                    counts[key] = counts.get(key, 0) + count
+        with self.lock:
+            for (kind, text), count in self.flats.items():
+                self.prefixes.discard(kind, text, count)
+            for (kind, text), count in counts.items():
+                if normalize_key(text):
+                    self.prefixes.add(kind, text, count)
+            self.flats = {key: count for key, count in counts.items() if normalize_key(key[1])}
+            self.flats_loaded_at = timezone.now()
+
+    def sync(self):
+        """Catch up with Property writes from other processes and refresh the HDB names when due."""
+        if self.flats_loaded_at is None or timezone.now() - self.flats_loaded_at > FLAT_REFRESH:
+            self.load_flats()
+        super().sync()
+
+    def _clear(self):
+        for labels in self.properties.values():
+            for kind, text in labels:
+                self.prefixes.discard(kind, text)
+        self.properties = {}
+
+    def _size(self):
+        return len(self.properties)
+
+    def _upsert(self, row):
+        self._apply(row.id, property_labels(row))
+
+    def _discard(self, property_id):
+        self._apply(property_id, None)
+
+    def add_flat(self, flat):
+        # a new HDB record in this process; names only ever accumulate until the next load_flats
+        with self.lock:
+            for kind, text in (('town', flat.town), ('street', flat.street_name)):
+                if normalize_key(text):
+                    self.flats[(kind, text)] = self.flats.get((kind, text), 0) + 1
+                    self.prefixes.add(kind, text)
+
+    def _apply(self, property_id, labels):
+        # replace what a property contributes; labels=None stops tracking it
+        for kind, text in self.properties.pop(property_id, ()):
+            self.prefixes.discard(kind, text)
+        if labels is None:
+            return
+        labels = tuple((kind, text) for kind, text in labels if normalize_key(text))
+        for kind, text in labels:
+            self.prefixes.add(kind, text)
+        self.properties[property_id] = labels
+
+    def search(self, prefix, limit=8, kinds=None):
+        with self.lock:
+            return self.prefixes.search(prefix, limit, kinds)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index():
+    """The process-wide suggestion index, built on first use and synced before every read."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AutocompleteIndex()
+    _index.sync()
+    return _index
+
+
+def get_loaded_autocomplete_index():
+    return _index
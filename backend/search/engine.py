@@ -0,0 +1,376 @@
+import threading
+
+import numpy as np
+
+from property.amenities import amenity_names, normalize_amenity
+from property.models import Property
+from property.pagination import SORT_ORDERINGS
+from property.readmodels import SyncedIndex
+
+
+# In-process read model of available listings for faceted filtering.
+#
+# Numeric filters (price, bedrooms, bathrooms) are vectorized comparisons over column arrays.
+# Categorical filters (property_type, town, amenity) use one packed bitset per value, where
+# bit i is set when row i has that value, so a filter is a handful of AND/OR over n/8 bytes.
+# Amenities are read from Property.amenity_mask, so only the known AMENITIES are indexed.
+# Sorted orders are precomputed per sort key and only recomputed after a change.
+#
+# Rows are addressed by position; a removed listing leaves a dead slot, and once dead slots make
+# up COMPACT_DEAD_SHARE of the rows the live ones are moved down over them. The index is kept
+# fresh by the Property signals of this process (signals.py) and, for writes made by other worker
+# processes, by an incremental sync whenever the shared list generation moves (readmodels.py).
+
+INITIAL_CAPACITY = 1024
+COMPACT_DEAD_SHARE = 0.25
+# below this many dead slots compacting costs more than scanning them
+COMPACT_MIN_DEAD = 256
+SORTS = tuple(SORT_ORDERINGS)
+# set bits per byte value, to count bitset members without unpacking them
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+
+INDEX_FIELDS = ('id', 'price', 'price_per_sqft', 'bedrooms', 'bathrooms', 'property_type', 'town', 'amenity_mask', 'status', 'created_at')
+# per-position column arrays
+COLUMNS = ('ids', 'alive', 'price', 'price_per_sqft', 'bedrooms', 'bathrooms', 'created')
+
+
+def normalize_town(town):
+    return ' '.join(town.upper().split()) if town else None
+
+
+def normalize_type(property_type):
+    return property_type.lower() if property_type else None
+
+
+class PackedBitsets:
+    """One packed bitset (np.uint8, big-endian bit order as np.packbits) per categorical value."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.sets = {}
+
+    def grow(self, capacity):
+        extra = (capacity - self.capacity) // 8
+        for value, bits in self.sets.items():
+            self.sets[value] = np.concatenate([bits, np.zeros(extra, dtype=np.uint8)])
+        self.capacity = capacity
+
+    def add(self, value, position):
+        bits = self.sets.get(value)
+        if bits is None:
+            bits = self.sets[value] = np.zeros(self.capacity // 8, dtype=np.uint8)
+        bits[position >> 3] |= 0x80 >> (position & 7)
+
+    def discard(self, value, position):
+        bits = self.sets.get(value)
+        if bits is not None:
+            bits[position >> 3] &= ~np.uint8(0x80 >> (position & 7))
+
+    def union(self, values):
+        # rows having any of the values; None if none of them is indexed
+        result = None
+        for value in values:
+            bits = self.sets.get(value)
+            if bits is not None:
+                result = bits.copy() if result is None else np.bitwise_or(result, bits, out=result)
+        return result
+
+    def counts(self, mask):
+        # rows per value within a boolean row mask (facet counts), skipping values with no rows
+        mask_bits = np.packbits(mask)
+        counts = {}
+        for value, bits in self.sets.items():
+            count = int(POPCOUNT[np.bitwise_and(bits[:len(mask_bits)], mask_bits)].sum())
+            if count:
+                counts[value] = count
+        return counts
+
+
+class ListingIndex(SyncedIndex):
+    fields = INDEX_FIELDS
+
+    def __init__(self):
+        super().__init__()
+        self._reset(INITIAL_CAPACITY)
+
+    def _reset(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self.positions = {}
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.price_per_sqft = np.full(capacity, np.nan)
+        self.bedrooms = np.zeros(capacity, dtype=np.int32)
+        self.bathrooms = np.zeros(capacity, dtype=np.int32)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.row_values = {}  # position -> (type, town, amenities), to clear bits on update
+        self.types = PackedBitsets(capacity)
+        self.towns = PackedBitsets(capacity)
+        self.amenities = PackedBitsets(capacity)
+        self._orders = {}
+
+    # ---- maintenance ----
+
+    def tracked(self):
+        return Property.objects.filter(status='available')
+
+    def _clear(self):
+        self._reset(INITIAL_CAPACITY)
+
+    def _size(self):
+        return len(self.positions)
+
+    def _load(self, rows):
+        # bulk load: fill whole columns at once and pack each bitset from a boolean column
+        n = len(rows)
+        capacity = INITIAL_CAPACITY
+        while capacity < n:
+            capacity *= 2
+        self._reset(capacity)
+        self.size = n
+        self.ids[:n] = [row.id for row in rows]
+        self.alive[:n] = True
+        self.price[:n] = [float(row.price) for row in rows]
+        self.price_per_sqft[:n] = [float(row.price_per_sqft) if row.price_per_sqft is not None else np.nan for row in rows]
+        self.bedrooms[:n] = [row.bedrooms for row in rows]
+        self.bathrooms[:n] = [row.bathrooms for row in rows]
+        self.created[:n] = [row.created_at.timestamp() for row in rows]
+        self.positions = {row.id: position for position, row in enumerate(rows)}
+        self.row_values = {
+            position: (normalize_type(row.property_type), normalize_town(row.town), amenity_names(row.amenity_mask))
+            for position, row in enumerate(rows)
+        }
+        self._pack_bitsets()
+
+    def _pack_bitsets(self):
+        # every categorical bitset from row_values, one boolean column per value
+        members = {self.types: {}, self.towns: {}, self.amenities: {}}
+        for position, values in self.row_values.items():
+            for bitsets, keys in zip(members, (values[0:1], values[1:2], values[2])):
+                for key in keys:
+                    if key:
+                        members[bitsets].setdefault(key, []).append(position)
+        for bitsets, positions_by_value in members.items():
+            bitsets.sets = {}
+            for value, positions in positions_by_value.items():
+                column = np.zeros(self.capacity, dtype=bool)
+                column[positions] = True
+                bitsets.sets[value] = np.packbits(column)
+
+    def _compact(self):
+        # move the live rows down over the dead slots, keeping their relative order
+        live = np.flatnonzero(self.alive[:self.size])
+        n = len(live)
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[:n] = column[live]
+        self.alive[n:self.size] = False
+        self.row_values = {position: self.row_values[old] for position, old in enumerate(live.tolist())}
+        self.positions = {row_id: position for position, row_id in enumerate(self.ids[:n].tolist())}
+        self.size = n
+        self._pack_bitsets()
+        self._orders = {}
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for name in COLUMNS:
+            column = getattr(self, name)
+            grown = np.full(capacity, np.nan) if name == 'price_per_sqft' else np.zeros(capacity, dtype=column.dtype)
+            grown[:self.capacity] = column
+            setattr(self, name, grown)
+        for bitsets in (self.types, self.towns, self.amenities):
+            bitsets.grow(capacity)
+        self.capacity = capacity
+
+    def _upsert(self, row):
+        if row.status != 'available':
+            return self._discard(row.id)
+
+        position = self.positions.get(row.id)
+        if position is None:
+            if self.size == self.capacity:
+                self._grow()
+            position = self.size
+            self.size += 1
+            self.positions[row.id] = position
+        else:
+            self._clear_bits(position)
+
+        values = (normalize_type(row.property_type), normalize_town(row.town), amenity_names(row.amenity_mask))
+        self.ids[position] = row.id
+        self.alive[position] = True
+        self.price[position] = float(row.price)
+        self.price_per_sqft[position] = float(row.price_per_sqft) if row.price_per_sqft is not None else np.nan
+        self.bedrooms[position] = row.bedrooms
+        self.bathrooms[position] = row.bathrooms
+        self.created[position] = row.created_at.timestamp()
+        self.row_values[position] = values
+        if values[0]:
+            self.types.add(values[0], position)
+        if values[1]:
+            self.towns.add(values[1], position)
+        for amenity in values[2]:
+            self.amenities.add(amenity, position)
+        self._orders = {}
+
+    def _discard(self, property_id):
+        position = self.positions.pop(property_id, None)
+        if position is None:
+            return
+        self._clear_bits(position)
+        self.alive[position] = False
+        self.row_values.pop(position, None)
+        self._orders = {}
+        dead = self.size - len(self.positions)
+        if dead >= COMPACT_MIN_DEAD and dead > self.size * COMPACT_DEAD_SHARE:
+            self._compact()
+
+    def _clear_bits(self, position):
+        property_type, town, amenities = self.row_values.get(position, (None, None, ()))
+        if property_type:
+            self.types.discard(property_type, position)
+        if town:
+            self.towns.discard(town, position)
+        for amenity in amenities:
+            self.amenities.discard(amenity, position)
+
+    # ---- queries ----
+
+    def mask(self, min_price=None, max_price=None, bedrooms=None, bathrooms=None,
+             property_types=None, towns=None, amenities=None, match_all_amenities=True):
+        """
+            Boolean mask over the first `size` rows for a filter set.
+            Numeric bounds are minimums/maximums; values inside one categorical filter are ORed,
+            amenities are ANDed unless match_all_amenities is False.
+        """
+        n = self.size
+        mask = self.alive[:n].copy()
+        scratch = np.empty(n, dtype=bool)
+        for column, compare, bound in (
+            (self.price, np.greater_equal, min_price),
+            (self.price, np.less_equal, max_price),
+            (self.bedrooms, np.greater_equal, bedrooms),
+            (self.bathrooms, np.greater_equal, bathrooms),
+        ):
+            if bound is not None:
+                compare(column[:n], float(bound), out=scratch)
+                mask &= scratch
+
+        packed = None
+        groups = []
+        if property_types:
+            groups.append(self.types.union(normalize_type(value) for value in property_types))
+        if towns:
+            groups.append(self.towns.union(normalize_town(value) for value in towns))
+        if amenities:
+            names = [normalize_amenity(value) for value in amenities]
+            if match_all_amenities:
+                groups.extend(self.amenities.union([name]) for name in names)
+            else:
+                groups.append(self.amenities.union(names))
+        for bits in groups:
+            if bits is None:  # filtering on a value no listing has
+                return np.zeros(n, dtype=bool)
+            packed = bits.copy() if packed is None else np.bitwise_and(packed, bits, out=packed)
+        if packed is not None:
+            mask &= np.unpackbits(packed, count=n).view(bool)
+        return mask
+
+    def _order(self, sort):
+        order = self._orders.get(sort)
+        if order is None:
+            n = self.size
+            ids = self.ids[:n]
+            if sort == 'price_asc':
+                order = np.lexsort((ids, self.price[:n]))
+            elif sort == 'price_desc':
+                order = np.lexsort((-ids, -self.price[:n]))
+            elif sort == 'bedrooms':
+                order = np.lexsort((-ids, -self.created[:n], -self.bedrooms[:n]))
+            elif sort == 'price_per_sqft':
+                # listings without a floor area (nan) sort last
+                order = np.lexsort((ids, self.price_per_sqft[:n]))
+            else:
+                order = np.lexsort((-ids, -self.created[:n]))
+            self._orders[sort] = order
+        return order
+
+    def facets(self, price_buckets=20, **filters):
+        """
+            Counts per property type, town, bedroom count, amenity and price bucket for a filter set.
+            Each facet ignores its own filter (disjunctive faceting), so the counts tell the UI how many
+            listings each option would give; amenity counts apply every filter, since amenities are ANDed.
+        """
+        with self.lock:
+            n = self.size
+            mask = self.mask(**filters)
+
+            bedrooms_mask = self.mask(**{**filters, 'bedrooms': None})
+            bedrooms = np.bincount(self.bedrooms[:n][bedrooms_mask])
+
+            # bucket edges span every available listing, so the slider scale stays put while filtering
+            all_prices = self.price[:n][self.alive[:n]]
+            price_mask = self.mask(**{**filters, 'min_price': None, 'max_price': None})
+            low, high = (float(all_prices.min()), float(all_prices.max())) if len(all_prices) else (0.0, 0.0)
+            histogram, edges = np.histogram(self.price[:n][price_mask], bins=price_buckets, range=(low, high or 1.0))
+
+            return {
+                'count': int(np.count_nonzero(mask)),
+                'property_type': self.types.counts(self.mask(**{**filters, 'property_types': None})),
+                'town': self.towns.counts(self.mask(**{**filters, 'towns': None})),
+                'bedrooms': {str(value): int(count) for value, count in enumerate(bedrooms) if count},
+                'amenities': self.amenities.counts(mask),
+                'price': {
+                    'min': low,
+                    'max': high,
+                    'buckets': [
+                        {'from': round(float(edges[i]), 2), 'to': round(float(edges[i + 1]), 2), 'count': int(count)}
+                        for i, count in enumerate(histogram)
+                    ],
+                },
+            }
+
+    def query(self, sort='newest', offset=0, limit=20, **filters):
+        """
+            Return (total matches, property ids of the requested slice in `sort` order).
+        """
+        with self.lock:
+            mask = self.mask(**filters)
+            order = self._order(sort)
+            total = int(np.count_nonzero(mask))
+
+            # walk the sorted order in growing chunks and stop once the page is filled,
+            # instead of gathering the mask over every row
+            needed = min(offset + limit, total)
+            picked = []
+            found = start = 0
+            chunk = 4096
+            while found < needed:
+                positions = order[start:start + chunk]
+                hits = positions[mask[positions]]
+                picked.append(hits)
+                found += len(hits)
+                start += chunk
+                chunk *= 2
+            selected = np.concatenate(picked)[offset:needed] if picked else np.zeros(0, dtype=np.int64)
+            return total, self.ids[selected].tolist()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_listing_index():
+    """The process-wide index, built on first use and synced before every read."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ListingIndex()
+    _index.sync()
+    return _index
+
+
+def get_loaded_index():
+    # the index if this process has built one; writes never trigger a build by themselves
+    return _index
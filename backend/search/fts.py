@@ -0,0 +1,159 @@
+import re
+
+from django.db import connection
+from django.db.models import Case, F, FilteredRelation, FloatField, Lookup, Q, TextField, Value, When
+from django.db.models.functions import Coalesce
+
+
+# SQLite FTS5 index over the searchable Property columns.
+#
+# The index is an external-content FTS5 table (it stores only the inverted index, the text
+# stays in property_property) kept in sync by AFTER INSERT/UPDATE/DELETE triggers.
+# SQLite drops a table's triggers whenever Django rebuilds that table during a migration,
+# so ensure_fts_index() runs after every `migrate` (see apps.py): it creates whatever is
+# missing and rebuilds the index from scratch if the triggers had to be re-created.
+#
+# The FTS table is also mapped as the unmanaged PropertyDocument model (models.py), so a search
+# joins it once and reads its `rank` column: bm25 with the column weights below, stored as the
+# table's rank configuration.
+
+FTS_TABLE = 'search_property_fts'
+CONTENT_TABLE = 'property_property'
+FTS_COLUMNS = ('title', 'location', 'street_name', 'block', 'town', 'zip_code', 'description')
+# bm25 column weights, same order as FTS_COLUMNS (a title hit counts 10x a description hit)
+BM25_WEIGHTS = (10.0, 5.0, 5.0, 2.0, 4.0, 3.0, 1.0)
+
+TRIGGERS = {
+    f'{FTS_TABLE}_ai': """
+        CREATE TRIGGER {trigger} AFTER INSERT ON {content} BEGIN
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_columns});
+        END
+    """,
+    f'{FTS_TABLE}_ad': """
+        CREATE TRIGGER {trigger} AFTER DELETE ON {content} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+        END
+    """,
+    f'{FTS_TABLE}_au': """
+        CREATE TRIGGER {trigger} AFTER UPDATE OF {columns} ON {content} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_columns});
+        END
+    """,
+}
+
+_fts_ready = False
+
+
+class DocumentField(TextField):
+    """The hidden FTS5 column named after the table: the left operand of a whole-row MATCH."""
+
+
+@DocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+def ensure_fts_index(using_connection=None):
+    """
+        Create the FTS5 table and its triggers if missing; returns True if the index was rebuilt.
+    """
+    conn = using_connection or connection
+    if conn.vendor != 'sqlite':
+        return False
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s", [FTS_TABLE + '%'])
+        existing = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [CONTENT_TABLE])
+        if cursor.fetchone() is None:
+            return False
+
+        if FTS_TABLE not in existing:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"{', '.join(FTS_COLUMNS)}, content='{CONTENT_TABLE}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+
+        missing = [name for name in TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(TRIGGERS[name].format(
+                trigger=name,
+                fts=FTS_TABLE,
+                content=CONTENT_TABLE,
+                columns=', '.join(FTS_COLUMNS),
+                new_columns=', '.join(f'new.{column}' for column in FTS_COLUMNS),
+                old_columns=', '.join(f'old.{column}' for column in FTS_COLUMNS),
+            ))
+
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        # `rank` is then the weighted bm25 of a match
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', %s)", [f'bm25({weights})'])
+    return bool(missing)
+
+
+def fts_available():
+    global _fts_ready
+    if not _fts_ready and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_ready = cursor.fetchone() is not None
+    return _fts_ready
+
+
+def build_match_expression(text):
+    """
+        Turn free text into an FTS5 query: every word must match, each as a prefix,
+        e.g. 'toa pay 6' -> '"toa"* "pay"* "6"*'
+    """
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', text.lower()))
+
+
+def full_text_search(queryset, text, fuzzy_matches=None):
+    """
+        Restrict a Property queryset to rows matching `text` and annotate each with
+        `rank` (bm25, lower is more relevant). Falls back to icontains without FTS5.
+
+        fuzzy_matches ({id: similarity}, see fuzzy.py) adds typo-tolerant matches; they rank after
+        every exact match (bm25 is negative, their rank is 2 - similarity).
+    """
+    expression = build_match_expression(text)
+    if not expression:
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+    fuzzy_ids = list(fuzzy_matches or ())
+    fuzzy_rank = Case(
+        *[When(id=pk, then=Value(2.0 - similarity)) for pk, similarity in (fuzzy_matches or {}).items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+    if not fts_available():
+        condition = Q(id__in=fuzzy_ids) if fuzzy_ids else Q()
+        exact = Q()
+        for column in FTS_COLUMNS:
+            exact |= Q(**{f'{column}__icontains': text})
+        return queryset.filter(condition | exact).annotate(
+            rank=Case(When(exact, then=Value(0.0)), default=fuzzy_rank, output_field=FloatField())
+        )
+
+    if not fuzzy_ids:
+        # the FTS index drives the query: each match is read once, with its rank, from the join
+        return queryset.filter(search_document__document__match=expression).annotate(rank=F('search_document__rank'))
+    # exact matches and fuzzy candidates: the rows come from the union of both id lists, and the
+    # FTS table is joined once, outer, with the MATCH in the join condition for the exact ranks
+    from .models import PropertyDocument  # models.py imports this module
+    exact_ids = PropertyDocument.objects.filter(document__match=expression).values('property_id')
+    candidate_ids = exact_ids.union(PropertyDocument.objects.filter(property_id__in=fuzzy_ids).values('property_id'), all=True)
+    matches = FilteredRelation('search_document', condition=Q(search_document__document__match=expression))
+    return queryset.filter(id__in=candidate_ids).annotate(match=matches).annotate(
+        rank=Coalesce(F('match__rank'), fuzzy_rank)
+    )
@@ -0,0 +1,96 @@
+import threading
+from collections import Counter
+
+from backend.addresses import normalize_address
+from property.readmodels import SyncedIndex
+
+
+# Typo-tolerant matching of addresses: an in-process trigram index over Property.street_name,
+# location and town.
+#
+# Text is first normalized (lower case, abbreviations spelled out: 'Lor 6' -> 'lorong 6'), then
+# split into pg_trgm style trigrams, each word padded as '  word '. The index maps every trigram to
+# the ids of the properties containing it, so candidates for a query come from the posting lists
+# of its trigrams only. A candidate's similarity is the share of the query's trigrams it contains:
+# 'toa payo' keeps 8 of its 9 trigrams in 'toa payoh', 'bisahn' 3 of 7 in 'bishan'.
+#
+# Kept current like the other in-memory read models (property/readmodels.py): signals update
+# this process, the shared list generation triggers a re-read of recently updated rows elsewhere.
+
+FUZZY_FIELDS = ('street_name', 'location', 'town')
+SIMILARITY_THRESHOLD = 0.4
+MAX_CANDIDATES = 100
+
+
+def trigrams(text):
+    grams = set()
+    for word in text.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex(SyncedIndex):
+    fields = ('id', *FUZZY_FIELDS)
+
+    def __init__(self):
+        super().__init__()
+        self._clear()
+
+    def _clear(self):
+        self.postings = {}  # trigram -> set of property ids
+        self.documents = {}  # property id -> its trigrams
+
+    def _size(self):
+        return len(self.documents)
+
+    def _upsert(self, row):
+        self._discard(row.id)
+        grams = set()
+        for field in FUZZY_FIELDS:
+            grams |= trigrams(normalize_address(getattr(row, field)))
+        self.documents[row.id] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(row.id)
+
+    def _discard(self, property_id):
+        for gram in self.documents.pop(property_id, ()):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(property_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def search(self, text, limit=MAX_CANDIDATES, threshold=SIMILARITY_THRESHOLD):
+        """
+            {property id: similarity} for the `limit` most similar properties at or above `threshold`.
+        """
+        query = trigrams(normalize_address(text))
+        if not query:
+            return {}
+        with self.lock:
+            hits = Counter()
+            for gram in query:
+                hits.update(self.postings.get(gram, ()))
+        minimum = threshold * len(query)
+        scored = [(count / len(query), pk) for pk, count in hits.items() if count >= minimum]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return {pk: round(similarity, 4) for similarity, pk in scored[:limit]}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_trigram_index():
+    """The process-wide trigram index, built on first use and synced before every read."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TrigramIndex()
+    _index.sync()
+    return _index
+
+
+def get_loaded_trigram_index():
+    return _index
@@ -0,0 +1,25 @@
+from django.db.models import BooleanField, Func
+
+
+# Planner hint for search filters.
+#
+# Without statistics SQLite guesses how many rows a range such as `price >= ?` keeps, and for
+# `WHERE status = 'available' AND price >= ? ORDER BY created_at DESC LIMIT 21` it prefers walking
+# the created_at index in order and testing every available row. Wrapping the filter in
+# unlikely() tells the planner the filter keeps few rows, so the filter's own index drives the
+# query (SEARCH ... USING INDEX property_avail_price_idx) and only the matches are sorted.
+# Other databases get the condition unchanged.
+
+class Selective(Func):
+    function = 'unlikely'
+    output_field = BooleanField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        if connection.vendor != 'sqlite':
+            return compiler.compile(self.get_source_expressions()[0])
+        return super().as_sql(compiler, connection, **extra_context)
+
+
+def selective(queryset, condition):
+    """queryset.filter(condition), hinted as a filter that keeps few rows."""
+    return queryset.filter(Selective(condition))
@@ -0,0 +1,48 @@
+from django.db.models import F, Q
+
+from .engine import normalize_town
+from .models import ANY, SavedSearch, SavedSearchNotification
+
+
+# Reverse matching: rather than running every saved search against the listings table, one newly
+# published listing is matched against all saved searches at once. The listing's values become the
+# parameters of a single query over the SavedSearch predicate columns: the (property_type, town)
+# index narrows it to the searches that allow this type and town, and the price, room and amenity
+# bounds are checked on those rows. Publishing costs one query plus one insert, however many
+# searches are saved.
+
+
+def match_saved_searches(property):
+    """Active saved searches (of other users) that `property` satisfies."""
+    return (
+        SavedSearch.objects
+        .filter(
+            is_active=True,
+            property_type__in=[ANY, property.property_type],
+            town__in=[ANY, normalize_town(property.town) or ANY],
+        )
+        .filter(Q(min_price__isnull=True) | Q(min_price__lte=property.price))
+        .filter(Q(max_price__isnull=True) | Q(max_price__gte=property.price))
+        .filter(Q(bedrooms__isnull=True) | Q(bedrooms__lte=property.bedrooms))
+        .filter(Q(bathrooms__isnull=True) | Q(bathrooms__lte=property.bathrooms))
+        # every amenity the search requires is among the listing's
+        .alias(required_present=F('amenity_mask').bitand(property.amenity_mask))
+        .filter(required_present=F('amenity_mask'))
+        .exclude(user_id=property.owner_id)
+    )
+
+
+def notify_saved_searches(property):
+    """
+        Record a notification for every saved search the published property matches.
+        Returns the number of matching searches; already notified ones are skipped.
+    """
+    if property.status != 'available':
+        return 0
+    matches = match_saved_searches(property).values_list('id', 'user_id')
+    notifications = [
+        SavedSearchNotification(saved_search_id=search_id, user_id=user_id, property=property)
+        for search_id, user_id in matches
+    ]
+    SavedSearchNotification.objects.bulk_create(notifications, ignore_conflicts=True)
+    return len(notifications)
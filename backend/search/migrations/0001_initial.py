@@ -0,0 +1,63 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('property', '0025_property_search_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='Saved search', max_length=100)),
+                ('property_type', models.CharField(blank=True, default='', max_length=20)),
+                ('town', models.CharField(blank=True, default='', max_length=50)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('bedrooms', models.IntegerField(blank=True, null=True)),
+                ('bathrooms', models.IntegerField(blank=True, null=True)),
+                ('amenities', models.JSONField(blank=True, default=list)),
+                ('amenity_mask', models.BigIntegerField(default=0, editable=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SavedSearchNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_notifications', to='property.property')),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='search.savedsearch')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['property_type', 'town', 'min_price'], name='savedsearch_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(fields=['user', '-created_at'], name='savedsearch_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearchnotification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='searchnotification_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedsearchnotification',
+            constraint=models.UniqueConstraint(fields=('saved_search', 'property'), name='unique_search_notification'),
+        ),
+    ]
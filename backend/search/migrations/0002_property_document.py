@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:40
+
+import django.db.models.deletion
+import search.fts
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('property', '0029_property_amenity_rows'),
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyDocument',
+            fields=[
+                ('property', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='property.property')),
+                ('document', search.fts.DocumentField(db_column='search_property_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'search_property_fts',
+                'managed': False,
+            },
+        ),
+    ]
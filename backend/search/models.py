@@ -1,3 +1,80 @@
 from django.db import models
 
-# Create your models here.
+from account.models import User
+from property.amenities import amenity_mask
+from property.models import Property
+from .fts import FTS_TABLE, DocumentField
+
+ANY = ''  # stored in property_type / town for "no constraint", so matching stays an IN lookup
+
+
+# a user's saved search; each filter is a column so that one published listing can be matched
+# against every saved search in a single query (see matching.py)
+class SavedSearch(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100, default="Saved search")
+    property_type = models.CharField(max_length=20, blank=True, default=ANY)
+    town = models.CharField(max_length=50, blank=True, default=ANY)  # upper case, as in the HDB data
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    bedrooms = models.IntegerField(blank=True, null=True)  # minimum
+    bathrooms = models.IntegerField(blank=True, null=True)  # minimum
+    amenities = models.JSONField(default=list, blank=True)
+    # required amenities as a bitmask (see property/amenities.py), derived from `amenities` on save
+    amenity_mask = models.BigIntegerField(default=0, editable=False)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # reverse match: property_type IN ('', <type>) AND town IN ('', <town>) among active searches
+            models.Index(
+                fields=['property_type', 'town', 'min_price'], condition=models.Q(is_active=True),
+                name='savedsearch_match_idx',
+            ),
+            models.Index(fields=['user', '-created_at'], name='savedsearch_user_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.town = ' '.join(self.town.upper().split()) if self.town else ANY
+        self.amenity_mask = amenity_mask(self.amenities)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.user} - {self.name}"
+
+
+# a listing that matched a saved search when it was published
+class SavedSearchNotification(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_notifications')
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='notifications')
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='search_notifications')
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            # a listing edited after publication does not notify the same search twice
+            models.UniqueConstraint(fields=['saved_search', 'property'], name='unique_search_notification'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='searchnotification_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.saved_search} - {self.property}"
+
+
+# the FTS5 index over Property (see fts.py), unmanaged; joined by full-text searches for the
+# match and its bm25 rank, one row per listing keyed by rowid = Property.id
+class PropertyDocument(models.Model):
+    property = models.OneToOneField(
+        Property, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='search_document',
+    )
+    document = DocumentField(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
@@ -0,0 +1,177 @@
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from property.models import Property
+from property.pagination import SORT_ORDERINGS
+from property.amenities import AMENITY_BITS, amenity_names, normalize_amenity
+
+from .autocomplete import KINDS
+from .models import SavedSearch, SavedSearchNotification
+from .engine import SORTS
+
+
+class CommaSeparatedField(serializers.CharField):
+    """'HDB,Condo' -> ['HDB', 'Condo']"""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+
+# filters shared by the search endpoints
+class PropertyFilterSerializer(serializers.Serializer):
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False)
+    bedrooms = serializers.IntegerField(min_value=0, required=False)
+    bathrooms = serializers.IntegerField(min_value=0, required=False)
+    type = CommaSeparatedField(required=False)
+    town = CommaSeparatedField(required=False)
+    amenities = CommaSeparatedField(required=False)
+    amenity_match = serializers.ChoiceField(choices=['all', 'any'], default='all')
+
+    def validate(self, attrs):
+        if 'min_price' in attrs and 'max_price' in attrs and attrs['min_price'] > attrs['max_price']:
+            raise serializers.ValidationError({'max_price': 'Must be greater than or equal to min_price.'})
+        return attrs
+
+
+# query-string parameters of the in-memory listing endpoints (engine.py)
+class ListingFilterSerializer(PropertyFilterSerializer):
+    sort = serializers.ChoiceField(choices=SORTS, default='newest')
+    offset = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def get_index_filters(self):
+        data = self.validated_data
+        return {
+            'min_price': data.get('min_price'),
+            'max_price': data.get('max_price'),
+            'bedrooms': data.get('bedrooms'),
+            'bathrooms': data.get('bathrooms'),
+            'property_types': data.get('type'),
+            'towns': data.get('town'),
+            'amenities': data.get('amenities'),
+            'match_all_amenities': data['amenity_match'] == 'all',
+        }
+
+
+# query-string parameters of the facet counts endpoint
+class FacetFilterSerializer(ListingFilterSerializer):
+    price_buckets = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+    def get_cache_key(self):
+        # equivalent filter sets ('HDB,Condo' / 'condo, hdb') share one cache entry
+        filters = self.get_index_filters()
+        normalized = []
+        for name, value in sorted(filters.items()):
+            if isinstance(value, list):
+                value = sorted(item.lower() for item in value)
+            normalized.append(f'{name}={value}')
+        normalized.append(f"price_buckets={self.validated_data['price_buckets']}")
+        return '&'.join(normalized)
+
+
+# query-string parameters of the autocomplete endpoint
+class AutocompleteSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    kind = CommaSeparatedField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=8)
+
+    def validate_kind(self, value):
+        unknown = [kind for kind in value if kind not in KINDS]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown kind(s): {', '.join(unknown)}. Choose from {', '.join(KINDS)}.")
+        return value
+
+
+# query-string parameters of PropertySearchView (pagination parameters are left to the paginator)
+class PropertySearchSerializer(PropertyFilterSerializer):
+    STATUS_ALL = 'all'
+    SORT_RELEVANCE = 'relevance'
+    TYPES = {value.lower(): value for value, _ in Property.PROPERTY_TYPES}
+
+    search = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    # also match misspelled / abbreviated addresses ('toa payo', 'Lor 6 Toa Payoh'), after the exact matches
+    fuzzy = serializers.BooleanField(default=True)
+    # defaults to relevance for text searches, newest otherwise
+    sort = serializers.ChoiceField(choices=[SORT_RELEVANCE, *SORT_ORDERINGS], required=False)
+    status = serializers.ChoiceField(
+        choices=[value for value, _ in Property.STATUS_CHOICES] + [STATUS_ALL],
+        default='available',
+    )
+
+    def validate_type(self, value):
+        # 'hdb,Condo' -> ['HDB', 'Condo'], the stored spelling, so the filter is an index lookup
+        unknown = [item for item in value if item.lower() not in self.TYPES]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown property type(s): {', '.join(unknown)}. Choose from {', '.join(self.TYPES.values())}."
+            )
+        return sorted({self.TYPES[item.lower()] for item in value})
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if not attrs.get('sort'):
+            attrs['sort'] = self.SORT_RELEVANCE if attrs.get('search') else 'newest'
+        elif attrs['sort'] == self.SORT_RELEVANCE and not attrs.get('search'):
+            raise serializers.ValidationError({'sort': 'Sorting by relevance needs a search text.'})
+        return attrs
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    amenities = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta:
+        model = SavedSearch
+        exclude = ['user', 'amenity_mask']
+        extra_kwargs = {
+            'min_price': {'min_value': Decimal('0')},
+            'max_price': {'min_value': Decimal('0')},
+            'bedrooms': {'min_value': 0},
+            'bathrooms': {'min_value': 0},
+        }
+
+    def validate_amenities(self, value):
+        # only the known amenities can be matched against new listings (see property/amenities.py)
+        unknown = [name for name in value if normalize_amenity(name) not in AMENITY_BITS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown amenities: {', '.join(unknown)}. Choose from {', '.join(AMENITY_BITS)}."
+            )
+        return sorted({normalize_amenity(name) for name in value})
+
+    def validate_property_type(self, value):
+        if not value:
+            return value
+        if value.lower() not in PropertySearchSerializer.TYPES:
+            raise serializers.ValidationError(
+                f"Unknown property type: {value}. Choose from {', '.join(PropertySearchSerializer.TYPES.values())}."
+            )
+        return PropertySearchSerializer.TYPES[value.lower()]
+
+    def validate(self, attrs):
+        min_price = attrs.get('min_price', getattr(self.instance, 'min_price', None))
+        max_price = attrs.get('max_price', getattr(self.instance, 'max_price', None))
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError({'max_price': 'Must be greater than or equal to min_price.'})
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['amenities'] = sorted(amenity_names(instance.amenity_mask))
+        return data
+
+
+class SavedSearchNotificationSerializer(serializers.ModelSerializer):
+    saved_search_name = serializers.CharField(source='saved_search.name', read_only=True)
+    property_title = serializers.CharField(source='property.title', read_only=True)
+    property_price = serializers.DecimalField(source='property.price', max_digits=10, decimal_places=2, read_only=True)
+    property_town = serializers.CharField(source='property.town', read_only=True)
+
+    class Meta:
+        model = SavedSearchNotification
+        fields = [
+            'id', 'saved_search', 'saved_search_name', 'property', 'property_title', 'property_price',
+            'property_town', 'created_at', 'read_at',
+        ]
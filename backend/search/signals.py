@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from data_management.models import RentalFlat, ResaleFlat
+from property.models import Property
+from property.signals import property_published
+
+from .autocomplete import get_loaded_autocomplete_index
+from .engine import get_loaded_index
+from .fuzzy import get_loaded_trigram_index
+from .matching import notify_saved_searches
+
+
+# keep this process's in-memory indexes current (other processes catch up through their sync())
+@receiver(post_save, sender=Property)
+def index_saved_property(sender, instance, **kwargs):
+    for index in (get_loaded_index(), get_loaded_autocomplete_index(), get_loaded_trigram_index()):
+        if index is not None:
+            transaction.on_commit(lambda index=index: index.apply(instance))
+
+
+@receiver(post_delete, sender=Property)
+def unindex_deleted_property(sender, instance, **kwargs):
+    property_id = instance.pk  # cleared on the instance once the delete completes
+    for index in (get_loaded_index(), get_loaded_autocomplete_index(), get_loaded_trigram_index()):
+        if index is not None:
+            transaction.on_commit(lambda index=index: index.remove(property_id))
+
+
+@receiver(post_save, sender=RentalFlat)
+@receiver(post_save, sender=ResaleFlat)
+def index_saved_flat(sender, instance, created, **kwargs):
+    index = get_loaded_autocomplete_index()
+    if index is not None and created:
+        transaction.on_commit(lambda: index.add_flat(instance))
+
+
+# notify saved searches about listings approved for publication
+@receiver(property_published, sender=Property)
+def match_published_property(sender, instance, **kwargs):
+    notify_saved_searches(instance)
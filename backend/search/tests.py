@@ -1,3 +1,531 @@
+import itertools
+import re
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from account.models import User
+from property.cache import get_cache, invalidate_property
+from property.clustering import ClusterIndex
+from property.models import Property, PropertyImage, PropertyRequest
+from property.pagination import SORT_ORDERINGS
+from .autocomplete import AutocompleteIndex
+from .engine import COMPACT_MIN_DEAD, ListingIndex
+from .fuzzy import TrigramIndex
+from .matching import notify_saved_searches
+from .models import SavedSearch, SavedSearchNotification
+from .views import PropertySearchView
+
+
+class PropertySearchQueryBudgetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='owner', password='password', name='Owner')
+        for i in range(30):
+            property = Property.objects.create(
+                owner=user,
+                title=f'Listing {i}',
+                street_name='Lorong 6 Toa Payoh',
+                location=f'{i} Lorong 6 Toa Payoh',
+                price=2000 + i,
+                bedrooms=3,
+            )
+            PropertyImage.objects.create(property=property, image=f'property_images/{i}.png')
+
+    def setUp(self):
+        # cached responses would hide the queries being budgeted
+        get_cache().clear()
+
+    def test_search(self):
+        request = APIRequestFactory().get('/search/', {'min_price': 2000, 'bedrooms': 2, 'page_size': 30})
+        with CaptureQueriesContext(connection) as queries:
+            response = PropertySearchView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertLessEqual(len(queries), PropertySearchView.max_queries)
+
+    def test_facets(self):
+        response = self.client.get('/search/facets/', {'min_price': 2010, 'price_buckets': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 20)
+        self.assertEqual(response.data['bedrooms'], {'3': 20})
+        # the price histogram ignores the price filter itself
+        self.assertEqual(sum(bucket['count'] for bucket in response.data['price']['buckets']), 30)
+
+    def test_amenities(self):
+        owner = User.objects.get(username='owner')
+        pool = Property.objects.create(owner=owner, title='Pool flat', street_name='Bishan Street 13',
+                                       location='1 Bishan Street 13', price=3000, amenities=['Swimming Pool', 'Wi-Fi'])
+        self.assertEqual(sorted(pool.amenity_rows.values_list('amenity', flat=True)), ['swimming_pool', 'wifi'])
+        response = self.client.get('/search/', {'amenities': 'wifi,swimming_pool'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Pool flat'])
+        response = self.client.get('/search/', {'amenities': 'wifi,gym'})
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get('/search/', {'amenities': 'wifi,gym', 'amenity_match': 'any'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Pool flat'])
+
+        # the PropertyAmenity rows follow later edits of the amenities
+        pool = Property.objects.get(pk=pool.pk)
+        pool.amenities = ['wifi', 'gym']
+        pool.save(update_fields=['amenities'])
+        self.assertEqual(sorted(pool.amenity_rows.values_list('amenity', flat=True)), ['gym', 'wifi'])
+        get_cache().clear()
+        response = self.client.get('/search/', {'amenities': 'wifi,gym'})
+        self.assertEqual([row['title'] for row in response.data['results']], ['Pool flat'])
+
+    def test_autocomplete(self):
+        response = self.client.get('/search/autocomplete/', {'q': 'toa', 'kind': 'street'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'kind': 'street', 'label': 'Lorong 6 Toa Payoh', 'count': 30}])
+
+
+    def test_filters_use_indexes(self):
+        # every combination of the supported filters must be driven by the index of one of them:
+        # a SEARCH step on that index, never a SCAN of property_property
+        filters = {
+            'min_price': 2000,
+            'max_price': 2020,
+            'bedrooms': 2,
+            'bathrooms': 1,
+            'type': 'hdb,condo',
+            'town': 'Toa Payoh',
+            'amenities': 'wifi',
+            'search': 'lorong',
+        }
+        price = r'SEARCH property_property USING INDEX property_(avail_)?price_idx'
+        steps = {
+            'min_price': price,
+            'max_price': price,
+            'bedrooms': r'SEARCH property_property USING INDEX property_(avail_bedrooms|bedrooms_created)_idx',
+            'bathrooms': r'SEARCH property_property USING INDEX property_bathrooms_status_idx',
+            'type': r'SEARCH property_property USING INDEX property_type_status_idx',
+            'town': r'SEARCH property_property USING INDEX property_town_status_idx',
+            'amenities': r'SEARCH \w+ USING COVERING INDEX \w+ \(amenity=\?\)',
+            'search': r'SCAN \w+ VIRTUAL TABLE INDEX \d+:M',
+        }
+        for status in ('available', 'all'):
+            for size in range(len(filters) + 1):
+                for names in itertools.combinations(filters, size):
+                    params = {'status': status, **{name: filters[name] for name in names}}
+                    with self.subTest(params=params):
+                        plan = self.explain_page(params)
+                        if not names:
+                            # no filter: the first page is read straight off the sort index
+                            self.assertEqual(len(plan), 1, plan)
+                            self.assertRegex(plan[0], r'^SCAN property_property USING INDEX property_(avail_)?created')
+                            continue
+                        self.assertEqual([step for step in plan if re.match(r'SCAN "?property_property', step)], [], plan)
+                        self.assertTrue(any(re.match(steps[name], step) for name in names for step in plan), plan)
+
+    def explain_page(self, params):
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = PropertySearchView.as_view()(APIRequestFactory().get('/search/', params))
+        self.assertEqual(response.status_code, 200)
+        page_sql = next(query['sql'] for query in queries if 'ORDER BY' in query['sql'] and 'LIMIT' in query['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {page_sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_fuzzy_search(self):
+        owner = User.objects.get(username='owner')
+        Property.objects.create(owner=owner, title='Corner unit', street_name='ANG MO KIO AVE 3',
+                                location='Blk 1 ANG MO KIO AVE 3', town='ANG MO KIO', price=2500)
+        for text in ('ang mo kio avenue 3', 'ang mo kio ave 3', 'ang mo koi ave 3'):
+            response = self.client.get('/search/', {'search': text})
+            self.assertEqual(response.data['results'][0]['title'], 'Corner unit', text)
+        response = self.client.get('/search/', {'search': 'lor 6 toa payo'})
+        self.assertEqual(len(response.data['results']), 20)
+
+
+class FullTextSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='password', name='Owner')
+
+    def setUp(self):
+        get_cache().clear()
+
+    def create(self, title, description='', street_name='Bishan Street 13'):
+        return Property.objects.create(owner=self.owner, title=title, description=description,
+                                       street_name=street_name, location=f'1 {street_name}', price=2000)
+
+    def search(self, text, **params):
+        get_cache().clear()
+        response = self.client.get('/search/', {'search': text, 'fuzzy': 'false', **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_ranking(self):
+        # title hits weigh 10x description hits (BM25_WEIGHTS)
+        described = self.create('Corner unit', description='Quiet flat near the park with a sunny balcony')
+        titled = self.create('Sunny balcony flat')
+        self.create('Corner unit', description='Nothing to see')
+        self.assertEqual(self.search('sunny balcony'), [titled.id, described.id])
+
+    def test_prefix(self):
+        flat = self.create('Penthouse', street_name='Lorong 6 Toa Payoh')
+        self.assertEqual(self.search('pent'), [flat.id])
+        self.assertEqual(self.search('lor 6 toa pay'), [flat.id])
+        self.assertEqual(self.search('toa payohx'), [])
+
+    def test_triggers_keep_the_index_in_sync(self):
+        flat = self.create('Maisonette')
+        self.assertEqual(self.search('maisonette'), [flat.id])
+        flat.title = 'Executive apartment'
+        flat.save()
+        self.assertEqual(self.search('maisonette'), [])
+        self.assertEqual(self.search('executive'), [flat.id])
+        Property.objects.filter(id=flat.id).update(description='Renovated kitchen')
+        self.assertEqual(self.search('renovated'), [flat.id])
+        flat.delete()
+        self.assertEqual(self.search('executive'), [])
+
+    def test_pages_follow_the_rank(self):
+        for i in range(5):
+            self.create(f'Loft {i}', description='loft ' * i)
+        ranked = self.search('loft')
+        # more occurrences rank higher; the cursor walks the same order two rows at a time
+        self.assertEqual(ranked[0], Property.objects.get(title='Loft 4').id)
+        response = self.client.get('/search/', {'search': 'loft', 'fuzzy': 'false', 'page_size': 2})
+        ids = [row['id'] for row in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            ids += [row['id'] for row in response.data['results']]
+        self.assertEqual(ids, ranked)
+
+
+class FacetedSearchTests(APITestCase):
+    """/search/listings/ answers from the in-memory index exactly what /search/ answers from the database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        towns = ('Bishan', 'TOA PAYOH', 'Tampines')
+        types = ('HDB', 'Condo', 'Landed')
+        amenities = (['wifi'], ['wifi', 'gym'], ['aircon'], [])
+        for i in range(60):
+            Property.objects.create(
+                owner=owner, title=f'Listing {i}', street_name='s', location=f'{i} s',
+                town=towns[i % 3], property_type=types[i % 4 % 3], amenities=amenities[i % 4],
+                # ties on every sort column, and listings without a floor area
+                price=2000 + 100 * (i % 5), bedrooms=1 + i % 4, bathrooms=1 + i % 2,
+                square_feet=0 if i % 7 == 0 else 500 + 100 * (i % 3),
+                status='rented' if i % 11 == 0 else 'available',
+            )
+        # pairs of listings created at the same instant
+        for property in Property.objects.all():
+            Property.objects.filter(pk=property.pk).update(
+                created_at=Property.objects.earliest('created_at').created_at + timedelta(seconds=property.pk // 2))
+
+    def setUp(self):
+        # a fresh generation makes the index sync with the rows of this test
+        get_cache().clear()
+
+    def walk_index(self, query):
+        ids, offset = [], 0
+        while True:
+            response = self.client.get('/search/listings/', {**query, 'offset': offset, 'limit': 7})
+            self.assertEqual(response.status_code, 200)
+            ids += [card['id'] for card in response.data['results']]
+            offset += 7
+            if offset >= response.data['count']:
+                return response.data['count'], ids
+
+    def walk_database(self, query):
+        ids, url, params = [], '/search/', {**query, 'page_size': 7, 'fields': 'id'}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            url, params = response.data['next'], None
+        return ids
+
+    def test_matches_the_database_search(self):
+        filters = (
+            {},
+            {'min_price': 2100, 'max_price': 2300},
+            {'bedrooms': 2, 'bathrooms': 2},
+            {'type': 'hdb,Condo'},
+            {'town': 'toa payoh,Bishan'},
+            {'amenities': 'wifi,gym'},
+            {'amenities': 'gym,aircon', 'amenity_match': 'any', 'min_price': 2200},
+        )
+        for query, sort in itertools.product(filters, SORT_ORDERINGS):
+            with self.subTest(sort=sort, **query):
+                count, ids = self.walk_index({**query, 'sort': sort})
+                expected = self.walk_database({**query, 'sort': sort})
+                self.assertTrue(expected)
+                self.assertEqual(ids, expected)
+                self.assertEqual(count, len(expected))
+
+    def test_cards(self):
+        response = self.client.get('/search/listings/', {'sort': 'price_desc', 'limit': 2})
+        self.assertEqual(response.data['count'], Property.objects.filter(status='available').count())
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'price', 'price_per_sqft', 'bedrooms',
+                                                            'latitude', 'longitude', 'thumbnail'})
+        self.assertEqual(response.data['results'][0]['price'], '2400.00')
+
+        response = self.client.get('/search/listings/', {'sort': 'relevance'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ReadModelSyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='password', name='Owner')
+
+    def setUp(self):
+        get_cache().clear()
+
+    def create(self, i, **fields):
+        return Property.objects.create(owner=self.owner, title=f'Listing {i}', street_name='Bishan Street 13',
+                                       location=f'{i} Bishan Street 13', price=2000 + i,
+                                       latitude=1.35 + i / 1e6, longitude=103.85, **fields)
+
+    def write_elsewhere(self, write):
+        # a write by another process: no signals reach the index, only the list generation moves
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+            invalidate_property()
+
+    def test_sync_follows_writes_of_other_processes(self):
+        flats = [self.create(i) for i in range(3)]
+        indexes = [ListingIndex(), AutocompleteIndex(), TrigramIndex(), ClusterIndex()]
+        for index in indexes:
+            index.sync()
+            self.assertEqual(index._size(), 3)
+
+        self.write_elsewhere(lambda: Property.objects.filter(id=flats[0].id).update(
+            title='Penthouse', street_name='Toa Payoh Lorong 6', status='rented'))
+        self.write_elsewhere(lambda: Property.objects.filter(id=flats[1].id).delete())
+        for index in indexes:
+            index.sync()
+        listings, suggestions, trigrams, clusters = indexes
+        self.assertEqual(listings.query()[1], [flats[2].id])
+        self.assertEqual(suggestions.search('pent'), [])
+        self.assertEqual(list(trigrams.search('toa payoh lorong 6')), [flats[0].id])
+        self.assertEqual(sum(cluster[2] for cluster in clusters.clusters(1, 103, 2, 104, 0)), 2)
+
+    def test_listing_index_compacts_dead_slots(self):
+        flats = [self.create(i) for i in range(COMPACT_MIN_DEAD * 2)]
+        index = ListingIndex()
+        index.sync()
+        for flat in flats[:COMPACT_MIN_DEAD - 1]:
+            index.remove(flat.id)
+        self.assertEqual(index.size, len(flats))
+
+        index.remove(flats[COMPACT_MIN_DEAD - 1].id)
+        kept = flats[COMPACT_MIN_DEAD:]
+        self.assertEqual(index.size, len(kept))
+        self.assertEqual(index.positions, {flat.id: position for position, flat in enumerate(kept)})
+        total, ids = index.query(sort='price_asc', limit=5, min_price=2000 + COMPACT_MIN_DEAD + 10)
+        self.assertEqual(total, len(kept) - 10)
+        self.assertEqual(ids, [flat.id for flat in kept[10:15]])
+
+        # later writes land after the live rows
+        index.apply(self.create(-1))
+        self.assertEqual(index.size, len(kept) + 1)
+        self.assertEqual(index.query(sort='price_asc', limit=1, max_price=1999)[1], [index.ids[len(kept)]])
+
+
+class SavedSearchMatchTests(APITestCase):
+
+    def test_published_property_notifies_matching_searches(self):
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        buyer = User.objects.create_user(username='buyer', password='password', name='Buyer')
+        matching = [
+            SavedSearch.objects.create(user=buyer, name='anything'),
+            SavedSearch.objects.create(user=buyer, property_type='HDB', town='bishan', max_price=3000, amenities=['wifi']),
+        ]
+        SavedSearch.objects.create(user=buyer, property_type='Condo')
+        SavedSearch.objects.create(user=buyer, town='Toa Payoh')
+        SavedSearch.objects.create(user=buyer, min_price=2600)
+        SavedSearch.objects.create(user=buyer, bedrooms=4)
+        SavedSearch.objects.create(user=buyer, amenities=['gym'])
+        SavedSearch.objects.create(user=buyer, is_active=False)
+        SavedSearch.objects.create(user=owner, name='own listings are not notified')
+
+        property = Property.objects.create(owner=owner, title='Bishan flat', street_name='Bishan Street 13',
+                                           location='1 Bishan Street 13', town='Bishan', price=2500, bedrooms=3,
+                                           property_type='HDB', amenities=['wifi', 'aircon'])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(notify_saved_searches(property), 2)
+        self.assertEqual(len(queries), 2)  # one match query, one insert
+        self.assertEqual(
+            sorted(buyer.search_notifications.values_list('saved_search_id', flat=True)),
+            [search.id for search in matching],
+        )
+        # publishing an update of the same listing does not notify twice
+        notify_saved_searches(property)
+        self.assertEqual(buyer.search_notifications.count(), 2)
+
+    def test_accepted_request_notifies_matching_searches(self):
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        buyer = User.objects.create_user(username='buyer', password='password', name='Buyer')
+        staff = User.objects.create_user(username='staff', password='password', name='Staff', is_staff=True)
+        matching = SavedSearch.objects.create(user=buyer, property_type='HDB', town='Bishan', max_price=3000)
+        SavedSearch.objects.create(user=buyer, town='Toa Payoh', name='elsewhere')
+        request = PropertyRequest.objects.create(
+            user=owner, request_type='new', title='Bishan flat', street_name='Bishan Street 13',
+            location='1 Bishan Street 13', town='Bishan', price=2500, bedrooms=3, bathrooms=2,
+            square_feet=900, property_type='HDB', status='available', amenities=['wifi'],
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=staff).key}')
+        response = self.client.post(f'/property/requests/{request.id}/accept/')
+        self.assertEqual(response.status_code, 200)
+        property = Property.objects.get(title='Bishan flat')
+        self.assertEqual(
+            list(buyer.search_notifications.values_list('saved_search_id', 'property_id')),
+            [(matching.id, property.id)],
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=buyer).key}')
+        response = self.client.get('/search/notifications/')
+        self.assertEqual([(row['saved_search'], row['property_title']) for row in response.data['results']],
+                         [(matching.id, 'Bishan flat')])
+
+
+class SavedSearchApiTests(APITestCase):
+    """The saved-search endpoints only ever see the signed-in user's own searches."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create_user(username='buyer', password='password', name='Buyer')
+        cls.other = User.objects.create_user(username='other', password='password', name='Other')
+        cls.token = Token.objects.create(user=cls.buyer)
+        cls.others_search = SavedSearch.objects.create(user=cls.other, name='not yours')
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_crud(self):
+        response = self.client.post('/search/saved/', {
+            'name': 'Bishan HDB', 'property_type': 'hdb', 'town': ' bishan ', 'max_price': '3000',
+            'amenities': ['Wi-Fi', 'gym'],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        # stored in the spelling the matching query compares against
+        self.assertEqual((response.data['property_type'], response.data['town']), ('HDB', 'BISHAN'))
+        self.assertEqual(response.data['amenities'], ['gym', 'wifi'])
+        self.assertNotIn('user', response.data)
+        search = SavedSearch.objects.get(pk=response.data['id'])
+        self.assertEqual(search.user, self.buyer)
+        self.assertEqual(search.amenity_mask, 0b10001)
+
+        response = self.client.get('/search/saved/')
+        self.assertEqual([row['id'] for row in response.data], [search.id])
+
+        detail = f'/search/saved/{search.id}/'
+        response = self.client.patch(detail, {'min_price': '2000', 'is_active': False}, format='json')
+        self.assertEqual(response.status_code, 200)
+        search.refresh_from_db()
+        self.assertEqual((search.min_price, search.max_price, search.is_active), (2000, 3000, False))
+
+        self.assertEqual(self.client.delete(detail).status_code, 204)
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        self.assertFalse(SavedSearch.objects.filter(pk=search.id).exists())
+
+    def test_other_users_searches(self):
+        detail = f'/search/saved/{self.others_search.id}/'
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        self.assertEqual(self.client.patch(detail, {'name': 'mine'}, format='json').status_code, 404)
+        self.assertEqual(self.client.delete(detail).status_code, 404)
+        self.assertEqual(SavedSearch.objects.get(pk=self.others_search.id).name, 'not yours')
+
+        self.client.credentials()
+        self.assertEqual(self.client.get('/search/saved/').status_code, 401)
+
+    def test_validation(self):
+        for payload, field in (
+            ({'amenities': ['wifi', 'helipad']}, 'amenities'),
+            ({'property_type': 'castle'}, 'property_type'),
+            ({'min_price': '3000', 'max_price': '2000'}, 'max_price'),
+            ({'min_price': '-1'}, 'min_price'),
+            ({'bedrooms': -1}, 'bedrooms'),
+        ):
+            with self.subTest(payload=payload):
+                response = self.client.post('/search/saved/', payload, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.data)
+        self.assertFalse(SavedSearch.objects.filter(user=self.buyer).exists())
+
+        # a partial update is checked against the stored bounds
+        search = SavedSearch.objects.create(user=self.buyer, max_price=2000)
+        response = self.client.patch(f'/search/saved/{search.id}/', {'min_price': '2500'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('max_price', response.data)
+
+
+class SavedSearchNotificationApiTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username='owner', password='password', name='Owner')
+        cls.buyer = User.objects.create_user(username='buyer', password='password', name='Buyer')
+        other = User.objects.create_user(username='other', password='password', name='Other')
+        cls.token = Token.objects.create(user=cls.buyer)
+        SavedSearch.objects.create(user=cls.buyer, name='Bishan', town='Bishan')
+        SavedSearch.objects.create(user=other, name='anything')
+        cls.properties = [
+            Property.objects.create(owner=owner, title=f'Bishan flat {i}', street_name='Bishan Street 13',
+                                    location=f'{i} Bishan Street 13', town='Bishan', price=2000 + i)
+            for i in range(3)
+        ]
+        for property in cls.properties:
+            notify_saved_searches(property)
+        cls.others_notification = SavedSearchNotification.objects.get(user=other, property=cls.properties[0])
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [row['property_title'] for row in response.data['results']]
+
+    def test_list(self):
+        response = self.client.get('/search/notifications/')
+        self.assertEqual(response.status_code, 200)
+        # newest first, only the signed-in user's
+        self.assertEqual([row['property_title'] for row in response.data['results']],
+                         ['Bishan flat 2', 'Bishan flat 1', 'Bishan flat 0'])
+        row = response.data['results'][0]
+        self.assertEqual((row['saved_search_name'], row['property_town'], row['read_at']), ('Bishan', 'Bishan', None))
+
+        response = self.client.get('/search/notifications/?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual([row['property_title'] for row in self.client.get(response.data['next']).data['results']],
+                         ['Bishan flat 0'])
+
+        self.client.credentials()
+        self.assertEqual(self.client.get('/search/notifications/').status_code, 401)
+
+    def test_mark_read(self):
+        first = SavedSearchNotification.objects.get(user=self.buyer, property=self.properties[0])
+        response = self.client.post('/search/notifications/read/', {'ids': [first.id, self.others_notification.id]},
+                                    format='json')
+        self.assertEqual(response.data, {'marked_read': 1})
+        self.assertEqual(self.titles('/search/notifications/?unread=true'), ['Bishan flat 2', 'Bishan flat 1'])
+
+        # without ids, every unread notification of the user
+        response = self.client.post('/search/notifications/read/', {}, format='json')
+        self.assertEqual(response.data, {'marked_read': 2})
+        self.assertEqual(self.titles('/search/notifications/?unread=true'), [])
+        self.assertEqual(len(self.titles('/search/notifications/')), 3)
+        # other users' notifications are untouched
+        self.others_notification.refresh_from_db()
+        self.assertIsNone(self.others_notification.read_at)
 
-# Create your tests here.
+        for ids in ('1,2', [1, 'x']):
+            with self.subTest(ids=ids):
+                response = self.client.post('/search/notifications/read/', {'ids': ids}, format='json')
+                self.assertEqual(response.status_code, 400)
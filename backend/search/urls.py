@@ -3,4 +3,11 @@ from . import views
 
 urlpatterns = [
     path('search/', views.PropertySearchView.as_view(), name='property-search'),
+    path('search/listings/', views.FacetedSearchView.as_view(), name='property-faceted-search'),
+    path('search/facets/', views.FacetCountsView.as_view(), name='property-facets'),
+    path('search/autocomplete/', views.AutocompleteView.as_view(), name='property-autocomplete'),
+    path('search/saved/', views.SavedSearchListView.as_view(), name='saved-search-list'),
+    path('search/saved/<int:pk>/', views.SavedSearchDetailView.as_view(), name='saved-search-detail'),
+    path('search/notifications/', views.SavedSearchNotificationListView.as_view(), name='search-notification-list'),
+    path('search/notifications/read/', views.SavedSearchNotificationReadView.as_view(), name='search-notification-read'),
 ]
\ No newline at end of file
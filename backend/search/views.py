@@ -1,52 +1,209 @@
-from rest_framework import generics
-from django.db import models
+import hashlib
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from property.models import Property
 from property.serializer import PropertySerializer
+from property.pagination import PropertyCursorPagination, RELEVANCE_ORDERING
+from property.mixins import SortMixin, SparseFieldsetMixin
+from property.conditional import conditional_property_list
+from property.cache import CachedResponseMixin, get_cache, get_list_generation, get_timeout
+from property.projections import card_rows, serialize_cards
+from property.amenities import filter_amenities
+from .fts import full_text_search
+from .hints import selective
+from .engine import get_listing_index
+from .autocomplete import get_autocomplete_index
+from .fuzzy import get_trigram_index
+from .models import SavedSearch, SavedSearchNotification
+from .serializers import (
+    AutocompleteSerializer, FacetFilterSerializer, ListingFilterSerializer, PropertySearchSerializer,
+    SavedSearchNotificationSerializer, SavedSearchSerializer,
+)
 
-class PropertySearchView(generics.ListAPIView):
+@conditional_property_list
+class PropertySearchView(CachedResponseMixin, SortMixin, SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = PropertySerializer
+    pagination_class = PropertyCursorPagination
+    max_queries = 2  # page of properties + prefetched images (the ETag is read from the cache)
+    
+    def get_sort(self):
+        # text searches are ordered by relevance unless ?sort= says otherwise
+        return self.get_params()['sort']
+    
+    def get_ordering(self):
+        if self.get_sort() == PropertySearchSerializer.SORT_RELEVANCE:
+            return RELEVANCE_ORDERING
+        return super().get_ordering()
+    
+    def get_params(self):
+        # typed query-string filters; invalid values answer 400
+        if not hasattr(self, '_params'):
+            params = PropertySearchSerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            self._params = params.validated_data
+        return self._params
     
     def get_queryset(self):
-        queryset = Property.objects.all()
+        # every filter below is served by one of the Property indexes (see Property.Meta.indexes
+        # and test_filters_use_indexes in tests.py)
+        params = self.get_params()
+        queryset = Property.objects.prefetch_related('images')
         
-        # Get search parameters from query string
-        search_query = self.request.query_params.get('search')
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
-        bedrooms = self.request.query_params.get('bedrooms')
-        bathrooms = self.request.query_params.get('bathrooms')
-        property_type = self.request.query_params.get('type')
-        amenities = self.request.query_params.get('amenities')
+        if params['status'] != PropertySearchSerializer.STATUS_ALL:
+            queryset = queryset.filter(status=params['status'])
         
-        # Apply filters
-        if search_query:
-            queryset = queryset.filter(
-                models.Q(title__icontains=search_query) |
-                models.Q(location__icontains=search_query) |
-                models.Q(address__icontains=search_query) |
-                models.Q(city__icontains=search_query) |
-                models.Q(state__icontains=search_query) |
-                models.Q(zip_code__icontains=search_query)
-            )
+        if params.get('search'):
+            # FTS5 index joined once for the match and its bm25 rank, with prefix matching (see fts.py),
+            # then typo-tolerant candidates from the trigram index (see fuzzy.py)
+            fuzzy_matches = get_trigram_index().search(params['search']) if params['fuzzy'] else None
+            queryset = full_text_search(queryset, params['search'], fuzzy_matches)
         
-        if min_price:
-            queryset = queryset.filter(price__gte=min_price)
+        # each filter is hinted as selective so that its index drives the query (see hints.py)
+        if 'min_price' in params or 'max_price' in params:
+            price = Q()
+            if 'min_price' in params:
+                price &= Q(price__gte=params['min_price'])
+            if 'max_price' in params:
+                price &= Q(price__lte=params['max_price'])
+            queryset = selective(queryset, price)
             
-        if max_price:
-            queryset = queryset.filter(price__lte=max_price)
+        if params.get('bedrooms'):
+            queryset = selective(queryset, Q(bedrooms__gte=params['bedrooms']))
             
-        if bedrooms:
-            queryset = queryset.filter(bedrooms__gte=bedrooms)
+        if params.get('bathrooms'):
+            queryset = selective(queryset, Q(bathrooms__gte=params['bathrooms']))
             
-        if bathrooms:
-            queryset = queryset.filter(bathrooms__gte=bathrooms)
-            
-        if property_type:
-            queryset = queryset.filter(property_type__iexact=property_type)
+        if params.get('type'):
+            queryset = selective(queryset, Q(property_type__in=params['type']))
+        
+        if params.get('town'):
+            # towns are stored as typed ('Toa Payoh') or as in the HDB data ('TOA PAYOH'); an IN over
+            # both spellings stays an index lookup where iexact would not
+            towns = {spelling for town in params['town'] for spelling in (town, town.upper(), town.title())}
+            queryset = selective(queryset, Q(town__in=towns))
             
-        if amenities:
-            amenity_list = [a.strip() for a in amenities.split(',')]
-            for amenity in amenity_list:
-                queryset = queryset.filter(amenities__icontains=amenity)
+        if params.get('amenities'):
+            # PropertyAmenity index lookup per amenity (see property/amenities.py)
+            queryset = filter_amenities(queryset, params['amenities'], match_all=params['amenity_match'] == 'all')
                 
-        return queryset.order_by('-created_at')
\ No newline at end of file
+        return queryset
+
+# faceted filtering of available listings answered from the in-memory index (engine.py)
+# returns the total match count and one page of property cards
+class FacetedSearchView(APIView):
+    max_queries = 1  # cards of the page (the index itself only queries after a change)
+    
+    def get(self, request):
+        params = ListingFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        
+        total, ids = get_listing_index().query(
+            sort=params.validated_data['sort'],
+            offset=params.validated_data['offset'],
+            limit=params.validated_data['limit'],
+            **params.get_index_filters(),
+        )
+        rows = {row.id: row for row in card_rows(Property.objects.filter(id__in=ids))}
+        return Response({
+            'count': total,
+            'results': serialize_cards([rows[pk] for pk in ids if pk in rows], request),
+        })
+
+# facet counts for the filter modal: per property type, town, bedroom count, amenity and price bucket
+# computed from the in-memory index and cached per normalized filter set
+class FacetCountsView(APIView):
+    max_queries = 0
+    
+    def get(self, request):
+        params = FacetFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        
+        digest = hashlib.md5(params.get_cache_key().encode()).hexdigest()
+        key = f'search:facets:{get_list_generation()}:{digest}'
+        cache = get_cache()
+        facets = cache.get(key)
+        if facets is None:
+            facets = get_listing_index().facets(
+                price_buckets=params.validated_data['price_buckets'],
+                **params.get_index_filters(),
+            )
+            cache.set(key, facets, get_timeout())
+        return Response(facets)
+
+
+# search-box suggestions (towns, streets, listing titles) by word prefix, from the in-memory index
+class AutocompleteView(APIView):
+    max_queries = 0
+    
+    def get(self, request):
+        params = AutocompleteSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data['q']
+        kinds = params.validated_data.get('kind')
+        suggestions = get_autocomplete_index().search(
+            query,
+            limit=params.validated_data['limit'],
+            kinds=set(kinds) if kinds else None,
+        )
+        return Response({'query': query, 'results': suggestions})
+
+
+# list / create the current user's saved searches
+class SavedSearchListView(generics.ListCreateAPIView):
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    
+    def get_queryset(self):
+        return SavedSearch.objects.filter(user=self.request.user).order_by('-created_at')
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+# get / update / delete one of the current user's saved searches
+class SavedSearchDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = SavedSearchSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    
+    def get_queryset(self):
+        return SavedSearch.objects.filter(user=self.request.user)
+
+
+# listings that matched the current user's saved searches, newest first (?unread=true for unread only)
+class SavedSearchNotificationListView(generics.ListAPIView):
+    serializer_class = SavedSearchNotificationSerializer
+    pagination_class = PropertyCursorPagination
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    max_queries = 1
+    
+    def get_queryset(self):
+        queryset = SavedSearchNotification.objects.filter(user=self.request.user).select_related('saved_search', 'property')
+        if self.request.query_params.get('unread') == 'true':
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset
+
+
+# mark the current user's notifications as read: the given ids, or all of them
+class SavedSearchNotificationReadView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    
+    def post(self, request):
+        ids = request.data.get('ids')
+        if ids is not None and (not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids)):
+            return Response({"ids": "Must be a list of notification ids."}, status=status.HTTP_400_BAD_REQUEST)
+        
+        notifications = SavedSearchNotification.objects.filter(user=request.user, read_at__isnull=True)
+        if ids is not None:
+            notifications = notifications.filter(id__in=ids)
+        updated = notifications.update(read_at=timezone.now())
+        return Response({"marked_read": updated}, status=status.HTTP_200_OK)
@@ -28,7 +28,7 @@ export function Header() {
         params: { q: searchQuery },
       });
       console.log("Search results:", response.data);
-      setSearchResults(response.data);
+      setSearchResults(response.data.results);
 
       navigate(`/properties?search=${encodeURIComponent(searchQuery)}`);
     } catch (error) {
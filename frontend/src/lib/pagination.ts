@@ -0,0 +1,73 @@
+import axios from 'axios';
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+// A cursor-paginated list endpoint ({ next, previous, results }), read one page at a time.
+// The first page is fetched when `url` is set; loadMore() follows `next` on demand
+// (a "Load more" button or an infinite-scroll sentinel), so nothing is fetched up front.
+export function useCursorPages<T>(url: string | null, token?: string | null) {
+  const [items, setItems] = useState<T[]>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [loading, setLoading] = useState(url !== null);
+  const [error, setError] = useState<unknown>(null);
+  // bumped on every reset, so pages of a previous url arriving late are dropped
+  const generation = useRef(0);
+  const busy = useRef(false);
+
+  const fetchPage = useCallback(
+    async (pageUrl: string, reset: boolean) => {
+      const current = reset ? ++generation.current : generation.current;
+      busy.current = true;
+      setLoading(true);
+      try {
+        const res = await axios.get(pageUrl, {
+          headers: token ? { Authorization: `Token ${token}` } : undefined,
+        });
+        if (current !== generation.current) return;
+        setItems((previous) => (reset ? res.data.results : [...previous, ...res.data.results]));
+        setNext(res.data.next);
+        setError(null);
+      } catch (err) {
+        if (current === generation.current) setError(err);
+      } finally {
+        if (current === generation.current) {
+          busy.current = false;
+          setLoading(false);
+        }
+      }
+    },
+    [token]
+  );
+
+  useEffect(() => {
+    setItems([]);
+    setNext(null);
+    if (url) {
+      fetchPage(url, true);
+    } else {
+      generation.current++;
+      busy.current = false;
+      setLoading(false);
+    }
+  }, [url, fetchPage]);
+
+  const loadMore = useCallback(() => {
+    if (next && !busy.current) fetchPage(next, false);
+  }, [next, fetchPage]);
+
+  return { items, loadMore, hasMore: next !== null, loading, error };
+}
+
+// Calls `onVisible` whenever the returned ref's element scrolls into view (infinite scroll).
+export function useSentinel(onVisible: () => void) {
+  const ref = useRef<HTMLDivElement | null>(null);
+  useEffect(() => {
+    const element = ref.current;
+    if (!element) return;
+    const observer = new IntersectionObserver((entries) => {
+      if (entries.some((entry) => entry.isIntersecting)) onVisible();
+    });
+    observer.observe(element);
+    return () => observer.disconnect();
+  }, [onVisible]);
+  return ref;
+}
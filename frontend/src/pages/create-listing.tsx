@@ -222,16 +222,19 @@ export function CreateListingPage() {
         
         formData.location = `${formData.block} ${formData.road_name}`;
         console.log('Location:', formData.location);
-        const response = await axios.get(`https://www.onemap.gov.sg/api/common/elastic/search?searchVal=${formData.location}&returnGeom=Y&getAddrDetails=Y&pageNum=1`);
+        // geocoded through the backend's cached OneMap proxy
+        const response = await axios.get('http://127.0.0.1:8000/data/geocode/', {
+          params: { q: formData.location },
+          headers: { 'Authorization': `Token ${token}` },
+        });
         const data = response.data;
-        if (data.results && data.results.length > 0) {
-          const { POSTAL, BLK_NO, ROAD_NAME, LONGITUDE, LATITUDE, ADDRESS } = data.results[0];
-          formData.zip_code = POSTAL;
-          formData.block = BLK_NO;
-          formData.road_name = ROAD_NAME;
-          formData.longitude = LONGITUDE;
-          formData.latitude = LATITUDE;
-          formData.location = ADDRESS;
+        if (data.found) {
+          formData.zip_code = data.postal_code;
+          formData.block = data.block;
+          formData.road_name = data.street_name;
+          formData.longitude = data.longitude;
+          formData.latitude = data.latitude;
+          formData.location = data.address;
         }
       } catch (error) {
         console.error("Error fetching location code:", error);
@@ -4,6 +4,7 @@ import { Button } from "../components/ui/button";
 import React, { useState, useEffect } from "react";
 import axios from "axios";
 import { useAuth } from "../components/auth/auth-context";
+import { useCursorPages } from "../lib/pagination";
 // import { c } from 'node_modules/vite/dist/node/types.d-aGj9QkWt'; // Unused import
 
 interface Listing {
@@ -19,57 +20,44 @@ interface Listing {
 }
 
 export function MyListingsPage() {
-  const [listings, setListings] = useState<Listing[]>([]);
-  const [error, setError] = useState<string | null>(null);
-  const [loading, setLoading] = useState(true);
   const { user } = useAuth();
   const navigate = useNavigate();
+  const token = localStorage.getItem("authToken");
 
-  // New state for favorites
-  const [favorites, setFavorites] = useState<Listing[]>([]);
-  const [favoritesLoading, setFavoritesLoading] = useState(true);
-  const [favoritesError, setFavoritesError] = useState<string | null>(null);
+  // Created listings and favorites are cursor-paginated; further pages load on "Load more"
+  const {
+    items: listings,
+    loadMore: loadMoreListings,
+    hasMore: hasMoreListings,
+    loading,
+    error: listingsError,
+  } = useCursorPages<Listing>(
+    user?.id
+      ? `http://localhost:8000/property/details/user/${user.id}/?owner_id=${user.id}`
+      : null,
+    token
+  );
+  const error = listingsError ? "Failed to load your listings" : null;
+
+  const {
+    items: favorites,
+    loadMore: loadMoreFavorites,
+    hasMore: hasMoreFavorites,
+    loading: favoritesLoading,
+    error: favoritesLoadError,
+  } = useCursorPages<Listing>(
+    user?.id ? "http://localhost:8000/account/favorite/" : null,
+    token
+  );
+  const favoritesError = favoritesLoadError
+    ? "Failed to load your favorite properties"
+    : null;
 
   // New state for property requests
   const [requests, setRequests] = useState<Listing[]>([]);
   const [requestsLoading, setRequestsLoading] = useState(true);
   const [requestsError, setRequestsError] = useState<string | null>(null);
 
-  // Fetch created listings
-  useEffect(() => {
-    const fetchListings = async () => {
-      if (!user?.id) {
-        setLoading(false);
-        return;
-      }
-
-      try {
-        setLoading(true);
-        const response = await axios.get(
-          `http://localhost:8000/property/all/?owner=${user?.id}`,
-          {
-            headers: {
-              Authorization: `Token ${localStorage.getItem("authToken")}`,
-            },
-          }
-        );
-
-        const filteredListings = response.data.filter(
-          (listing: Listing) => listing.owner === user.id
-        );
-
-        setListings(filteredListings);
-      } catch (error) {
-        console.error("Error fetching listings:", error);
-        setError("Failed to load your listings");
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchListings();
-  }, [user?.id]);
-
   const handleListingClick = (e: React.MouseEvent, propertyId: number) => {
     const target = e.target as HTMLElement;
     if (
@@ -82,35 +70,6 @@ export function MyListingsPage() {
     }
   };
 
-  // Fetch favorite properties
-  useEffect(() => {
-    const fetchFavorites = async () => {
-      if (!user?.id) {
-        setFavoritesLoading(false);
-        return;
-      }
-      try {
-        setFavoritesLoading(true);
-        const response = await axios.get(
-          "http://localhost:8000/account/favorite/",
-          {
-            headers: {
-              Authorization: `Token ${localStorage.getItem("authToken")}`,
-            },
-          }
-        );
-        setFavorites(response.data);
-      } catch (error) {
-        console.error("Error fetching favorite properties:", error);
-        setFavoritesError("Failed to load your favorite properties");
-      } finally {
-        setFavoritesLoading(false);
-      }
-    };
-
-    fetchFavorites();
-  }, [user?.id]);
-
   // Fetch property requests (created by this user or, if admin, all requests)
   useEffect(() => {
     const fetchRequests = async () => {
@@ -140,7 +99,7 @@ export function MyListingsPage() {
     fetchRequests();
   }, [user?.id]);
 
-  if (loading) {
+  if (loading && listings.length === 0) {
     return (
       <div className="container mx-auto px-4 py-8">
         <div className="flex justify-center items-center h-64">
@@ -256,11 +215,18 @@ export function MyListingsPage() {
           ))
         )}
       </div>
+      {hasMoreListings && (
+        <div className="mt-6 text-center">
+          <Button variant="outline" onClick={loadMoreListings} disabled={loading}>
+            {loading ? "Loading..." : "Load more listings"}
+          </Button>
+        </div>
+      )}
 
       {/* Favorites Section */}
       <div className="mt-12">
         <h2 className="mb-6 text-3xl font-bold">My Favorite Properties</h2>
-        {favoritesLoading ? (
+        {favoritesLoading && favorites.length === 0 ? (
           <div className="flex justify-center items-center h-64">
             <p>Loading favorite properties...</p>
           </div>
@@ -306,6 +272,17 @@ export function MyListingsPage() {
             ))}
           </div>
         )}
+        {hasMoreFavorites && (
+          <div className="mt-6 text-center">
+            <Button
+              variant="outline"
+              onClick={loadMoreFavorites}
+              disabled={favoritesLoading}
+            >
+              {favoritesLoading ? "Loading..." : "Load more favorites"}
+            </Button>
+          </div>
+        )}
       </div>
 
       {/* New Section: Property Requests */}
@@ -5,9 +5,9 @@ import { FilterModal, FilterValues } from '../components/filter/filter-modal';
 import { MapProperty, PropertyMap } from '../components/map/property-map';
 import { Button } from '../components/ui/button';
 import { PropertyCard } from '../components/ui/property-card';
+import { useCursorPages, useSentinel } from '../lib/pagination';
 
 export function PropertiesPage() {
-  const [properties, setProperties] = useState<any[]>([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [showFilterModal, setShowFilterModal] = useState(false);
   const [selectedProperty, setSelectedProperty] = useState<MapProperty>();
@@ -21,26 +21,16 @@ export function PropertiesPage() {
     placeType: [],
   });
 
-  // Fetch properties from Django backend
-  useEffect(() => {
-    const fetchProperties = async () => {
-      try {
-        const res = await fetch('http://127.0.0.1:8000/property/all/');
-        const data = await res.json();
-
-        if (res.ok) {
-          // console.log('Fetched properties:', data);
-          setProperties(data);
-        } else {
-          console.error('Failed to fetch properties:', data);
-        }
-      } catch (error) {
-        console.error('Error fetching properties:', error);
-      }
-    };
+  // Fetch properties from Django backend: the list endpoint is cursor-paginated, so the first
+  // page loads now and each further page when the end of the list scrolls into view
+  const { items: properties, loadMore, hasMore, error } = useCursorPages<any>(
+    'http://127.0.0.1:8000/property/all/?page_size=50'
+  );
+  const sentinel = useSentinel(loadMore);
 
-    fetchProperties();
-  }, []);
+  useEffect(() => {
+    if (error) console.error('Error fetching properties:', error);
+  }, [error]);
 
   // Apply filters to properties
   const filteredProperties = properties.filter((property) => {
@@ -145,6 +135,7 @@ export function PropertiesPage() {
               />
             ))}
           </div>
+          {hasMore && <div ref={sentinel} className="h-8" />}
         </div>
       </div>
 
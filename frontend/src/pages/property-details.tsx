@@ -114,13 +114,13 @@ export function PropertyDetailsPage() {
                 headers: { Authorization: `Token ${token}` },
               }),
               axios.get(`http://localhost:8000/property/details/${id}`),
-              axios.get("http://localhost:8000/account/favorite/", {
+              // membership of this one property, rather than paging through every favorite
+              axios.get(`http://localhost:8000/account/favorite/${id}/`, {
                 headers: { Authorization: `Token ${token}` },
               }),
             ]);
           setCurrentUser(userRequest.data);
-          const isFav = favoritesRequest.data.some((fav: any) => fav.id === id);
-          setIsFavorite(isFav);
+          setIsFavorite(favoritesRequest.data.is_favorite);
         } catch (error) {
           console.warn("User not authenticated or token invalid");
           setCurrentUser(null);